@@ -1,10 +1,23 @@
 # app/api/v1/band_routes.py
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import (
+    get_recommend_db,
+    get_read_db,
+    get_recommend_read_db,
+    open_read_session,
+    open_replica_session,
+    replica_router,
+)
 from app.core.auth import get_current_user_external_id
+from app.core import profiling
+from app.core.metrics import observe_stage
+from app.core.responses import trusted_response, raw_json_response
 from app.core.exceptions import (
     NoBandSelectedException,
     NoKeywordSelectedException,
@@ -23,14 +36,18 @@ from app.schemas.band_description_schemas import (
     TopTrackResponse,
 )
 from app.services.band_description_service import fetch_band_description
-from app.services.recommendation_service import recommend_bands_v1, recommend_bands_v2, recommend_bands_v3, recommend_bands_v4
+from app.services.recommendation_service import recommend, build_input_fingerprint
+from app.services.recommendation_pipeline import RecommendationResult
+from app.services.band_catalog import get_band_recommends_with_details, hydrate_band_recommends
+from app.services.stored_recommendation_service import (
+    get_stored_recommendations,
+    invalidate_stored_recommendations,
+    etag_matches,
+)
 from app.repositories.band_description_repository import (
-    get_member_by_external_id,
-    get_member_band_ids,
-    get_member_keyword_ids,
-    delete_band_recommends,
-    save_band_recommends,
-    get_band_recommends_with_details,
+    get_member_context,
+    replace_band_recommends,
+    save_band_recommend_fingerprint,
 )
 
 logger = logging.getLogger(__name__)
@@ -41,10 +58,97 @@ router = APIRouter(
 )
 
 
+def _member_read_db(timeout_ms: int):
+    """
+    회원 기준 읽기 세션 의존성 생성.
+    해당 회원의 추천을 방금 저장했으면 복제 지연 동안 primary에서 읽음 (read-your-writes).
+    """
+    def _get_member_read_db(external_id: str = Depends(get_current_user_external_id)):
+        db = open_read_session(timeout_ms, sticky_key=external_id)
+        try:
+            yield db
+        finally:
+            db.close()
+    return _get_member_read_db
+
+
+get_member_read_db = _member_read_db(0)
+
+
+def _to_recommendation_response(result: RecommendationResult, debug: bool) -> RecommendationResponse:
+    """
+    파이프라인 결과를 V1~V4 응답 형식으로 변환 (debug=true면 단계별 소요 시간, trace면 진단 이벤트 포함).
+    서버가 만든 값이므로 검증 없이 model_construct로 생성.
+    """
+    bands = [
+        RecommendedBand.model_construct(
+            bandId=rec["band_id"],
+            score=round(float(rec["score"]), 4),
+            bandName=rec["band_name"],
+            imageUrl=rec["image_url"],
+            bandMusic=rec["band_music"],
+            keywords=rec["keywords"],
+        )
+        for rec in result.bands
+    ]
+    
+    debug_info = result.debug_info() if debug else None
+
+    # 내부 호출자의 명시적 프로파일링 요청이면 호출 스택/메모리 프로파일도 포함
+    profile = profiling.current()
+    if profile is not None and profile.detailed:
+        debug_info = debug_info or result.debug_info()
+        debug_info["profile"] = profile.report()
+
+    return RecommendationResponse.model_construct(
+        bands=bands,
+        degraded=result.degraded,
+        debug=debug_info,
+    )
+
+
+def _to_final_response(
+    band_details: list,
+    message: str = "추천 밴드 업데이트 API (V4 - is_band 필터링)",
+    degraded: Optional[str] = None,
+) -> FinalRecommendationResponse:
+    """
+    저장된 추천 상세 정보를 최종 추천 API 응답 형식으로 변환.
+    DB/카탈로그 값으로만 만들므로 검증 없이 model_construct로 생성.
+    """
+    bands = []
+    for detail in band_details:
+        top_track = None
+        if detail["top_track"]:
+            top_track = TopTrackResponse.model_construct(
+                title=detail["top_track"]["title"],
+                externalUrl=detail["top_track"]["externalUrl"],
+            )
+        
+        bands.append(RecommendedBandFinal.model_construct(
+            bandId=detail["band_id"],
+            score=round(float(detail["score"]), 4) if detail["score"] else 0.0,
+            bandName=detail["band_name"],
+            imageUrl=detail["image_url"],
+            topTrack=top_track,
+            keywords=detail["keywords"],
+        ))
+    
+    return FinalRecommendationResponse.model_construct(
+        statusCode=200,
+        isSuccess=True,
+        message=message,
+        payload=RecommendationPayload.model_construct(bands=bands),
+        degraded=degraded,
+    )
+
+
 @router.post("/recommendations/update/v1", response_model=RecommendationResponse)
-async def update_recommendations_v1(
+def update_recommendations_v1(
     body: RecommendationRequestV1,
-    db: Session = Depends(get_db),
+    debug: bool = Query(False, description="true면 단계별 소요 시간(ms)을 응답에 포함"),
+    trace: bool = Query(False, description="true면 캐시 없이 계산하고 단계별 진단 이벤트를 debug에 포함"),
+    db: Session = Depends(get_recommend_read_db),
 ):
     """
     [V1] 사용자가 선택한 밴드 ID 목록을 기반으로 추천 밴드 상위 3개 반환.
@@ -57,31 +161,23 @@ async def update_recommendations_v1(
     - 유사도 높은 상위 3개 밴드 반환
     """
     try:
-        recommendations = recommend_bands_v1(db, body.bandIds, top_k=3)
+        result = recommend("v1", db, body.bandIds, top_k=3, trace=trace)
+    except HTTPException:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 생성 실패: {e}")
     
-    bands = [
-        RecommendedBand(
-            bandId=rec["band_id"],
-            score=round(rec["score"], 4),
-            bandName=rec["band_name"],
-            imageUrl=rec["image_url"],
-            bandMusic=rec["band_music"],
-            keywords=rec["keywords"],
-        )
-        for rec in recommendations
-    ]
-    
-    return RecommendationResponse(bands=bands)
+    return trusted_response(_to_recommendation_response(result, debug or trace))
 
 
 @router.post("/recommendations/update/v2", response_model=RecommendationResponse)
-async def update_recommendations_v2(
+def update_recommendations_v2(
     body: RecommendationRequestV2,
-    db: Session = Depends(get_db),
+    debug: bool = Query(False, description="true면 단계별 소요 시간(ms)을 응답에 포함"),
+    trace: bool = Query(False, description="true면 캐시 없이 계산하고 단계별 진단 이벤트를 debug에 포함"),
+    db: Session = Depends(get_recommend_read_db),
 ):
     """
     [V2] 밴드 + 키워드 기반 추천.
@@ -95,36 +191,30 @@ async def update_recommendations_v2(
     - 유사도 높은 상위 3개 밴드 반환
     """
     try:
-        recommendations = recommend_bands_v2(
+        result = recommend(
+            "v2",
             db=db,
             band_ids=body.bandIds,
             keyword_ids=body.keywords,
             top_k=3,
+            trace=trace,
         )
+    except HTTPException:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 생성 실패: {e}")
     
-    bands = [
-        RecommendedBand(
-            bandId=rec["band_id"],
-            score=round(rec["score"], 4),
-            bandName=rec["band_name"],
-            imageUrl=rec["image_url"],
-            bandMusic=rec["band_music"],
-            keywords=rec["keywords"],
-        )
-        for rec in recommendations
-    ]
-    
-    return RecommendationResponse(bands=bands)
+    return trusted_response(_to_recommendation_response(result, debug or trace))
 
 
 @router.post("/recommendations/update/v3", response_model=RecommendationResponse)
-async def update_recommendations_v3(
+def update_recommendations_v3(
     body: RecommendationRequestV3,
-    db: Session = Depends(get_db),
+    debug: bool = Query(False, description="true면 단계별 소요 시간(ms)을 응답에 포함"),
+    trace: bool = Query(False, description="true면 캐시 없이 계산하고 단계별 진단 이벤트를 debug에 포함"),
+    db: Session = Depends(get_recommend_read_db),
 ):
     """
     [V3] 클러스터별 키워드 반영 추천 (5개 반환).
@@ -138,35 +228,29 @@ async def update_recommendations_v3(
     ※ 밴드가 3개 미만이면 V2로 폴백
     """
     try:
-        recommendations = recommend_bands_v3(
+        result = recommend(
+            "v3",
             db=db,
             band_ids=body.bandIds,
             keyword_ids=body.keywords,
+            trace=trace,
         )
+    except HTTPException:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 생성 실패: {e}")
     
-    bands = [
-        RecommendedBand(
-            bandId=rec["band_id"],
-            score=round(rec["score"], 4),
-            bandName=rec["band_name"],
-            imageUrl=rec["image_url"],
-            bandMusic=rec["band_music"],
-            keywords=rec["keywords"],
-        )
-        for rec in recommendations
-    ]
-    
-    return RecommendationResponse(bands=bands)
+    return trusted_response(_to_recommendation_response(result, debug or trace))
 
 
 @router.post("/recommendations/update/v4", response_model=RecommendationResponse)
-async def update_recommendations_v4(
+def update_recommendations_v4(
     body: RecommendationRequestV3,
-    db: Session = Depends(get_db),
+    debug: bool = Query(False, description="true면 단계별 소요 시간(ms)을 응답에 포함"),
+    trace: bool = Query(False, description="true면 캐시 없이 계산하고 단계별 진단 이벤트를 debug에 포함"),
+    db: Session = Depends(get_recommend_read_db),
 ):
     """
     [V4] 클러스터별 키워드 반영 + is_band 필터링 추천 (5개 반환).
@@ -181,35 +265,55 @@ async def update_recommendations_v4(
     ※ 입력 밴드는 is_band 값과 무관하게 클러스터링에 사용됨
     """
     try:
-        recommendations = recommend_bands_v4(
+        result = recommend(
+            "v4",
             db=db,
             band_ids=body.bandIds,
             keyword_ids=body.keywords,
+            trace=trace,
         )
+    except HTTPException:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 생성 실패: {e}")
     
-    bands = [
-        RecommendedBand(
-            bandId=rec["band_id"],
-            score=round(rec["score"], 4),
-            bandName=rec["band_name"],
-            imageUrl=rec["image_url"],
-            bandMusic=rec["band_music"],
-            keywords=rec["keywords"],
-        )
-        for rec in recommendations
-    ]
+    return trusted_response(_to_recommendation_response(result, debug or trace))
+
+
+@router.get("/recommendations", response_model=FinalRecommendationResponse)
+def read_stored_recommendations(
+    external_id: str = Depends(get_current_user_external_id),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_member_read_db),
+):
+    """
+    [추천 조회 API] 저장된 추천 밴드를 재계산 없이 반환 (JWT 인증 필요).
     
-    return RecommendationResponse(bands=bands)
+    - band_recommend에 저장된 결과를 Band + TopTrack + Keyword 정보와 함께 반환
+    - 회원별 응답을 직렬화된 JSON으로 프로세스 내 캐시에 보관 (DB 추천 워터마크가 같을 때만 사용)
+    - ETag / If-None-Match 지원: 변경이 없으면 304 반환
+    """
+    stored = get_stored_recommendations(
+        db,
+        external_id,
+        build_response=lambda details: _to_final_response(details, message="추천 밴드 조회 API"),
+    )
+    if stored is None:
+        raise MemberNotFoundException()
+    
+    etag, body = stored
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return raw_json_response(body, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
 
 
 @router.get("/{band_id}", response_model=BandDescriptionResponse)
 async def read_band_description(
     band_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     특정 band_id의 row를 읽어서 embedding까지 반환하는 확인용 API
@@ -217,7 +321,7 @@ async def read_band_description(
     result = fetch_band_description(db, band_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Band not found")
-    return result
+    return trusted_response(result)
 
 
 # ============================================================
@@ -225,68 +329,93 @@ async def read_band_description(
 # ============================================================
 
 @router.post("/recommendations/update", response_model=FinalRecommendationResponse)
-async def update_recommendations_final(
+def update_recommendations_final(
+    force: bool = Query(False, description="true면 입력이 같아도 추천을 다시 계산"),
     external_id: str = Depends(get_current_user_external_id),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_recommend_db),
 ):
     """
     [최종 추천 API - V4] JWT 인증 기반 추천 밴드 업데이트 및 반환 (5개).
     
     흐름:
     1. JWT에서 externalId 추출
-    2. Member 조회 -> memberId
-    3. MemberBand, MemberKeyword 조회 -> bandIds, keywordIds
+    2. Member, MemberBand, MemberKeyword를 한 번의 쿼리로 조회
+       -> memberId, bandIds(+임베딩), keywordIds(+키워드 텍스트)
     4. recommend_bands_v4 호출 (is_band=true 필터링 적용)
        - 각 클러스터 1등 3개 + 2등 중 상위 2개 = 총 5개
        - 밴드 3개 미만 시 V2로 폴백
-    5. BandRecommend 테이블에 저장 (기존 삭제 후 새로 저장)
+    5. BandRecommend 테이블에 저장 (바뀐 행만 upsert, 남는 행 삭제)
     6. Band + TopTrack + Keyword 정보와 함께 반환
+    
+    ※ 밴드/키워드 선택과 카탈로그가 저장된 추천을 만들 때와 같으면(입력 지문 일치)
+      3~5단계를 건너뛰고 저장된 추천을 그대로 반환 (force=true면 항상 재계산)
+    ※ 회원 입력 조회와 저장은 primary 세션 하나에서 실행 (Spring이 방금 쓴 선택을 읽도록),
+      유사도 검색만 건강한 복제본이 따로 있을 때 복제본에서 실행 (요청당 primary 커넥션은 1개)
     """
     logger.info(f"🎸🏷️🎯🔍 [최종 추천 API - V4] 요청 시작 - externalId: {external_id}")
+    profiling.bind_current_thread()
     
-    # 1. Member 조회
-    member = get_member_by_external_id(db, external_id)
-    if not member:
+    # 1. Member + 선택 밴드(임베딩) + 선택 키워드(텍스트) + 입력 지문을 한 번에 조회
+    with observe_stage("member_load", "final"):
+        member_context = get_member_context(db, external_id)
+    if member_context is None:
         logger.warning(f"[최종 추천 API - V4] 회원 없음 - externalId: {external_id}")
         raise MemberNotFoundException()
     
-    member_id = member.id
+    member_id = member_context["member_id"]
     logger.info(f"[최종 추천 API - V4] 회원 조회 성공 - memberId: {member_id}")
     
-    # 2. 사용자가 선택한 밴드 조회
-    band_ids = get_member_band_ids(db, member_id)
+    # 2. 사용자가 선택한 밴드
+    band_ids = member_context["band_ids"]
     if not band_ids:
         logger.warning(f"[최종 추천 API - V4] 선택한 밴드 없음 - memberId: {member_id}")
         raise NoBandSelectedException()
     
     logger.info(f"[최종 추천 API - V4] 선택한 밴드 ({len(band_ids)}개): {band_ids}")
     
-    # 3. 사용자가 선택한 키워드 조회
-    keyword_ids = get_member_keyword_ids(db, member_id)
+    # 3. 사용자가 선택한 키워드
+    keyword_ids = member_context["keyword_ids"]
     if not keyword_ids:
         logger.warning(f"[최종 추천 API - V4] 선택한 키워드 없음 - memberId: {member_id}")
         raise NoKeywordSelectedException()
     
     logger.info(f"[최종 추천 API - V4] 선택한 키워드 ID ({len(keyword_ids)}개): {keyword_ids}")
     
+    # 입력 지문이 저장된 추천 세트와 같으면 재계산/재저장 없이 바로 반환
+    fingerprint = build_input_fingerprint("v4", band_ids, keyword_ids)
+    if not force and fingerprint is not None and member_context["input_fingerprint"] == fingerprint:
+        band_details = get_band_recommends_with_details(db, member_id)
+        if band_details:
+            logger.info(f"[최종 추천 API - V4] 입력 변경 없음 → 저장된 추천 {len(band_details)}개 반환")
+            return trusted_response(_to_final_response(band_details))
+    
     # 4. V4 추천 로직 실행 (is_band=true 필터링)
+    # 선택 밴드 임베딩/키워드는 이미 조회했으므로 유사도 검색만 복제본으로 보냄 (없으면 primary 세션 재사용)
+    search_db = open_replica_session(settings.DB_RECOMMEND_STATEMENT_TIMEOUT_MS)
     try:
-        recommendations = recommend_bands_v4(
-            db=db,
+        result = recommend(
+            "v4",
+            db=search_db or db,
             band_ids=band_ids,
             keyword_ids=keyword_ids,
+            use_cache=not force,
+            band_embeddings=member_context["band_embeddings"],
+            keywords=member_context["keywords"],
         )
+        recommendations = result.bands
         logger.info(f"[최종 추천 API - V4] 추천 결과: {len(recommendations)}개 밴드 (is_band=true)")
+        logger.info(f"[최종 추천 API - V4] 단계별 소요 시간(ms): {result.timings}")
+    except HTTPException:
+        raise
     except ValueError as ve:
         logger.error(f"[최종 추천 API - V4] 추천 로직 ValueError: {ve}")
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"[최종 추천 API - V4] 추천 로직 오류: {e}")
         raise HTTPException(status_code=500, detail=f"추천 생성 실패: {e}")
-    
-    # 5. BandRecommend 저장 (기존 삭제 후 새로 저장)
-    deleted_count = delete_band_recommends(db, member_id)
-    logger.info(f"[최종 추천 API - V4] 기존 추천 삭제: {deleted_count}개")
+    finally:
+        if search_db is not None:
+            search_db.close()
     
     # 추천 결과를 저장용 형식으로 변환
     recs_to_save = [
@@ -294,40 +423,27 @@ async def update_recommendations_final(
         for rec in recommendations
     ]
     
-    saved_recommends = save_band_recommends(db, member_id, recs_to_save)
-    logger.info(f"[최종 추천 API - V4] 새 추천 저장: {len(saved_recommends)}개")
-    
-    # 6. 커밋
-    db.commit()
+    # 5. BandRecommend 저장 (바뀐 행만 upsert + 남는 행 삭제)
+    with observe_stage("persist", "final"):
+        saved_rows = replace_band_recommends(db, member_id, recs_to_save)
+        
+        # 추천 세트를 만든 입력 지문도 같은 트랜잭션으로 저장
+        # (품질을 낮춘 결과면 지문을 지워 다음 요청 때 다시 계산)
+        save_band_recommend_fingerprint(db, member_id, fingerprint if result.degraded is None else None)
+        
+        # 6. 커밋
+        db.commit()
+    logger.info(f"[최종 추천 API - V4] 추천 저장 완료: {len(saved_rows)}개")
+    invalidate_stored_recommendations(external_id)
+    # 복제 지연 동안 이 회원의 조회는 primary로 (방금 저장한 추천이 보이도록)
+    replica_router.record_write(external_id)
     
-    # 7. 상세 정보 조회
-    band_details = get_band_recommends_with_details(db, member_id)
-    logger.info(f"[최종 추천 API - V4] 상세 정보 조회 완료")
+    # 7. 상세 정보 결합 (메모리 카탈로그, DB 재조회 없음)
+    with observe_stage("hydrate", "final"):
+        band_details = hydrate_band_recommends(db, saved_rows)
     
     # 8. 응답 생성
-    bands = []
-    for detail in band_details:
-        top_track = None
-        if detail["top_track"]:
-            top_track = TopTrackResponse(
-                title=detail["top_track"]["title"],
-                externalUrl=detail["top_track"]["externalUrl"],
-            )
-        
-        bands.append(RecommendedBandFinal(
-            bandId=detail["band_id"],
-            score=round(detail["score"], 4) if detail["score"] else 0.0,
-            bandName=detail["band_name"],
-            imageUrl=detail["image_url"],
-            topTrack=top_track,
-            keywords=detail["keywords"],
-        ))
-    
-    logger.info(f"[최종 추천 API - V4] 응답 완료 - {len(bands)}개 밴드 반환 (is_band=true)")
+    response = _to_final_response(band_details, degraded=result.degraded)
+    logger.info(f"[최종 추천 API - V4] 응답 완료 - {len(response.payload.bands)}개 밴드 반환 (is_band=true)")
     
-    return FinalRecommendationResponse(
-        statusCode=200,
-        isSuccess=True,
-        message="추천 밴드 업데이트 API (V4 - is_band 필터링)",
-        payload=RecommendationPayload(bands=bands),
-    )
+    return trusted_response(response)
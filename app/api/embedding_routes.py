@@ -6,9 +6,14 @@ from app.schemas.embedding_schemas import (
     BatchEmbeddingResponse,
     BulkIdsEmbeddingRequest,
     BulkIdsEmbeddingResponse,
+    NeighborRebuildResponse,
+    SnapshotExportResponse,
 )
 
+from app.core.responses import trusted_response
 from app.services.embedding_service import embedding_service
+from app.services.band_neighbor_service import rebuild_all_band_neighbors
+from app.services.embedding_snapshot import export_embedding_snapshot
 
 router = APIRouter(
     prefix="/embedding",
@@ -17,7 +22,7 @@ router = APIRouter(
 
 
 @router.post("/single", response_model=SingleEmbeddingResponse)
-async def create_single_embedding(body: SingleEmbeddingRequest):
+def create_single_embedding(body: SingleEmbeddingRequest):
 
     try:
         model, embedding = embedding_service.embed_single_text(body.text)
@@ -28,14 +33,15 @@ async def create_single_embedding(body: SingleEmbeddingRequest):
         # OpenAI 에러 또는 기타 예외
         raise HTTPException(status_code=500, detail=f"임베딩 생성 실패: {e}")
 
-    return SingleEmbeddingResponse(
+    # 1536차원 float 리스트를 다시 검증하지 않고 바로 직렬화
+    return trusted_response(SingleEmbeddingResponse.model_construct(
         model=model,
         embedding=embedding,
-    )
+    ))
 
 
 @router.post("/reset", response_model=BatchEmbeddingResponse)
-async def reset_band_descriptions_embedding():
+def reset_band_descriptions_embedding():
 
     try:
         total = embedding_service.reset_band_descriptions_embedding()
@@ -49,7 +55,7 @@ async def reset_band_descriptions_embedding():
 
 
 @router.post("/update-missing", response_model=BatchEmbeddingResponse)
-async def update_missing_band_descriptions_embedding():
+def update_missing_band_descriptions_embedding():
 
     try:
         total = embedding_service.update_missing_band_description_embedding()
@@ -63,7 +69,7 @@ async def update_missing_band_descriptions_embedding():
 
 
 @router.post("/update-by-ids", response_model=BulkIdsEmbeddingResponse)
-async def update_embedding_by_ids(body: BulkIdsEmbeddingRequest):
+def update_embedding_by_ids(body: BulkIdsEmbeddingRequest):
 
     if not body.bandDescriptionIds:
         raise HTTPException(status_code=400, detail="bandDescriptionIds 는 최소 1개 이상이어야 합니다.")
@@ -81,3 +87,31 @@ async def update_embedding_by_ids(body: BulkIdsEmbeddingRequest):
         requestedCount=len(body.bandDescriptionIds),
         processedCount=processed,
     )
+
+
+@router.post("/neighbors/rebuild", response_model=NeighborRebuildResponse)
+def rebuild_band_neighbors_table():
+
+    try:
+        total = rebuild_all_band_neighbors()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"band_neighbors 재계산 실패: {e}")
+
+    return NeighborRebuildResponse(totalRows=total)
+
+
+@router.post("/snapshot/export", response_model=SnapshotExportResponse)
+def export_embedding_snapshot_file():
+
+    try:
+        manifest = export_embedding_snapshot()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"임베딩 스냅샷 내보내기 실패: {e}")
+
+    if manifest is None:
+        return SnapshotExportResponse(exported=False)
+    return SnapshotExportResponse(
+        exported=True,
+        version=manifest["version"],
+        count=manifest["count"],
+    )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends
+
+from app.core.admission import get_admission_stats
+from app.core.auth import require_ops_token
+from app.core.cache import get_cache_stats
+from app.core.db import get_pool_stats
+from app.core.openai_client import get_openai_transport_stats
+from app.services.catalog_generation import catalog_generation
+from app.services.band_catalog import band_catalog
+from app.services.embedding_snapshot import embedding_snapshot
+from app.services.keyword_index import keyword_band_index
+
+router = APIRouter(
+    prefix="/ops",
+    tags=["ops"],
+    # 풀/복제본/캐시 상태는 내부 정보이므로 X-Profile-Token(PROFILE_TOKEN) 필요
+    dependencies=[Depends(require_ops_token)],
+)
+
+
+@router.get("/cache")
+def read_cache_stats():
+    """
+    프로세스 내 캐시별 적중률/크기 통계와 현재 카탈로그 세대 확인용 API
+    """
+    return {
+        "catalogGeneration": catalog_generation.current(),
+        "caches": get_cache_stats(),
+        "bandCatalog": band_catalog.stats(),
+        "embeddingSnapshot": embedding_snapshot.stats(),
+        "keywordIndex": keyword_band_index.stats(),
+    }
+
+
+@router.get("/db-pool")
+def read_db_pool_stats():
+    """
+    DB 커넥션 풀 사용 현황 (사용 중 커넥션 수, checkout 대기 시간) 확인용 API
+    """
+    return get_pool_stats()
+
+
+@router.get("/admission")
+def read_admission_stats():
+    """
+    엔드포인트 분류별 요청 수락 제어 현황 (처리 중/대기 중 요청 수, 거절 수) 확인용 API
+    """
+    return get_admission_stats()
+
+
+@router.get("/openai")
+def read_openai_transport_stats():
+    """
+    OpenAI HTTP 호출 통계 (최근 지연 백분위, keep-alive 재사용률, 상태/오류별 호출 수)와 전송 설정 확인용 API
+    """
+    return get_openai_transport_stats()
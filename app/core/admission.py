@@ -0,0 +1,248 @@
+# app/core/admission.py
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import deadline
+from app.core.config import settings
+from app.core.metrics import ADMISSION_DECISIONS, ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_QUEUE_WAIT
+from app.core.responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+# 서비스 시간 이동 평균 가중치 (Retry-After 추정용)
+_EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """동시 처리 한도와 대기열이 모두 찼거나 대기 시간이 초과된 경우"""
+
+    def __init__(self, reason: str, retry_after_seconds: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionLimiter:
+    """
+    엔드포인트 분류별 동시 처리 한도 + 제한된 대기열 (이벤트 루프 안에서만 사용).
+
+    - 처리 중인 요청이 max_concurrent 미만이면 바로 수락
+    - 아니면 대기열(max_queue)에서 queue_timeout_seconds까지 기다렸다가 슬롯을 넘겨받음 (FIFO)
+    - 대기열이 가득 찼거나 대기 시간이 지나면 AdmissionRejected
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout_seconds: float,
+        reject_status: int,
+    ) -> None:
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_seconds = max(0.0, queue_timeout_seconds)
+        self.reject_status = reject_status
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_seconds = 0.0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def _retry_after(self) -> int:
+        """대기열이 모두 빠지는 데 걸릴 예상 시간 (초, 최소 1)"""
+        backlog = len(self._waiters) + 1
+        estimate = self._service_seconds * backlog / self.max_concurrent
+        return min(settings.ADMISSION_MAX_RETRY_AFTER_SECONDS, max(1, math.ceil(estimate)))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        if reason == "queue_full":
+            self.rejected_queue_full += 1
+        else:
+            self.rejected_timeout += 1
+        ADMISSION_DECISIONS.labels(endpoint_class=self.name, outcome=f"rejected_{reason}").inc()
+        return AdmissionRejected(reason, self._retry_after())
+
+    def _admit(self, waited_seconds: float) -> None:
+        self.admitted += 1
+        ADMISSION_DECISIONS.labels(endpoint_class=self.name, outcome="admitted").inc()
+        ADMISSION_QUEUE_WAIT.labels(endpoint_class=self.name).observe(waited_seconds)
+        ADMISSION_IN_FLIGHT.labels(endpoint_class=self.name).set(self.active)
+
+    async def acquire(self) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self._admit(0.0)
+            return
+
+        # 요청 시간 예산이 있으면 그보다 오래 기다리지 않음
+        wait_seconds = self.queue_timeout_seconds
+        left = deadline.remaining()
+        if left is not None:
+            wait_seconds = min(wait_seconds, max(0.0, left))
+
+        if len(self._waiters) >= self.max_queue or wait_seconds == 0:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUED.labels(endpoint_class=self.name).set(len(self._waiters))
+        start = time.perf_counter()
+        try:
+            await asyncio.wait({waiter}, timeout=wait_seconds)
+        except asyncio.CancelledError:
+            # 클라이언트 연결이 끊긴 경우 - 이미 슬롯을 넘겨받았으면 돌려줌
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._discard(waiter)
+            raise
+
+        if waiter.done():
+            # 슬롯은 release()에서 그대로 넘겨받음 (active는 이미 포함)
+            self._admit(time.perf_counter() - start)
+            return
+
+        waiter.cancel()
+        self._discard(waiter)
+        raise self._reject("timeout")
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        ADMISSION_QUEUED.labels(endpoint_class=self.name).set(len(self._waiters))
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        if service_seconds is not None:
+            self._service_seconds += _EWMA_ALPHA * (service_seconds - self._service_seconds)
+
+        # 기다리는 요청이 있으면 슬롯을 바로 넘김 (active 유지)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                ADMISSION_QUEUED.labels(endpoint_class=self.name).set(len(self._waiters))
+                return
+        ADMISSION_QUEUED.labels(endpoint_class=self.name).set(0)
+        self.active -= 1
+        ADMISSION_IN_FLIGHT.labels(endpoint_class=self.name).set(self.active)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "maxConcurrent": self.max_concurrent,
+            "maxQueue": self.max_queue,
+            "queueTimeoutMs": round(self.queue_timeout_seconds * 1000, 3),
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejectedQueueFull": self.rejected_queue_full,
+            "rejectedTimeout": self.rejected_timeout,
+            "avgServiceMs": round(self._service_seconds * 1000, 3),
+        }
+
+
+# (경로 접두사, 분류) - 위에서부터 먼저 일치하는 항목 사용
+# /api/embedding/single은 OpenAI 호출 1회라 관리용 일괄 작업과 분리해 추천과 같은 예산을 씀
+ROUTE_CLASSES: List[Tuple[str, str]] = [
+    ("/api/embedding/single", "recommend"),
+    ("/api/embedding", "embedding_admin"),
+    ("/api/bands/recommendations/update", "recommend"),
+    ("/recommend/band", "recommend"),
+    ("/api/bands", "read"),
+]
+
+limiters: Dict[str, AdmissionLimiter] = {
+    "recommend": AdmissionLimiter(
+        "recommend",
+        max_concurrent=settings.ADMISSION_RECOMMEND_CONCURRENCY,
+        max_queue=settings.ADMISSION_RECOMMEND_QUEUE_SIZE,
+        queue_timeout_seconds=settings.ADMISSION_RECOMMEND_QUEUE_TIMEOUT_MS / 1000,
+        reject_status=503,
+    ),
+    "read": AdmissionLimiter(
+        "read",
+        max_concurrent=settings.ADMISSION_READ_CONCURRENCY,
+        max_queue=settings.ADMISSION_READ_QUEUE_SIZE,
+        queue_timeout_seconds=settings.ADMISSION_READ_QUEUE_TIMEOUT_MS / 1000,
+        reject_status=503,
+    ),
+    # 전체 임베딩 재생성 등은 OpenAI 한도를 크게 쓰므로 작게 두고, 초과 호출은 429로 알림
+    "embedding_admin": AdmissionLimiter(
+        "embedding_admin",
+        max_concurrent=settings.ADMISSION_EMBEDDING_ADMIN_CONCURRENCY,
+        max_queue=settings.ADMISSION_EMBEDDING_ADMIN_QUEUE_SIZE,
+        queue_timeout_seconds=settings.ADMISSION_EMBEDDING_ADMIN_QUEUE_TIMEOUT_MS / 1000,
+        reject_status=429,
+    ),
+}
+
+
+def classify(path: str) -> Optional[str]:
+    """요청 경로 → 엔드포인트 분류 (헬스 체크/메트릭/운영 API 등은 None - 제한 없음)"""
+    for prefix, endpoint_class in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return endpoint_class
+    return None
+
+
+def get_admission_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+class AdmissionControlMiddleware:
+    """
+    엔드포인트 분류별 동시 처리 한도를 적용하는 ASGI 미들웨어.
+
+    한도를 넘는 요청은 DB 커넥션/OpenAI 호출을 잡기 전에 대기열에서 기다리고,
+    대기열이 가득 찼거나 대기 시간이 지나면 Retry-After와 함께 503(관리용 임베딩 API는 429)으로 즉시 거절.
+    프로세스(uvicorn 워커)마다 별도로 적용됩니다.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint_class = classify(scope["path"])
+        if endpoint_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[endpoint_class]
+        try:
+            await limiter.acquire()
+        except AdmissionRejected as rejected:
+            logger.warning(
+                f"[admission] {endpoint_class} 요청 거절 ({rejected.reason}) - "
+                f"{scope['method']} {scope['path']}, Retry-After={rejected.retry_after_seconds}s"
+            )
+            response = FastJSONResponse(
+                {"detail": {
+                    "statusCode": limiter.reject_status,
+                    "message": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                }},
+                status_code=limiter.reject_status,
+                headers={"Retry-After": str(rejected.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
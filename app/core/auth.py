@@ -6,7 +6,8 @@ import jwt
 from fastapi import Header
 
 from app.core.config import settings
-from app.core.exceptions import InvalidTokenException
+from app.core.exceptions import InvalidTokenException, OpsAccessDeniedException
+from app.core.profiling import is_internal_caller
 
 logger = logging.getLogger(__name__)
 
@@ -93,3 +94,20 @@ def get_current_user_external_id(
         raise InvalidTokenException("토큰이 비어있습니다.")
     
     return get_external_id_from_token(token)
+
+
+def require_ops_token(
+    x_profile_token: Optional[str] = Header(None, description="PROFILE_TOKEN과 같은 값")
+) -> None:
+    """
+    운영용 API(/metrics, /api/ops/*) 접근 확인 - 명시적 프로파일링과 같은 X-Profile-Token을 요구합니다.
+    FastAPI Depends에서 사용합니다.
+
+    Args:
+        x_profile_token: X-Profile-Token 헤더 값
+
+    Raises:
+        OpsAccessDeniedException: 토큰이 없거나 PROFILE_TOKEN과 다를 때 (PROFILE_TOKEN이 비어 있으면 항상)
+    """
+    if not is_internal_caller(x_profile_token):
+        raise OpsAccessDeniedException()
@@ -0,0 +1,160 @@
+# app/core/compression.py
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# brotli는 선택 의존성 - 설치되어 있지 않으면 gzip만 사용
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# 압축 효과가 있는 텍스트 계열만 (이미지/이미 압축된 본문 제외)
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/openmetrics-text")
+
+
+def _accepted(accept_encoding: str, encoding: str) -> bool:
+    """Accept-Encoding에 해당 인코딩이 q>0으로 포함되어 있는지"""
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() != encoding:
+            continue
+        params = params.strip().replace(" ", "")
+        if not params.startswith("q="):
+            return True
+        try:
+            return float(params[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class _Compressor:
+    """gzip(zlib) / brotli 스트리밍 압축기 공통 인터페이스"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 → gzip 헤더/트레일러 포함
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    응답 본문 압축 (brotli 우선, 없으면 gzip).
+
+    - 한 번에 끝나는 응답은 본문이 minimum_size 이상일 때만 압축
+    - 스트리밍 응답(more_body)은 크기를 미리 알 수 없으므로 청크마다 flush하며 압축
+    - 이미 Content-Encoding이 있거나 텍스트 계열이 아닌 응답, 204/304는 그대로 전달
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose_encoding(self, scope: Scope) -> Optional[str]:
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if not accept_encoding:
+            return None
+        if brotli is not None and _accepted(accept_encoding, "br"):
+            return "br"
+        if _accepted(accept_encoding, "gzip"):
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """http.response.start를 첫 본문 청크까지 보류했다가 압축 여부를 결정"""
+
+    def __init__(self, send: Send, encoding: str, middleware: CompressionMiddleware) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _should_compress(self, headers: MutableHeaders) -> bool:
+        status = self.start_message["status"]
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if self.compressor is not None:
+            final = not message.get("more_body", False)
+            message["body"] = self.compressor.compress(message.get("body", b""), final)
+            await self._send(message)
+            return
+
+        # 첫 본문 청크 - 압축 여부 결정
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self._should_compress(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        headers["Content-Encoding"] = self.encoding
+        self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        message["body"] = self.compressor.compress(body, final=not more_body)
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(message["body"]))
+        # 압축 전 본문 기준 strong ETag는 압축본에 맞지 않으므로 weak로 표시
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+        await self._send(self.start_message)
+        await self._send(message)
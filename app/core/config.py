@@ -12,6 +12,20 @@ class Settings:
     def has_openai_key(self) -> bool:
         return bool(self.OPENAI_API_KEY)
 
+    # OpenAI HTTP 전송 계층 (프로세스당 클라이언트 1개 공유)
+    # - BASE_URL: 로컬 대체 서버(benchmarks/fake_openai.py)나 프록시 주소 (비우면 OpenAI 기본값)
+    # - MAX_CONNECTIONS / MAX_KEEPALIVE_CONNECTIONS: 동시 연결 / 유지할 유휴 연결 수
+    # - MAX_RETRIES: 실패 시 재시도 횟수 (SDK 지수 백오프), HTTP2는 h2 패키지 필요
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "16"))
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "3"))
+    OPENAI_READ_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_READ_TIMEOUT_SECONDS", "30"))
+    OPENAI_POOL_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_POOL_TIMEOUT_SECONDS", "5"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_HTTP2: bool = os.getenv("OPENAI_HTTP2", "false").lower() == "true"
+
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_PORT: int = int(os.getenv("DB_PORT", "5432"))
     DB_NAME: str = os.getenv("DB_NAME", "postgres")
@@ -53,10 +67,154 @@ class Settings:
             return [origin.strip() for origin in self._CORS_ORIGINS_ENV.split(",") if origin.strip()]
         return self.DEFAULT_CORS_ORIGINS
 
+    # 응답 압축 (brotli 패키지가 있으면 br 우선, 없으면 gzip) - 본문이 MIN_BYTES 이상일 때만
+    RESPONSE_COMPRESSION_ENABLED: bool = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+    RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    RESPONSE_GZIP_LEVEL: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    RESPONSE_BROTLI_QUALITY: int = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+    # 서버 시작 시 warmup (커넥션/클러스터링/벡터 검색/캐시 로드) - 끝나야 요청을 받음
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+    # 로그 레벨 (DEBUG면 추천 연산의 진단 이벤트 - norm, Slerp 전후 유사도 등 - 도 계산/출력)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+
+    # 요청별 프로파일링 (/api/bands/recommendations/* → Server-Timing 헤더)
+    # - 명시적 요청: X-Profile 헤더 또는 ?profile= (1 | memory), X-Profile-Token이 PROFILE_TOKEN과 일치할 때만 허용
+    #   (PROFILE_TOKEN이 비어 있으면 명시적 요청은 모두 거부)
+    # - SAMPLE_RATE: 명시적 요청이 없어도 이 비율만큼 단계별 시간을 기록해 로그로 남김
+    PROFILE_PATH_PREFIX: str = os.getenv("PROFILE_PATH_PREFIX", "/api/bands/recommendations")
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN", "")
+    PROFILE_STACK_INTERVAL_MS: float = float(os.getenv("PROFILE_STACK_INTERVAL_MS", "5"))
+    PROFILE_STACK_MAX_DEPTH: int = int(os.getenv("PROFILE_STACK_MAX_DEPTH", "30"))
+    PROFILE_TOP_N: int = int(os.getenv("PROFILE_TOP_N", "15"))
+    PROFILE_TRACEMALLOC_FRAMES: int = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "1"))
+
+    # DB 드라이버: psycopg2(기본) | psycopg (psycopg3 - 서버 측 prepared statement, 바이너리 전송, 파이프라인)
+    DB_DRIVER: str = os.getenv("DB_DRIVER", "psycopg2")
+    # psycopg3: 같은 쿼리를 N번 실행하면 서버 측 prepared statement로 전환 (0이면 항상, 음수면 미사용)
+    DB_PREPARE_THRESHOLD: int = int(os.getenv("DB_PREPARE_THRESHOLD", "2"))
+
+    # DB 커넥션 풀 / SQL 로그 / 쿼리 타임아웃
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # 서버 시작 시 미리 열어 검증할 커넥션 수 (기본: 풀 크기만큼)
+    WARMUP_DB_CONNECTIONS: int = int(os.getenv("WARMUP_DB_CONNECTIONS", str(DB_POOL_SIZE)))
+    # SQL 로그 (디버그용, 바인딩 파라미터는 DB_ECHO_PARAM_MAX_LENGTH 글자까지만 출력)
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+    DB_ECHO_PARAM_MAX_LENGTH: int = int(os.getenv("DB_ECHO_PARAM_MAX_LENGTH", "100"))
+    # statement_timeout (ms, 0이면 미적용) - 전역 기본값 / 추천 API 전용
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    DB_RECOMMEND_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_RECOMMEND_STATEMENT_TIMEOUT_MS", "5000"))
+
+    # 읽기 복제본 (쉼표로 구분한 SQLAlchemy URL, 드라이버는 DB_DRIVER와 동일하게)
+    _DB_REPLICA_URLS_ENV: str = os.getenv("DB_REPLICA_URLS", "")
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS: int = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = float(os.getenv("DB_REPLICA_HEALTH_CHECK_SECONDS", "5"))
+    # 복제 지연이 이보다 크면 읽기 대상에서 제외
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+    # 회원 데이터를 쓴 뒤 이 시간 동안 해당 회원 읽기는 primary 사용 (read-your-writes)
+    DB_REPLICA_STICKY_SECONDS: float = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
+
+    @property
+    def DB_REPLICA_URL_LIST(self) -> list[str]:
+        return [url.strip() for url in self._DB_REPLICA_URLS_ENV.split(",") if url.strip()]
+
+    # 밴드 최근접 이웃 테이블(band_neighbors) 설정
+    # - 밴드별 상위 N개 이웃을 미리 계산해두고 1~2개 밴드 추천 시 벡터 검색 대신 사용
+    BAND_NEIGHBORS_ENABLED: bool = os.getenv("BAND_NEIGHBORS_ENABLED", "true").lower() == "true"
+    BAND_NEIGHBORS_TOP_N: int = int(os.getenv("BAND_NEIGHBORS_TOP_N", "50"))
+    # 이웃 후보 풀(seed)로 검색할 최대 선택 밴드 수
+    BAND_NEIGHBORS_SEED_MAX_BANDS: int = int(os.getenv("BAND_NEIGHBORS_SEED_MAX_BANDS", "2"))
+
+    # 추천 결과 캐시 (V1~V4 입력이 같으면 결과 재사용)
+    RECOMMEND_CACHE_ENABLED: bool = os.getenv("RECOMMEND_CACHE_ENABLED", "true").lower() == "true"
+    RECOMMEND_CACHE_MAX_SIZE: int = int(os.getenv("RECOMMEND_CACHE_MAX_SIZE", "2048"))
+    RECOMMEND_CACHE_TTL_SECONDS: float = float(os.getenv("RECOMMEND_CACHE_TTL_SECONDS", "600"))
+    # 저장된 추천 조회(GET) 캐시 - 회원별 응답 + ETag
+    STORED_RECOMMEND_CACHE_MAX_SIZE: int = int(os.getenv("STORED_RECOMMEND_CACHE_MAX_SIZE", "10000"))
+    STORED_RECOMMEND_CACHE_TTL_SECONDS: float = float(os.getenv("STORED_RECOMMEND_CACHE_TTL_SECONDS", "300"))
+    # 카탈로그(밴드/키워드/임베딩) 변경 감지 주기 - 외부(Spring) 변경 반영 지연의 상한
+    CATALOG_POLL_INTERVAL_SECONDS: float = float(os.getenv("CATALOG_POLL_INTERVAL_SECONDS", "10"))
+    # 응답 결합용 밴드 카탈로그 전체 재로드 주기 (워터마크로 감지할 수 없는 hard delete 반영용)
+    BAND_CATALOG_FULL_RELOAD_SECONDS: float = float(os.getenv("BAND_CATALOG_FULL_RELOAD_SECONDS", "3600"))
+
+    # 키워드 하이브리드 검색 (keyword_id → 밴드 비트셋 역색인으로 키워드가 있는 V2~V4 벡터 검색 후보를 좁히거나 가산)
+    # - MODE: off | restrict(선택 키워드를 가진 밴드 안에서만 검색) | boost(겹친 키워드 수만큼 점수 가산 후 재정렬)
+    # - MIN_OVERLAP: restrict에서 후보가 되려면 가져야 하는 선택 키워드 수 (선택 수보다 크면 선택 수)
+    # - MAX_DB_CANDIDATES: 임베딩 스냅샷 없이 DB에서 채점할 최대 후보 수 (넘으면 일반 검색)
+    # - BOOST: boost에서 (겹친 키워드 수 / 선택 키워드 수) × BOOST 만큼 유사도에 가산
+    # - BOOST_OVERFETCH: boost에서 재정렬을 위해 원래 검색 수의 몇 배를 가져올지
+    RECOMMEND_HYBRID_MODE: str = os.getenv("RECOMMEND_HYBRID_MODE", "off").lower()
+    RECOMMEND_HYBRID_MIN_OVERLAP: int = int(os.getenv("RECOMMEND_HYBRID_MIN_OVERLAP", "1"))
+    RECOMMEND_HYBRID_MAX_DB_CANDIDATES: int = int(os.getenv("RECOMMEND_HYBRID_MAX_DB_CANDIDATES", "5000"))
+    RECOMMEND_HYBRID_BOOST: float = float(os.getenv("RECOMMEND_HYBRID_BOOST", "0.05"))
+    RECOMMEND_HYBRID_BOOST_OVERFETCH: int = int(os.getenv("RECOMMEND_HYBRID_BOOST_OVERFETCH", "3"))
+
+    # 밴드 임베딩 스냅샷 (float32 .npy + mmap, uvicorn 워커 간 페이지 캐시 공유)
+    # - DIR: 워커들이 함께 읽는 디렉터리 (같은 호스트의 모든 워커가 접근 가능해야 함)
+    # - CHECK_INTERVAL: 새 스냅샷 버전(manifest.json) 확인 주기
+    EMBEDDING_SNAPSHOT_ENABLED: bool = os.getenv("EMBEDDING_SNAPSHOT_ENABLED", "false").lower() == "true"
+    EMBEDDING_SNAPSHOT_DIR: str = os.getenv("EMBEDDING_SNAPSHOT_DIR", "data/embedding_snapshot")
+    EMBEDDING_SNAPSHOT_CHECK_INTERVAL_SECONDS: float = float(os.getenv("EMBEDDING_SNAPSHOT_CHECK_INTERVAL_SECONDS", "5"))
+
+    # 추천 CPU 연산(K-means, Slerp 등) 전용 실행기
+    # - KIND: thread | process
+    # - QUEUE_SIZE: 실행 중인 작업 외에 대기할 수 있는 작업 수 (초과 시 503)
+    # - BLAS_THREADS: 작업자당 BLAS/OpenMP 스레드 수 (동시 요청 시 코어 과점유 방지)
+    RECOMMEND_EXECUTOR_KIND: str = os.getenv("RECOMMEND_EXECUTOR_KIND", "thread")
+    RECOMMEND_EXECUTOR_WORKERS: int = int(os.getenv("RECOMMEND_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+    RECOMMEND_EXECUTOR_QUEUE_SIZE: int = int(os.getenv("RECOMMEND_EXECUTOR_QUEUE_SIZE", "32"))
+    RECOMMEND_EXECUTOR_BLAS_THREADS: int = int(os.getenv("RECOMMEND_EXECUTOR_BLAS_THREADS", "1"))
+
+    # 추천 요청 시간 예산 (수락 대기 포함) - 넘을 것 같으면 키워드 반영 품질을 낮춰서라도 응답
+    # - RESERVE: 키워드 임베딩 이후 단계(검색/결합/저장)에 남겨둘 시간
+    RECOMMEND_DEADLINE_MS: float = float(os.getenv("RECOMMEND_DEADLINE_MS", "3000"))
+    RECOMMEND_DEADLINE_RESERVE_MS: float = float(os.getenv("RECOMMEND_DEADLINE_RESERVE_MS", "500"))
+    # 키워드 임베딩 (OpenAI) 호출
+    # - TIMEOUT: 호출 1회 최대 시간 (남은 예산이 더 적으면 그 값)
+    # - HEDGE: 첫 호출이 HEDGE_DELAY 안에 끝나지 않거나 실패하면 같은 요청을 한 번 더 보냄
+    # - PRECOMPUTE: 서버 시작 시 전체 키워드의 개별 벡터를 미리 계산 (시간 초과 시 평균으로 근사하는 데 사용)
+    KEYWORD_EMBEDDING_TIMEOUT_MS: float = float(os.getenv("KEYWORD_EMBEDDING_TIMEOUT_MS", "1500"))
+    KEYWORD_EMBEDDING_HEDGE_ENABLED: bool = os.getenv("KEYWORD_EMBEDDING_HEDGE_ENABLED", "false").lower() == "true"
+    KEYWORD_EMBEDDING_HEDGE_DELAY_MS: float = float(os.getenv("KEYWORD_EMBEDDING_HEDGE_DELAY_MS", "400"))
+    KEYWORD_EMBEDDING_MAX_WORKERS: int = int(os.getenv("KEYWORD_EMBEDDING_MAX_WORKERS", "16"))
+    KEYWORD_EMBEDDING_CACHE_MAX_SIZE: int = int(os.getenv("KEYWORD_EMBEDDING_CACHE_MAX_SIZE", "10000"))
+    KEYWORD_EMBEDDING_CACHE_TTL_SECONDS: float = float(os.getenv("KEYWORD_EMBEDDING_CACHE_TTL_SECONDS", "86400"))
+    KEYWORD_EMBEDDING_PRECOMPUTE: bool = os.getenv("KEYWORD_EMBEDDING_PRECOMPUTE", "false").lower() == "true"
+
+    # 자유 텍스트 밴드 추천 (/recommend/band)
+    # - MAX_TOP_K: 요청 top_k 상한 (넘으면 상한으로 잘라서 검색)
+    # - MAX_TEXT_CHARS: 정규화 후 임베딩에 쓰는 최대 글자 수
+    # - QUERY_EMBEDDING_CACHE: (모델, 정규화한 질의 텍스트) → 임베딩 캐시 (같은 질의는 OpenAI 호출 없이 검색)
+    RECOMMEND_BAND_MAX_TOP_K: int = int(os.getenv("RECOMMEND_BAND_MAX_TOP_K", "50"))
+    RECOMMEND_BAND_MAX_TEXT_CHARS: int = int(os.getenv("RECOMMEND_BAND_MAX_TEXT_CHARS", "1000"))
+    QUERY_EMBEDDING_CACHE_MAX_SIZE: int = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_SIZE", "10000"))
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: float = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "86400"))
+
+    # 요청 수락 제어 (엔드포인트 분류별 동시 처리 한도 + 대기열, 워커 프로세스 단위)
+    # - CONCURRENCY: 동시에 처리할 요청 수 (추천은 요청마다 DB 커넥션을 쓰므로 기본값은 풀 최대 크기)
+    # - QUEUE_SIZE / QUEUE_TIMEOUT_MS: 한도 초과 시 기다릴 수 있는 요청 수 / 최대 대기 시간 (넘으면 503, 관리용 임베딩은 429)
+    ADMISSION_CONTROL_ENABLED: bool = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+    ADMISSION_RECOMMEND_CONCURRENCY: int = int(os.getenv("ADMISSION_RECOMMEND_CONCURRENCY", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+    ADMISSION_RECOMMEND_QUEUE_SIZE: int = int(os.getenv("ADMISSION_RECOMMEND_QUEUE_SIZE", "32"))
+    ADMISSION_RECOMMEND_QUEUE_TIMEOUT_MS: float = float(os.getenv("ADMISSION_RECOMMEND_QUEUE_TIMEOUT_MS", "1000"))
+    ADMISSION_READ_CONCURRENCY: int = int(os.getenv("ADMISSION_READ_CONCURRENCY", "64"))
+    ADMISSION_READ_QUEUE_SIZE: int = int(os.getenv("ADMISSION_READ_QUEUE_SIZE", "128"))
+    ADMISSION_READ_QUEUE_TIMEOUT_MS: float = float(os.getenv("ADMISSION_READ_QUEUE_TIMEOUT_MS", "500"))
+    ADMISSION_EMBEDDING_ADMIN_CONCURRENCY: int = int(os.getenv("ADMISSION_EMBEDDING_ADMIN_CONCURRENCY", "1"))
+    ADMISSION_EMBEDDING_ADMIN_QUEUE_SIZE: int = int(os.getenv("ADMISSION_EMBEDDING_ADMIN_QUEUE_SIZE", "0"))
+    ADMISSION_EMBEDDING_ADMIN_QUEUE_TIMEOUT_MS: float = float(os.getenv("ADMISSION_EMBEDDING_ADMIN_QUEUE_TIMEOUT_MS", "0"))
+    ADMISSION_MAX_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_MAX_RETRY_AFTER_SECONDS", "30"))
+
     @property
     def DATABASE_URL(self) -> str:
         return (
-            f"postgresql+psycopg2://{self.DB_USERNAME}:{self.DB_PASSWORD}"
+            f"postgresql+{self.DB_DRIVER}://{self.DB_USERNAME}:{self.DB_PASSWORD}"
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
@@ -1,28 +1,160 @@
 # app/db.py
 import os
-from typing import Any
+import re
+import time
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Sequence
 from psycopg2.pool import SimpleConnectionPool
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, declarative_base
-
-from pgvector.psycopg2 import register_vector
+import numpy as np
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT
+
+# psycopg3 사용 여부 (DB_DRIVER=psycopg). psycopg 패키지는 이 경우에만 필요
+USE_PSYCOPG3 = settings.DB_DRIVER == "psycopg"
+
+if USE_PSYCOPG3:
+    from psycopg.rows import namedtuple_row
+    from pgvector.psycopg import register_vector
+else:
+    from pgvector.psycopg2 import register_vector
+
+logger = logging.getLogger(__name__)
+sql_logger = logging.getLogger("app.sql")
+
+
+class _PoolWaitStats:
+    """커넥션 풀 checkout 대기 시간 누적 통계 (풀이 재생성되어도 유지)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record(self, wait_ms: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avgWaitMs": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "maxWaitMs": round(self.max_wait_ms, 3),
+            }
+
+
+pool_wait_stats = _PoolWaitStats()
+
+
+class TimedQueuePool(QueuePool):
+    """checkout 대기 시간(풀이 꽉 찼을 때 기다린 시간 포함)을 기록하는 QueuePool"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_wait_stats.record((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        elapsed = time.perf_counter() - start
+        pool_wait_stats.record(elapsed * 1000, timed_out=False)
+        DB_POOL_CHECKOUT_WAIT.observe(elapsed)
+        return connection
+
+
+def _connect_args() -> Dict[str, Any]:
+    connect_args: Dict[str, Any] = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    if USE_PSYCOPG3:
+        connect_args["prepare_threshold"] = (
+            settings.DB_PREPARE_THRESHOLD if settings.DB_PREPARE_THRESHOLD >= 0 else None
+        )
+    return connect_args
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=True,   # 콘솔에 SQL 로그 보고 싶으면 True
-)
 
-@event.listens_for(engine, "connect")
 def connect(dbapi_connection, connection_record):
     register_vector(dbapi_connection)
 
+
+def _truncate_param(value: Any) -> str:
+    text_value = repr(value)
+    limit = settings.DB_ECHO_PARAM_MAX_LENGTH
+    if len(text_value) > limit:
+        return f"{text_value[:limit]}...({len(text_value)} chars)"
+    return text_value
+
+
+def _format_params(parameters: Any) -> str:
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k!r}: {_truncate_param(v)}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "[" + ", ".join(_truncate_param(p) for p in parameters) + "]"
+    return _truncate_param(parameters)
+
+
+def log_sql(conn, cursor, statement, parameters, context, executemany):
+    sql_logger.info(f"{statement}\n  params: {_format_params(parameters)}")
+
+
+def _create_engine(url: str, connect_args: Dict[str, Any]) -> Engine:
+    db_engine = create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # SQL 로그는 log_sql 리스너가 파라미터를 잘라서 남김 (echo=True는 1536차원 벡터를 그대로 출력)
+        echo=False,
+        connect_args=connect_args,
+    )
+    event.listen(db_engine, "connect", connect)
+    if settings.DB_ECHO:
+        event.listen(db_engine, "before_cursor_execute", log_sql)
+    return db_engine
+
+
+# 기본(primary) DB - 쓰기와 최신 데이터가 필요한 읽기
+engine = _create_engine(settings.DATABASE_URL, _connect_args())
+
+# 읽기 전용 복제본 - 벡터 검색/추천 읽기 분산 (연결 실패를 빨리 감지하도록 connect_timeout 지정)
+replica_engines: List[Engine] = [
+    _create_engine(url, {**_connect_args(), "connect_timeout": settings.DB_REPLICA_CONNECT_TIMEOUT_SECONDS})
+    for url in settings.DB_REPLICA_URL_LIST
+]
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+@event.listens_for(SessionLocal, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """세션에 지정된 statement_timeout을 트랜잭션마다 SET LOCAL로 적용"""
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -30,6 +162,308 @@ def get_db():
     finally:
         db.close()
 
+
+def get_db_with_timeout(timeout_ms: int) -> Callable[[], Iterator[Session]]:
+    """
+    statement_timeout을 적용한 세션을 주는 FastAPI 의존성 생성 (라우트별 타임아웃).
+
+    Args:
+        timeout_ms: 쿼리 최대 실행 시간 (0 이하면 전역 설정만 적용)
+    """
+    def _get_db():
+        db = SessionLocal()
+        if timeout_ms > 0:
+            db.info["statement_timeout_ms"] = timeout_ms
+        try:
+            yield db
+        finally:
+            db.close()
+    return _get_db
+
+
+# 추천 API용 세션 (벡터 검색이 오래 걸리면 커넥션을 붙잡지 않고 실패)
+get_recommend_db = get_db_with_timeout(settings.DB_RECOMMEND_STATEMENT_TIMEOUT_MS)
+
+
+# ============================================================
+# 읽기 복제본 라우팅
+# ============================================================
+
+# 복제본이면 재생 지연(초), primary면 0. 받은 WAL을 모두 재생했으면 쓰기가 없어 멈춘 것이므로 0
+_REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class _Replica:
+    def __init__(self, db_engine: Engine) -> None:
+        self.engine = db_engine
+        self.healthy = False
+        self.lag_seconds: float | None = None
+        self.sessions = 0
+
+
+class ReplicaRouter:
+    """
+    읽기 세션을 건강한 복제본에 라운드로빈으로 배정하고, 없으면 primary로 폴백.
+
+    - 백그라운드 스레드가 주기적으로 연결/복제 지연을 확인 (지연이 크면 제외)
+    - 쿼리 중 연결이 끊기면 즉시 제외하고 다음 확인 때 복구
+    - 방금 쓴 데이터를 읽어야 하는 키(회원)는 일정 시간 primary로 고정 (read-your-writes)
+    """
+
+    def __init__(
+        self,
+        replica_engines: List[Engine],
+        health_check_interval_seconds: float,
+        max_lag_seconds: float,
+        sticky_seconds: float,
+    ) -> None:
+        self.replicas = [_Replica(db_engine) for db_engine in replica_engines]
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+        self._next = 0
+        self._lock = threading.Lock()
+        self._recent_writes: Dict[str, float] = {}
+        self._checker: threading.Thread | None = None
+        self.primary_fallbacks = 0
+        self.sticky_reads = 0
+
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._make_error_handler(replica))
+
+    def _make_error_handler(self, replica: _Replica):
+        def handle_error(context):
+            if context.is_disconnect:
+                replica.healthy = False
+                logger.warning(f"[replica] 연결 끊김 → 제외: {replica.engine.url.host} ({context.original_exception})")
+        return handle_error
+
+    def start(self) -> None:
+        """첫 상태 확인 후 주기적 확인 스레드 시작 (복제본이 없으면 아무것도 하지 않음)"""
+        if not self.replicas or self._checker is not None:
+            return
+        self.check_all()
+        self._checker = threading.Thread(target=self._run_checks, name="replica-health", daemon=True)
+        self._checker.start()
+
+    def _run_checks(self) -> None:
+        while True:
+            time.sleep(self.health_check_interval_seconds)
+            self.check_all()
+
+    def check_all(self) -> None:
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    lag = float(conn.exec_driver_sql(_REPLICA_LAG_SQL).scalar() or 0)
+            except Exception as e:
+                if replica.healthy:
+                    logger.warning(f"[replica] 상태 확인 실패 → 제외: {replica.engine.url.host} ({e})")
+                replica.healthy = False
+                continue
+
+            replica.lag_seconds = round(lag, 3)
+            healthy = lag <= self.max_lag_seconds
+            if healthy != replica.healthy:
+                state = "복구" if healthy else f"복제 지연 {lag:.1f}s → 제외"
+                logger.info(f"[replica] {replica.engine.url.host}: {state}")
+            replica.healthy = healthy
+
+    def record_write(self, key: str) -> None:
+        """key(회원 등)의 데이터를 primary에 쓴 직후 호출 - sticky_seconds 동안 읽기를 primary로"""
+        with self._lock:
+            now = time.monotonic()
+            self._recent_writes[key] = now + self.sticky_seconds
+            # 만료된 항목 정리
+            if len(self._recent_writes) > 10000:
+                self._recent_writes = {k: t for k, t in self._recent_writes.items() if t > now}
+
+    def choose(self, sticky_key: str | None = None) -> Engine:
+        """읽기 세션에 사용할 엔진 선택"""
+        if not self.replicas:
+            return engine
+
+        if sticky_key is not None:
+            expires_at = self._recent_writes.get(sticky_key)
+            if expires_at is not None and expires_at > time.monotonic():
+                self.sticky_reads += 1
+                return engine
+
+        with self._lock:
+            for offset in range(len(self.replicas)):
+                replica = self.replicas[(self._next + offset) % len(self.replicas)]
+                if replica.healthy:
+                    self._next = (self._next + offset + 1) % len(self.replicas)
+                    replica.sessions += 1
+                    return replica.engine
+
+        self.primary_fallbacks += 1
+        return engine
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [
+                {
+                    # 접속 정보/오류 메시지는 로그에만 남기고 순번으로 구분
+                    "index": index,
+                    "healthy": replica.healthy,
+                    "lagSeconds": replica.lag_seconds,
+                    "sessions": replica.sessions,
+                }
+                for index, replica in enumerate(self.replicas)
+            ],
+            "primaryFallbacks": self.primary_fallbacks,
+            "stickyReads": self.sticky_reads,
+        }
+
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    health_check_interval_seconds=settings.DB_REPLICA_HEALTH_CHECK_SECONDS,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+)
+
+
+def open_read_session(timeout_ms: int = 0, sticky_key: str | None = None) -> Session:
+    """
+    읽기 전용 세션 생성 (건강한 복제본, 없거나 sticky_key가 방금 쓴 키면 primary).
+
+    Args:
+        timeout_ms: statement_timeout (0 이하면 전역 설정만 적용)
+        sticky_key: read-your-writes가 필요한 키 (예: 회원 externalId)
+    """
+    db = SessionLocal(bind=replica_router.choose(sticky_key))
+    if timeout_ms > 0:
+        db.info["statement_timeout_ms"] = timeout_ms
+    return db
+
+
+def open_replica_session(timeout_ms: int = 0) -> Session | None:
+    """
+    건강한 복제본이 있을 때만 복제본 세션 생성 (없으면 None - 호출자는 기존 primary 세션을 그대로 사용).
+
+    primary 세션을 이미 잡고 있는 요청이 같은 풀에서 커넥션을 하나 더 잡지 않도록 할 때 사용합니다.
+    """
+    replica_engine = replica_router.choose()
+    if replica_engine is engine:
+        return None
+    db = SessionLocal(bind=replica_engine)
+    if timeout_ms > 0:
+        db.info["statement_timeout_ms"] = timeout_ms
+    return db
+
+
+def get_read_db_with_timeout(timeout_ms: int) -> Callable[[], Iterator[Session]]:
+    """복제본으로 라우팅되는 읽기 전용 세션 FastAPI 의존성 생성"""
+    def _get_read_db():
+        db = open_read_session(timeout_ms)
+        try:
+            yield db
+        finally:
+            db.close()
+    return _get_read_db
+
+
+get_read_db = get_read_db_with_timeout(0)
+
+# 추천 API 읽기용 세션 (유사도 검색/결과 결합)
+get_recommend_read_db = get_read_db_with_timeout(settings.DB_RECOMMEND_STATEMENT_TIMEOUT_MS)
+
+
+# ============================================================
+# 드라이버별 실행 헬퍼 (psycopg3면 바이너리 전송/파이프라인 사용)
+# ============================================================
+
+def vector_param(values: Sequence[float]) -> np.ndarray:
+    """
+    pgvector 파라미터 변환.
+
+    psycopg3는 numpy 배열을 바이너리 vector로, psycopg2는 '[...]' 텍스트로 전송합니다.
+    """
+    return np.asarray(values, dtype=np.float32)
+
+
+@lru_cache(maxsize=128)
+def _to_pyformat(sql: str) -> str:
+    """text()용 :name 파라미터를 드라이버 커서용 %(name)s로 변환 (::type 캐스트는 유지)"""
+    return re.sub(r"(?<![:\w]):(\w+)", r"%(\1)s", sql.replace("%", "%%"))
+
+
+def _driver_connection(db: Session):
+    # 세션 트랜잭션에 참여한 커넥션 (after_begin의 SET LOCAL 등이 그대로 적용됨)
+    return db.connection().connection.driver_connection
+
+
+def execute_binary(db: Session, sql: str, params: Dict[str, Any]) -> List[Any]:
+    """
+    결과에 vector 컬럼이 있는 쿼리 실행.
+
+    psycopg3면 바이너리 커서로 실행해 임베딩을 텍스트 파싱 없이 numpy 배열로 받고,
+    psycopg2면 일반 text() 실행과 같습니다.
+
+    Returns:
+        속성으로 컬럼에 접근할 수 있는 행 리스트
+    """
+    if not USE_PSYCOPG3:
+        return db.execute(text(sql), params).fetchall()
+
+    with _driver_connection(db).cursor(binary=True, row_factory=namedtuple_row) as cur:
+        cur.execute(_to_pyformat(sql), params)
+        return cur.fetchall()
+
+
+def execute_pipelined(db: Session, sql: str, params_list: List[Dict[str, Any]]) -> List[List[Any]]:
+    """
+    서로 독립적인 같은 형태의 쿼리 여러 개를 실행.
+
+    psycopg3면 파이프라인 모드로 한 번에 보내 왕복을 1회로 줄이고,
+    psycopg2면 순서대로 실행합니다.
+
+    Returns:
+        params_list 순서대로 각 쿼리의 행 리스트
+    """
+    if not USE_PSYCOPG3 or len(params_list) < 2:
+        return [db.execute(text(sql), params).fetchall() for params in params_list]
+
+    connection = _driver_connection(db)
+    cursors = []
+    try:
+        with connection.pipeline():
+            for params in params_list:
+                cur = connection.cursor(binary=True, row_factory=namedtuple_row)
+                cur.execute(_to_pyformat(sql), params)
+                cursors.append(cur)
+        return [cur.fetchall() for cur in cursors]
+    finally:
+        for cur in cursors:
+            cur.close()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """커넥션 풀 크기/사용 중 커넥션 수/checkout 대기 시간 통계 (대기 시간은 전체 엔진 합계)"""
+    def _pool_info(db_engine: Engine) -> Dict[str, Any]:
+        pool = db_engine.pool
+        return {
+            "poolSize": pool.size(),
+            "checkedOut": pool.checkedout(),
+            "checkedIn": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+
+    return {
+        **_pool_info(engine),
+        "maxOverflow": settings.DB_MAX_OVERFLOW,
+        **pool_wait_stats.snapshot(),
+        "replicaPools": [_pool_info(db_engine) for db_engine in replica_engines],
+        "replicaRouting": replica_router.stats(),
+    }
+
 # load_dotenv()
 
 # DATABASE_URL = os.getenv("DATABASE_URL")
@@ -0,0 +1,79 @@
+# app/core/deadline.py
+"""
+요청별 시간 예산 (deadline).
+
+미들웨어가 요청 시작 시 예산을 정하면, 같은 요청 안에서 호출되는 단계(키워드 임베딩 등)는
+remaining()으로 남은 시간을 확인해 외부 호출 타임아웃을 정하고, 시간이 없으면 품질을 낮춰 응답합니다.
+ContextVar를 사용하므로 스레드 풀에서 실행되는 동기 라우트에도 그대로 전달됩니다.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# 요청 마감 시각 (time.monotonic 기준, 예산이 없으면 None)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def start(budget_seconds: float) -> Token:
+    """지금부터 budget_seconds 뒤를 마감으로 설정 (이미 더 빠른 마감이 있으면 유지)"""
+    deadline_at = time.monotonic() + budget_seconds
+    current = _deadline.get()
+    if current is not None and current < deadline_at:
+        deadline_at = current
+    return _deadline.set(deadline_at)
+
+
+def reset(token: Token) -> None:
+    _deadline.reset(token)
+
+
+@contextmanager
+def budget(budget_seconds: Optional[float]) -> Iterator[None]:
+    """with 블록 동안 시간 예산 적용 (None이나 0 이하면 예산 없음)"""
+    if not budget_seconds or budget_seconds <= 0:
+        yield
+        return
+    token = start(budget_seconds)
+    try:
+        yield
+    finally:
+        reset(token)
+
+
+def remaining() -> Optional[float]:
+    """남은 시간(초, 음수 가능). 예산이 없는 요청이면 None"""
+    deadline_at = _deadline.get()
+    if deadline_at is None:
+        return None
+    return deadline_at - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+class RequestDeadlineMiddleware:
+    """
+    지정한 경로 접두사의 요청에 시간 예산 적용 (수락 대기 시간 포함하도록 수락 제어보다 바깥에 둠).
+
+    Args:
+        app: ASGI 앱
+        path_prefixes: 예산을 적용할 경로 접두사들
+        budget_seconds: 요청당 시간 예산 (초)
+    """
+
+    def __init__(self, app: ASGIApp, path_prefixes: Tuple[str, ...], budget_seconds: float) -> None:
+        self.app = app
+        self.path_prefixes = path_prefixes
+        self.budget_seconds = budget_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+        with budget(self.budget_seconds):
+            await self.app(scope, receive, send)
@@ -0,0 +1,74 @@
+# app/core/diagnostics.py
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+# 요청별 진단 이벤트 수집 목록 (trace()로 켠 요청에서만 존재)
+_events: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("diagnostic_events", default=None)
+
+
+def enabled(logger: logging.Logger) -> bool:
+    """
+    진단용 추가 연산(norm, 유사도 등)을 해야 하는지 여부.
+
+    요청별 trace가 켜져 있거나 logger가 DEBUG 레벨일 때만 True.
+    호출자는 이 값이 False면 진단용 계산 자체를 건너뛰어야 합니다.
+    """
+    return _events.get() is not None or logger.isEnabledFor(logging.DEBUG)
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    return value
+
+
+def emit(logger: logging.Logger, event: str, **fields: Any) -> None:
+    """
+    구조화된 진단 이벤트 기록.
+
+    - trace 중인 요청이면 이벤트 목록에 추가 (debug 응답에 포함)
+    - logger가 DEBUG 레벨이면 지연 포맷팅으로 로그 출력
+
+    Args:
+        logger: 이벤트를 남길 모듈 logger
+        event: 이벤트 이름 (예: "keyword_blend.slerp")
+        **fields: 이벤트 값 (numpy 값은 파이썬 기본 타입으로 변환)
+    """
+    events = _events.get()
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if events is None and not debug:
+        return
+
+    payload = {key: _to_jsonable(value) for key, value in fields.items()}
+    if events is not None:
+        events.append({"event": event, **payload})
+    if debug:
+        logger.debug("[diag] %s %s", event, payload)
+
+
+@contextmanager
+def trace(active: bool = True) -> Iterator[Optional[List[Dict[str, Any]]]]:
+    """
+    요청 단위로 진단 이벤트 수집 (active=False면 아무것도 하지 않음).
+
+    Yields:
+        수집된 이벤트 목록 (active=False면 None)
+    """
+    if not active:
+        yield None
+        return
+
+    events: List[Dict[str, Any]] = []
+    token = _events.set(events)
+    try:
+        yield events
+    finally:
+        _events.reset(token)
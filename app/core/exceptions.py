@@ -5,10 +5,11 @@ from fastapi.responses import JSONResponse
 
 class CustomHTTPException(HTTPException):
     """커스텀 에러 응답 형식을 위한 기본 클래스"""
-    def __init__(self, status_code: int, message: str):
+    def __init__(self, status_code: int, message: str, headers: dict | None = None):
         super().__init__(
             status_code=status_code,
-            detail={"statusCode": status_code, "message": message}
+            detail={"statusCode": status_code, "message": message},
+            headers=headers,
         )
 
 
@@ -39,6 +40,16 @@ class MemberNotFoundException(CustomHTTPException):
         )
 
 
+class ServerBusyException(CustomHTTPException):
+    """추천 연산 작업 큐가 가득 찼을 때 발생하는 예외 (잠시 후 재시도)"""
+    def __init__(self, retry_after_seconds: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message="요청이 많아 추천을 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(retry_after_seconds)},
+        )
+
+
 class InvalidTokenException(HTTPException):
     """토큰이 유효하지 않을 때 발생하는 예외"""
     def __init__(self, message: str = "유효하지 않은 토큰입니다."):
@@ -47,3 +58,12 @@ class InvalidTokenException(HTTPException):
             detail={"statusCode": status.HTTP_401_UNAUTHORIZED, "message": message},
             headers={"WWW-Authenticate": "Bearer"}
         )
+
+
+class OpsAccessDeniedException(CustomHTTPException):
+    """운영용 API(/metrics, /api/ops/*)에 X-Profile-Token 없이 접근할 때 발생하는 예외"""
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            message="운영용 API 접근 권한이 없습니다."
+        )
@@ -0,0 +1,108 @@
+# app/core/executor.py
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.exceptions import ServerBusyException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _limit_native_threads(blas_threads: int) -> None:
+    """BLAS/OpenMP 스레드 수 제한 (threadpoolctl은 scikit-learn 의존성으로 함께 설치됨)"""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        logger.warning("threadpoolctl이 없어 BLAS/OpenMP 스레드 수를 제한하지 못했습니다.")
+        return
+    threadpool_limits(limits=blas_threads)
+
+
+class CPUExecutor:
+    """
+    추천 CPU 연산용 제한된 작업자 풀.
+
+    - 동시에 실행 + 대기할 수 있는 작업 수를 max_workers + queue_size로 제한하고,
+      초과하면 기다리지 않고 ServerBusyException(503)을 발생시킵니다.
+    - 작업자의 BLAS/OpenMP 스레드 수를 제한해 여러 요청이 동시에
+      클러스터링할 때 코어를 과점유하지 않도록 합니다.
+    """
+
+    def __init__(self, kind: str, max_workers: int, queue_size: int, blas_threads: int) -> None:
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.queue_size = max(0, queue_size)
+        self.blas_threads = max(1, blas_threads)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_size)
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self.rejected = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            initializer=_limit_native_threads,
+                            initargs=(self.blas_threads,),
+                        )
+                    else:
+                        # 스레드 풀은 같은 프로세스이므로 프로세스 전체에 한 번 적용
+                        _limit_native_threads(self.blas_threads)
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="recommend-cpu",
+                        )
+                    logger.info(
+                        f"[executor] {self.kind} 풀 시작 - workers={self.max_workers}, "
+                        f"queue={self.queue_size}, blas_threads={self.blas_threads}"
+                    )
+        return self._pool
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        fn(*args)를 작업자 풀에서 실행하고 결과를 기다림 (요청 처리 스레드에서 호출).
+
+        process 모드에서는 fn과 인자가 pickle 가능해야 합니다 (모듈 최상위 함수 + NumPy 배열).
+
+        Raises:
+            ServerBusyException: 실행/대기 슬롯이 모두 찬 경우
+        """
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            logger.warning("[executor] 작업 큐 가득 참 → 요청 거절")
+            raise ServerBusyException()
+        try:
+            return self._get_pool().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def warmup(self, fn: Callable[..., Any], *args: Any) -> None:
+        """
+        작업자를 모두 미리 띄우고 fn(*args)를 작업자 수만큼 실행 (모듈 임포트, BLAS 초기화).
+        서버 시작 시에만 호출하므로 대기 슬롯 제한을 적용하지 않습니다.
+        """
+        pool = self._get_pool()
+        futures = [pool.submit(fn, *args) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+cpu_executor = CPUExecutor(
+    kind=settings.RECOMMEND_EXECUTOR_KIND,
+    max_workers=settings.RECOMMEND_EXECUTOR_WORKERS,
+    queue_size=settings.RECOMMEND_EXECUTOR_QUEUE_SIZE,
+    blas_threads=settings.RECOMMEND_EXECUTOR_BLAS_THREADS,
+)
@@ -0,0 +1,172 @@
+# app/core/metrics.py
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.core import profiling
+
+# 추천 API 지연 분포에 맞춘 버킷 (초) - 캐시 적중(수 ms)부터 OpenAI 호출 포함 요청(수 초)까지
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP 요청 처리 시간 (라우트 템플릿 기준)",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+STAGE_LATENCY = Histogram(
+    "recommend_stage_duration_seconds",
+    "추천 처리 단계별 소요 시간",
+    ["version", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+OPENAI_REQUESTS = Counter(
+    "openai_requests_total",
+    "OpenAI API 호출 수 (결과별)",
+    ["operation", "outcome"],
+)
+
+OPENAI_LATENCY = Histogram(
+    "openai_request_duration_seconds",
+    "OpenAI API 호출 시간",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# HTTP 호출 단위 (SDK 재시도 포함) - connection=new면 새 TCP 연결, reused면 keep-alive 재사용
+OPENAI_HTTP_LATENCY = Histogram(
+    "openai_http_request_duration_seconds",
+    "OpenAI HTTP 호출 시간 (응답 헤더 수신까지)",
+    ["status", "connection"],
+    buckets=LATENCY_BUCKETS,
+)
+
+OPENAI_TOKENS = Counter(
+    "openai_tokens_total",
+    "OpenAI API 사용 토큰 수",
+    ["operation"],
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "DB 커넥션 풀 checkout 대기 시간",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+KEYWORD_EMBEDDING_OUTCOMES = Counter(
+    "keyword_embedding_total",
+    "키워드 임베딩 조회 결과 (cache | openai | hedge | keyword_cache | unavailable)",
+    ["source"],
+)
+
+RECOMMEND_DEGRADED = Counter(
+    "recommend_degraded_total",
+    "시간 예산 초과/실패로 품질을 낮춰 응답한 추천 수",
+    ["version", "reason"],
+)
+
+RECOMMEND_HYBRID_OUTCOMES = Counter(
+    "recommend_hybrid_total",
+    "키워드 하이브리드 검색 결과 (restricted | fallback | boosted)",
+    ["version", "outcome"],
+)
+
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "요청 수락/거절 수 (엔드포인트 분류별)",
+    ["endpoint_class", "outcome"],
+)
+
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "수락 전 대기열에서 기다린 시간",
+    ["endpoint_class"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+# 멀티프로세스 모드에서는 살아 있는 워커 값의 합
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "처리 중인 요청 수",
+    ["endpoint_class"],
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_QUEUED = Gauge(
+    "admission_queued",
+    "대기열에서 기다리는 요청 수",
+    ["endpoint_class"],
+    multiprocess_mode="livesum",
+)
+
+
+@contextmanager
+def observe_stage(stage: str, version: str = "-") -> Iterator[None]:
+    """with 블록 실행 시간을 추천 단계 히스토그램(과 프로파일링 중인 요청)에 기록 (예외가 나도 기록)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.labels(version=version, stage=stage).observe(elapsed)
+        profiling.record_stage(stage, elapsed)
+
+
+class RuntimeStatsCollector:
+    """
+    스크레이프 시점에 DB 풀/캐시 통계를 읽어 메트릭으로 변환하는 collector.
+
+    통계는 이미 각 컴포넌트가 집계하고 있으므로 요청 경로에서 추가로 기록하지 않습니다.
+
+    Args:
+        pool_stats: get_pool_stats (app.core.db)
+        cache_stats: get_cache_stats (app.core.cache)
+    """
+
+    def __init__(
+        self,
+        pool_stats: Callable[[], Dict[str, Any]],
+        cache_stats: Callable[[], Dict[str, Dict[str, Any]]],
+    ) -> None:
+        self._pool_stats = pool_stats
+        self._cache_stats = cache_stats
+
+    def collect(self):
+        pool = self._pool_stats()
+        pools = [("primary", pool)] + [
+            (f"replica{i}", replica_pool) for i, replica_pool in enumerate(pool.get("replicaPools", []))
+        ]
+
+        size = GaugeMetricFamily("db_pool_size", "커넥션 풀 크기", labels=["pool"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "사용 중 커넥션 수", labels=["pool"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "pool_size를 넘어 연 커넥션 수", labels=["pool"])
+        for name, stats in pools:
+            size.add_metric([name], stats["poolSize"])
+            checked_out.add_metric([name], stats["checkedOut"])
+            overflow.add_metric([name], stats["overflow"])
+        yield size
+        yield checked_out
+        yield overflow
+
+        timeouts = CounterMetricFamily("db_pool_checkout_timeouts", "커넥션 풀 checkout 타임아웃 수")
+        timeouts.add_metric([], pool["timeouts"])
+        yield timeouts
+
+        hits = CounterMetricFamily("cache_hits", "캐시 적중 수", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "캐시 미스 수", labels=["cache"])
+        hit_ratio = GaugeMetricFamily("cache_hit_ratio", "캐시 누적 적중률", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "캐시 항목 수", labels=["cache"])
+        for name, stats in self._cache_stats().items():
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            hit_ratio.add_metric([name], stats["hitRate"])
+            entries.add_metric([name], stats["size"])
+        yield hits
+        yield misses
+        yield hit_ratio
+        yield entries
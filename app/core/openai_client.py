@@ -0,0 +1,212 @@
+# app/core/openai_client.py
+"""
+프로세스 전체가 공유하는 OpenAI 클라이언트 + HTTP 전송 계층.
+
+- keep-alive 커넥션 풀 크기, 연결/읽기 타임아웃, 재시도 횟수, HTTP/2, base URL을 설정으로 조정
+- 재시도 간격은 OpenAI SDK의 지수 백오프(+지터)를 사용
+- HTTP 호출마다 지연 시간과 새 연결 여부(keep-alive 재사용 여부)를 기록해 풀/타임아웃 튜닝에 사용
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+import numpy as np
+from openai import OpenAI
+
+from app.core.config import settings
+from app.core.metrics import OPENAI_HTTP_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# 백분위 계산에 쓰는 최근 호출 수
+_RECENT_WINDOW = 1024
+
+
+class OpenAITransportStats:
+    """HTTP 호출 단위 통계 (SDK 재시도도 각각 한 번의 호출로 집계)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._recent: Deque[float] = deque(maxlen=_RECENT_WINDOW)
+        self.calls = 0
+        self.new_connections = 0
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, seconds: float, status: str, new_connection: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self._recent.append(seconds)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if new_connection:
+                self.new_connections += 1
+
+    def record_error(self, seconds: float, error: str, new_connection: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self._recent.append(seconds)
+            self.errors[error] = self.errors.get(error, 0) + 1
+            if new_connection:
+                self.new_connections += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = np.array(self._recent) * 1000
+            calls = self.calls
+            new_connections = self.new_connections
+            errors = dict(self.errors)
+            statuses = dict(self.statuses)
+
+        stats: Dict[str, Any] = {
+            "calls": calls,
+            "newConnections": new_connections,
+            "connectionReuseRate": round(1 - new_connections / calls, 4) if calls else None,
+            "statuses": statuses,
+            "errors": errors,
+        }
+        if recent.size:
+            p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+            stats["recentMs"] = {
+                "count": int(recent.size),
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "max": round(float(recent.max()), 3),
+            }
+        return stats
+
+
+transport_stats = OpenAITransportStats()
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """
+    호출마다 소요 시간과 새 TCP 연결 여부를 기록하는 httpx 전송 계층.
+    새 연결 여부는 httpcore trace 이벤트(connection.connect_tcp)로 판단합니다.
+    """
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        connected = []
+        user_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                connected.append(True)
+            if user_trace is not None:
+                user_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        start = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except httpx.HTTPError as e:
+            elapsed = time.perf_counter() - start
+            error = type(e).__name__
+            transport_stats.record_error(elapsed, error, bool(connected))
+            OPENAI_HTTP_LATENCY.labels(
+                status=error, connection="new" if connected else "reused"
+            ).observe(elapsed)
+            raise
+
+        # 응답 헤더까지 받은 시점 기준 (임베딩 응답 본문은 작아서 대부분 함께 도착)
+        elapsed = time.perf_counter() - start
+        transport_stats.record(elapsed, str(response.status_code), bool(connected))
+        OPENAI_HTTP_LATENCY.labels(
+            status=str(response.status_code), connection="new" if connected else "reused"
+        ).observe(elapsed)
+        return response
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_http_client() -> httpx.Client:
+    """설정값으로 keep-alive 풀/타임아웃/HTTP 버전을 정한 httpx 클라이언트 생성"""
+    http2 = settings.OPENAI_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("[openai] OPENAI_HTTP2=true지만 h2 패키지가 없어 HTTP/1.1 사용 (pip install 'httpx[http2]')")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    return httpx.Client(
+        transport=InstrumentedTransport(limits=limits, http2=http2),
+        timeout=openai_timeout(),
+        follow_redirects=True,
+    )
+
+
+def openai_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+        read=settings.OPENAI_READ_TIMEOUT_SECONDS,
+        write=settings.OPENAI_READ_TIMEOUT_SECONDS,
+        pool=settings.OPENAI_POOL_TIMEOUT_SECONDS,
+    )
+
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """
+    공유 OpenAI 클라이언트 (첫 호출 때 생성).
+
+    Raises:
+        RuntimeError: OPENAI_API_KEY가 없는 경우
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if not settings.has_openai_key:
+                    raise RuntimeError("OPENAI_API_KEY가 설정되어 있지 않습니다.")
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_BASE_URL or None,
+                    timeout=openai_timeout(),
+                    max_retries=settings.OPENAI_MAX_RETRIES,
+                    http_client=build_http_client(),
+                )
+                logger.info(
+                    f"[openai] 클라이언트 생성 - base_url={_client.base_url}, "
+                    f"max_connections={settings.OPENAI_MAX_CONNECTIONS}, http2={settings.OPENAI_HTTP2}, "
+                    f"max_retries={settings.OPENAI_MAX_RETRIES}"
+                )
+    return _client
+
+
+def close_openai_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def get_openai_transport_stats() -> Dict[str, Any]:
+    return {
+        "config": {
+            "baseUrl": settings.OPENAI_BASE_URL or None,
+            "maxConnections": settings.OPENAI_MAX_CONNECTIONS,
+            "maxKeepaliveConnections": settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            "keepaliveExpirySeconds": settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+            "connectTimeoutSeconds": settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+            "readTimeoutSeconds": settings.OPENAI_READ_TIMEOUT_SECONDS,
+            "maxRetries": settings.OPENAI_MAX_RETRIES,
+            "http2": settings.OPENAI_HTTP2,
+        },
+        "transport": transport_stats.snapshot(),
+    }
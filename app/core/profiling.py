@@ -0,0 +1,239 @@
+# app/core/profiling.py
+import sys
+import time
+import random
+import logging
+import hmac
+import threading
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 현재 요청의 프로파일 (프로파일링 대상 요청에서만 존재)
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+class _StackSampler:
+    """
+    대상 스레드의 호출 스택을 일정 간격으로 수집하는 샘플링 프로파일러.
+
+    요청 처리 스레드를 멈추지 않고 별도 스레드에서 sys._current_frames()를 읽으므로
+    결정적 프로파일러(cProfile)보다 오버헤드가 작습니다.
+    """
+
+    def __init__(self, thread_id: int, interval_seconds: float, max_depth: int) -> None:
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.max_depth = max_depth
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+# tracemalloc은 프로세스 전역이므로 동시에 메모리 프로파일링하는 요청 수를 세어 마지막 요청이 끔
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc() -> bool:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            # 다른 곳에서 이미 켜둔 경우 건드리지 않음
+            return False
+        if _tracemalloc_users == 0:
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+        _tracemalloc_users += 1
+        return True
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class RequestProfile:
+    """
+    요청 하나의 단계별 소요 시간과 (선택) 호출 스택/메모리 할당 프로파일.
+
+    Args:
+        detailed: True면 호출 스택 샘플링 (bind_current_thread() 이후)
+        memory: True면 tracemalloc으로 할당 통계 수집
+        sampled: 샘플링으로 선택된 요청 여부 (명시적 요청이면 False)
+    """
+
+    def __init__(self, detailed: bool = False, memory: bool = False, sampled: bool = False) -> None:
+        self.detailed = detailed
+        self.memory = memory
+        self.sampled = sampled
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._sampler: Optional[_StackSampler] = None
+        self._tracing_memory = False
+        self._memory_start: Optional[tracemalloc.Snapshot] = None
+        self._report: Optional[Dict[str, Any]] = None
+
+        if self.memory:
+            self._tracing_memory = _start_tracemalloc()
+            if self._tracing_memory:
+                tracemalloc.reset_peak()
+                self._memory_start = tracemalloc.take_snapshot()
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def bind_current_thread(self) -> None:
+        """호출한 스레드(요청 처리 스레드)를 호출 스택 샘플링 대상으로 지정"""
+        if not self.detailed or self._sampler is not None:
+            return
+        self._sampler = _StackSampler(
+            threading.get_ident(),
+            interval_seconds=settings.PROFILE_STACK_INTERVAL_MS / 1000,
+            max_depth=settings.PROFILE_STACK_MAX_DEPTH,
+        )
+        self._sampler.start()
+
+    def report(self) -> Dict[str, Any]:
+        """호출 스택/메모리 프로파일을 마무리하고 결과 반환 (여러 번 호출해도 한 번만 수집)"""
+        if self._report is not None:
+            return self._report
+
+        report: Dict[str, Any] = {
+            "stagesMs": {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+        }
+
+        if self._sampler is not None:
+            self._sampler.stop()
+            report["stack"] = {
+                "intervalMs": settings.PROFILE_STACK_INTERVAL_MS,
+                "samples": self._sampler.samples,
+                "top": [
+                    {"stack": stack, "samples": count}
+                    for stack, count in self._sampler.stacks.most_common(settings.PROFILE_TOP_N)
+                ],
+            }
+
+        if self._tracing_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            diff = tracemalloc.take_snapshot().compare_to(self._memory_start, "lineno")
+            _stop_tracemalloc()
+            self._tracing_memory = False
+            report["memory"] = {
+                "currentBytes": current,
+                "peakBytes": peak,
+                "top": [
+                    {"location": str(stat.traceback[0]), "sizeDiffBytes": stat.size_diff, "countDiff": stat.count_diff}
+                    for stat in diff[:settings.PROFILE_TOP_N]
+                ],
+            }
+
+        self._report = report
+        return report
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing 헤더 값 (단계별 + 전체 소요 시간, ms)"""
+        entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages.items()]
+        entries.append(f"total;dur={total_seconds * 1000:.3f}")
+        return ", ".join(entries)
+
+
+def current() -> Optional[RequestProfile]:
+    """현재 요청의 프로파일 (프로파일링 대상이 아니면 None)"""
+    return _current.get()
+
+
+def activate(profile: Optional[RequestProfile]):
+    return _current.set(profile)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """프로파일링 중인 요청이면 단계 소요 시간 기록 (아니면 아무것도 하지 않음)"""
+    profile = _current.get()
+    if profile is not None:
+        profile.record_stage(stage, seconds)
+
+
+def bind_current_thread() -> None:
+    """프로파일링 중인 요청이면 현재 스레드를 호출 스택 샘플링 대상으로 지정"""
+    profile = _current.get()
+    if profile is not None:
+        profile.bind_current_thread()
+
+
+def is_internal_caller(token: Optional[str]) -> bool:
+    """
+    명시적 프로파일링을 허용할 호출자인지 확인 (X-Profile-Token이 PROFILE_TOKEN과 일치해야 함).
+
+    nginx 뒤에서는 모든 공개 요청이 loopback/도커 게이트웨이 IP로 보이므로 IP 대역으로는 판단하지 않으며,
+    PROFILE_TOKEN이 비어 있으면 명시적 프로파일링은 항상 거부합니다.
+    """
+    if not settings.PROFILE_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), settings.PROFILE_TOKEN.encode("utf-8"))
+
+
+def select_profile(
+    requested: Optional[str],
+    client_host: Optional[str],
+    token: Optional[str],
+) -> Optional[RequestProfile]:
+    """
+    요청의 프로파일링 여부 결정.
+
+    Args:
+        requested: 헤더/쿼리로 요청한 모드 ("1"/"true": 단계 + 호출 스택, "memory": + 메모리)
+        client_host: 호출자 IP
+        token: X-Profile-Token 헤더 값
+
+    Returns:
+        RequestProfile 또는 None (프로파일링하지 않음)
+    """
+    if requested and requested.lower() not in ("0", "false"):
+        if is_internal_caller(token):
+            return RequestProfile(detailed=True, memory=requested.lower() == "memory")
+        logger.warning(f"[profile] 허용되지 않은 호출자의 프로파일링 요청 무시: {client_host}")
+
+    if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return RequestProfile(sampled=True)
+    return None
+
+
+def log_sampled(profile: RequestProfile, method: str, path: str, status: int, total_seconds: float) -> None:
+    """샘플링된 요청의 단계별 소요 시간을 로그로 남김 (응답 헤더를 볼 사람이 없으므로)"""
+    stages = {stage: round(seconds * 1000, 3) for stage, seconds in profile.stages.items()}
+    logger.info(
+        "[profile] %s %s %d total=%.3fms stages=%s",
+        method, path, status, total_seconds * 1000, stages,
+    )
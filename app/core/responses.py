@@ -0,0 +1,56 @@
+# app/core/responses.py
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+# numpy 배열/스칼라(임베딩 등)를 그대로 직렬화, dict 키가 int여도 허용
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson 기반 JSON 응답 (모든 라우터의 기본 응답 클래스).
+    표준 json 모듈보다 직렬화가 빠르고, 1536차원 임베딩 같은 float 리스트에서 차이가 큼.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def dumps(content: Any) -> bytes:
+    """FastJSONResponse와 같은 옵션으로 직렬화 (캐시에 직렬화된 본문을 보관할 때 사용)"""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def trusted_response(
+    model: BaseModel,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """
+    서버가 직접 만든 응답 모델을 검증 없이 바로 직렬화.
+
+    라우트에서 Response를 반환하면 FastAPI의 response_model 재검증과 jsonable_encoder 변환을
+    건너뛰므로, model_construct로 만든 모델(DB/캐시 값 → 응답)에만 사용합니다.
+    response_model은 OpenAPI 문서용으로 그대로 둡니다.
+
+    Args:
+        model: 응답 모델 (model_construct로 생성)
+        status_code: HTTP 상태 코드
+        headers: 추가 응답 헤더
+
+    Returns:
+        orjson으로 직렬화된 응답
+    """
+    return FastJSONResponse(model.model_dump(), status_code=status_code, headers=headers)
+
+
+def raw_json_response(
+    body: bytes,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """이미 직렬화된 JSON 본문을 그대로 반환 (캐시된 응답용)"""
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -1,33 +1,220 @@
 # app/main.py
-from fastapi import FastAPI, HTTPException
+import os
+import time
+import logging
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client import multiprocess
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import Session
 from app.api.embedding_routes import router as embedding_router
 from app.api.band_routes import router as band_router
+from app.api.ops_routes import router as ops_router
 from app.core.config import settings
+from app.core.admission import AdmissionControlMiddleware
+from app.core.auth import require_ops_token
+from app.core.compression import CompressionMiddleware
+from app.core.deadline import RequestDeadlineMiddleware
+from app.core.responses import FastJSONResponse, trusted_response
+from app.core.cache import get_cache_stats
+from app.core.db import Base, SessionLocal, engine, replica_router, get_pool_stats, get_recommend_read_db
+from app.core import profiling
+from app.core.metrics import HTTP_REQUEST_LATENCY, RuntimeStatsCollector
+from app.core.executor import cpu_executor
+from app.core.openai_client import close_openai_client
+from app.repositories.band_description_repository import detect_band_recommend_upsert_support
+from app.services.catalog_generation import catalog_generation
+from app.services.keyword_embedding_service import keyword_embedding_service
+from app.services.warmup import run_warmup, skip_warmup, warmup_state
 
 from app.schemas.schemas import RecommendBandRequest, RecommendBandResponse, BandItem
-from app.services.services import recommend_bands, EMBEDDING_MODEL
+from app.services.services import recommend_bands
 
 import app.models  
+from app.models import AI_OWNED_TABLES
+
+# 애플리케이션 로그 설정 (DEBUG면 추천 연산 진단 이벤트도 로그로 출력)
+logging.basicConfig(level=settings.LOG_LEVEL)
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Band Recommender AI Service",
     description="사용자 음악 취향 텍스트 기반 밴드 추천 API",
     version="0.1.0",
+    # 모든 라우터의 기본 응답 클래스 (orjson 직렬화)
+    default_response_class=FastJSONResponse,
 )
 
 app.include_router(embedding_router, prefix="/api")
 app.include_router(band_router, prefix="/api")
+app.include_router(ops_router, prefix="/api")
+
+
+@app.on_event("startup")
+def create_ai_owned_tables():
+    """
+    AI 서버가 관리하는 테이블(band_neighbors 등)이 없으면 생성.
+    나머지 테이블은 Spring 서버가 관리하므로 건드리지 않음 (스키마 변경은 migrations/spring 참고).
+    """
+    try:
+        Base.metadata.create_all(bind=engine, tables=AI_OWNED_TABLES)
+    except Exception as e:
+        logger.error(f"AI 서버 테이블 생성 실패: {e}")
+
+
+@app.on_event("startup")
+def detect_band_recommend_upsert():
+    """band_recommend (member_id, priority) 유일 인덱스 확인 → 추천 저장 방식 결정"""
+    db = SessionLocal()
+    try:
+        detect_band_recommend_upsert_support(db)
+    except Exception as e:
+        # 확인하지 못하면 인덱스가 없을 때와 같은 삭제 후 재삽입 방식 사용
+        logger.error(f"band_recommend 유일 인덱스 확인 실패: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def start_replica_health_checks():
+    """읽기 복제본 상태 확인 시작 (DB_REPLICA_URLS가 없으면 모든 읽기가 primary)"""
+    try:
+        replica_router.start()
+    except Exception as e:
+        logger.error(f"읽기 복제본 상태 확인 시작 실패: {e}")
+
+
+@app.on_event("startup")
+def start_catalog_generation_poll():
+    """카탈로그 워터마크 첫 확인 + 주기적 확인 스레드 시작 (요청 경로에서는 DB 조회 없이 세대만 읽음)"""
+    try:
+        catalog_generation.start()
+    except Exception as e:
+        logger.error(f"카탈로그 워터마크 확인 시작 실패: {e}")
 
+
+@app.on_event("startup")
+def warm_up():
+    """
+    커넥션 풀/벡터 쿼리/클러스터링 작업자/캐시를 미리 준비 (결과는 /ready로 확인).
+    WARMUP_ENABLED=false면 건너뛰고 첫 요청 때 각각 초기화됨.
+    """
+    if not settings.WARMUP_ENABLED:
+        skip_warmup()
+        return
+    run_warmup()
+
+
+@app.on_event("shutdown")
+def shutdown_cpu_executor():
+    """추천 CPU 연산 / 키워드 임베딩 작업자 풀, OpenAI 커넥션 풀 종료"""
+    cpu_executor.shutdown()
+    keyword_embedding_service.shutdown()
+    close_openai_client()
+
+
+# DB 풀/캐시 통계는 스크레이프 시점에 읽음
+REGISTRY.register(RuntimeStatsCollector(get_pool_stats, get_cache_stats))
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """라우트 템플릿(/api/bands/{band_id} 등) 기준으로 요청 처리 시간 기록"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        if path != "/metrics":
+            HTTP_REQUEST_LATENCY.labels(
+                method=request.method, route=path, status=str(status)
+            ).observe(time.perf_counter() - start)
+
+
+@app.middleware("http")
+async def profile_recommendation_requests(request: Request, call_next):
+    """
+    추천 API 요청별 프로파일링 (명시적 요청 또는 샘플링).
+    대상 요청은 단계별 소요 시간을 Server-Timing 헤더로 반환.
+    """
+    if not request.url.path.startswith(settings.PROFILE_PATH_PREFIX):
+        return await call_next(request)
+
+    profile = profiling.select_profile(
+        requested=request.headers.get("x-profile") or request.query_params.get("profile"),
+        client_host=request.client.host if request.client else None,
+        token=request.headers.get("x-profile-token"),
+    )
+    if profile is None:
+        return await call_next(request)
+
+    token = profiling.activate(profile)
+    try:
+        response = await call_next(request)
+    finally:
+        profiling.deactivate(token)
+        # 응답에 포함되지 않았어도 샘플러/tracemalloc은 여기서 정리
+        profile.report()
+
+    total_seconds = time.perf_counter() - profile.started_at
+    response.headers["Server-Timing"] = profile.server_timing(total_seconds)
+    if profile.sampled:
+        profiling.log_sampled(profile, request.method, request.url.path, response.status_code, total_seconds)
+    return response
+
+
+# 동시 처리 한도 초과 요청은 라우트/DB 세션에 닿기 전에 대기 또는 거절
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
+# 추천 요청 시간 예산은 수락 대기 시간까지 포함하도록 수락 제어보다 바깥에서 시작
+app.add_middleware(
+    RequestDeadlineMiddleware,
+    path_prefixes=("/api/bands/recommendations/update", "/recommend/band"),
+    budget_seconds=settings.RECOMMEND_DEADLINE_MS / 1000,
+)
+
+# 응답 압축은 CORS 바로 안쪽에서 (다른 미들웨어가 붙인 헤더까지 확정된 뒤 본문 압축)
+if settings.RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_level=settings.RESPONSE_GZIP_LEVEL,
+        brotli_quality=settings.RESPONSE_BROTLI_QUALITY,
+    )
+
+# CORS는 마지막에 등록해 가장 바깥에 둠
+# (preflight는 수락 제어/시간 예산을 거치지 않고, 수락 제어가 거절한 429/503 응답에도 CORS 헤더가 붙도록)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS_LIST,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
-    max_age=3600,  
+    max_age=3600,
 )
 
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_ops_token)])
+def metrics():
+    """
+    Prometheus 메트릭 엔드포인트 (X-Profile-Token 필요).
+    PROMETHEUS_MULTIPROC_DIR이 설정되어 있으면 모든 uvicorn 워커의 히스토그램/카운터를 합산.
+    """
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        # DB 풀/캐시 상태는 워커별 값이므로 응답한 워커 기준
+        registry.register(RuntimeStatsCollector(get_pool_stats, get_cache_stats))
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/health")
 def health_check():
     """
@@ -40,15 +227,41 @@ def health_check():
     return {"status": "ok"}
 
 
-@app.post("/recommend/band", response_model=RecommendBandResponse)
-def recommend_band(payload: RecommendBandRequest):
+@app.get("/ready")
+def readiness_check(response: Response):
+    """
+    레디니스 체크 엔드포인트 (warmup 필수 단계가 모두 성공해야 200).
+    로드밸런서/k8s readinessProbe는 이 엔드포인트를, livenessProbe는 /health를 사용.
     """
-    Spring 서버에서 호출할 엔드포인트.
+    snapshot = warmup_state.snapshot()
+    if not snapshot["ready"]:
+        response.status_code = 503
+    return snapshot
 
-    TODO:
-    - services.recommend_bands() 구현 후 실제 추천 결과 반환
-    - 예외 처리, 로깅, 시간 측정 등 추가
 
-    지금은 501 Not Implemented를 던지도록 해둠.
+@app.post("/recommend/band", response_model=RecommendBandResponse)
+def recommend_band(payload: RecommendBandRequest, db: Session = Depends(get_recommend_read_db)):
     """
-    raise HTTPException(status_code=501, detail="Band recommendation not implemented yet.")
+    Spring 서버에서 호출할 자유 텍스트 밴드 추천 엔드포인트.
+
+    - 질의 텍스트는 정규화 후 임베딩하며, 같은 질의는 캐시된 임베딩을 사용 (OpenAI 호출 없음)
+    - 유사도 검색과 밴드 정보 조회는 한 쿼리로 실행
+    - top_k는 RECOMMEND_BAND_MAX_TOP_K까지
+    """
+    try:
+        result = recommend_bands(db, payload.user_text, payload.top_k)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except TimeoutError as te:
+        raise HTTPException(status_code=504, detail=str(te))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"추천 생성 실패: {e}")
+
+    return trusted_response(RecommendBandResponse.model_construct(
+        model=result["model"],
+        query_text=result["query_text"],
+        bands=[
+            BandItem.model_construct(id=band_id, name=name, genre_desc=genre_desc, distance=distance)
+            for band_id, name, genre_desc, distance in result["bands"]
+        ],
+    ))
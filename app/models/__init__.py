@@ -9,6 +9,8 @@ from app.models.member_band import MemberBand
 from app.models.member_keyword import MemberKeyword
 from app.models.band_recommend import BandRecommend
 from app.models.top_track import TopTrack
+from app.models.band_neighbor import BandNeighbor
+from app.models.band_recommend_state import BandRecommendState
 
 __all__ = [
     "Band",
@@ -20,4 +22,13 @@ __all__ = [
     "MemberKeyword",
     "BandRecommend",
     "TopTrack",
+    "BandNeighbor",
+    "BandRecommendState",
+    "AI_OWNED_TABLES",
+]
+
+# AI 서버가 직접 생성/관리하는 테이블 (나머지 테이블은 Spring 서버가 관리)
+AI_OWNED_TABLES = [
+    BandNeighbor.__table__,
+    BandRecommendState.__table__,
 ]
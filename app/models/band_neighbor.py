@@ -0,0 +1,21 @@
+# app/models/band_neighbor.py
+from sqlalchemy import Column, Integer, Float, Boolean, TIMESTAMP
+
+from app.core.db import Base
+
+
+class BandNeighbor(Base):
+    """
+    band_neighbors 테이블 매핑 - 밴드별 사전 계산된 최근접 이웃 (AI 서버 소유)
+
+    only_bands=False: 전체 밴드 대상 이웃
+    only_bands=True: is_band=true 밴드만 대상으로 한 이웃
+    """
+    __tablename__ = "band_neighbors"
+
+    band_id = Column(Integer, primary_key=True)
+    only_bands = Column(Boolean, primary_key=True, default=False)
+    rank = Column(Integer, primary_key=True)
+    neighbor_band_id = Column(Integer, nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=True)
@@ -0,0 +1,18 @@
+# app/models/band_recommend_state.py
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+
+from app.core.db import Base
+
+
+class BandRecommendState(Base):
+    """
+    band_recommend_state 테이블 매핑 - 회원별 저장된 추천 세트의 입력 지문 (AI 서버 소유)
+
+    input_fingerprint는 (알고리즘 버전, 선택 밴드, 선택 키워드, 카탈로그 워터마크)의 해시로,
+    같으면 band_recommend에 저장된 결과를 다시 계산할 필요가 없음을 의미합니다.
+    """
+    __tablename__ = "band_recommend_state"
+
+    member_id = Column(Integer, primary_key=True)
+    input_fingerprint = Column(String(64), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=True)
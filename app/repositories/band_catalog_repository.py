@@ -0,0 +1,165 @@
+from typing import List, Dict, Set, Any, Optional, Tuple
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+
+# ============================================================
+# 밴드 카탈로그 (응답 결합용 밴드 정보) 조회
+# ============================================================
+
+def load_band_catalog_entries(
+    db: Session,
+    band_ids: Optional[List[int]] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    밴드 이름/이미지/대표곡/키워드를 한 번의 쿼리로 조회 (삭제된 밴드 제외).
+
+    대표곡이 여러 행인 밴드는 top_track_id가 가장 큰 행 하나만 사용합니다.
+
+    Args:
+        db: DB 세션
+        band_ids: 조회할 band_id 리스트 (None이면 전체)
+
+    Returns:
+        {band_id: {
+            "band_name": str,
+            "main_image": str,
+            "main_music": str,
+            "top_track": {"title": str, "externalUrl": str} or None,
+            "keywords": [str, ...],
+        }, ...}
+    """
+    if band_ids is not None and not band_ids:
+        return {}
+
+    query = text("""
+        SELECT b.band_id, b.band_name, b.main_image, b.main_music,
+               tt.title AS track_title, tt.external_url AS track_url,
+               ARRAY(
+                   SELECT k.keyword
+                   FROM band_keyword bk
+                   JOIN keyword k ON bk.keyword_id = k.keyword_id
+                   WHERE bk.band_id = b.band_id
+                     AND bk.deleted_at IS NULL
+                     AND k.deleted_at IS NULL
+                   ORDER BY k.keyword_id
+               ) AS keywords
+        FROM band b
+        -- 밴드당 대표곡이 여러 행이어도 항상 같은 행(가장 최근 추가된 top_track_id)을 사용
+        LEFT JOIN LATERAL (
+            SELECT t.title, t.external_url
+            FROM top_track t
+            WHERE t.band_id = b.band_id
+            ORDER BY t.top_track_id DESC
+            LIMIT 1
+        ) tt ON true
+        WHERE b.deleted_at IS NULL
+          AND (CAST(:band_ids AS integer[]) IS NULL OR b.band_id = ANY(:band_ids))
+    """)
+
+    result = db.execute(query, {"band_ids": list(band_ids) if band_ids is not None else None})
+
+    entries: Dict[int, Dict[str, Any]] = {}
+    for row in result:
+        top_track = None
+        if row.track_title:
+            top_track = {
+                "title": row.track_title,
+                "externalUrl": row.track_url,
+            }
+        entries[row.band_id] = {
+            "band_name": row.band_name,
+            "main_image": row.main_image,
+            "main_music": row.main_music,
+            "top_track": top_track,
+            "keywords": [keyword for keyword in row.keywords if keyword],
+        }
+    return entries
+
+
+def get_band_catalog_watermark(db: Session) -> Tuple[Optional[datetime], int]:
+    """
+    카탈로그 점진 갱신 기준점 조회.
+
+    Returns:
+        (band/band_keyword/keyword의 최근 수정·삭제 시각, top_track 최대 ID)
+    """
+    query = text("""
+        SELECT GREATEST(
+                   (SELECT max(GREATEST(updated_at, deleted_at)) FROM band),
+                   (SELECT max(GREATEST(updated_at, deleted_at)) FROM band_keyword),
+                   (SELECT max(GREATEST(updated_at, deleted_at)) FROM keyword)
+               ) AS changed_at,
+               (SELECT COALESCE(max(top_track_id), 0) FROM top_track) AS top_track_id
+    """)
+
+    row = db.execute(query).one()
+    return row.changed_at, row.top_track_id
+
+
+def get_band_ids_changed_since(
+    db: Session,
+    changed_at: Optional[datetime],
+    top_track_id: int,
+) -> Set[int]:
+    """
+    기준점 이후 카탈로그 정보가 바뀌었을 수 있는 band_id 조회.
+
+    - band / band_keyword의 updated_at, deleted_at이 기준 시각 이후인 밴드
+    - 기준 시각 이후 수정·삭제된 keyword를 가진 밴드
+    - 기준 ID보다 큰 top_track이 추가된 밴드
+
+    같은 시각에 커밋된 변경을 놓치지 않도록 기준 시각과 같은 행도 포함합니다.
+
+    Args:
+        db: DB 세션
+        changed_at: get_band_catalog_watermark의 수정 시각 (None이면 시각 조건 없이 전체)
+        top_track_id: get_band_catalog_watermark의 top_track 최대 ID
+
+    Returns:
+        band_id 집합
+    """
+    query = text("""
+        SELECT band_id FROM band
+        WHERE CAST(:since AS timestamptz) IS NULL
+           OR updated_at >= :since OR deleted_at >= :since
+        UNION
+        SELECT band_id FROM band_keyword
+        WHERE updated_at >= :since OR deleted_at >= :since
+        UNION
+        SELECT bk.band_id
+        FROM band_keyword bk
+        JOIN keyword k ON bk.keyword_id = k.keyword_id
+        WHERE k.updated_at >= :since OR k.deleted_at >= :since
+        UNION
+        SELECT band_id FROM top_track
+        WHERE top_track_id > :top_track_id
+    """)
+
+    result = db.execute(query, {"since": changed_at, "top_track_id": top_track_id})
+    return {row.band_id for row in result}
+
+
+def get_band_keyword_pairs(db: Session) -> List[Tuple[int, int]]:
+    """
+    키워드 역색인 구성용 (keyword_id, band_id) 쌍 전체 조회 (삭제된 밴드/키워드/연결 제외).
+
+    Args:
+        db: DB 세션
+
+    Returns:
+        [(keyword_id, band_id), ...]
+    """
+    query = text("""
+        SELECT bk.keyword_id, bk.band_id
+        FROM band_keyword bk
+        JOIN band b ON bk.band_id = b.band_id
+        JOIN keyword k ON bk.keyword_id = k.keyword_id
+        WHERE bk.deleted_at IS NULL
+          AND b.deleted_at IS NULL
+          AND k.deleted_at IS NULL
+    """)
+
+    return [(row.keyword_id, row.band_id) for row in db.execute(query)]
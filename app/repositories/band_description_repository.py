@@ -1,15 +1,20 @@
 from typing import List, Tuple, Set, Dict, Any, Optional
 from datetime import datetime
 
+import logging
+
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from app.core.db import vector_param, execute_binary, execute_pipelined
 from app.models.band_description import BandDescription
 from app.models.member import Member
 from app.models.member_band import MemberBand
 from app.models.member_keyword import MemberKeyword
 from app.models.band_recommend import BandRecommend
 
+logger = logging.getLogger(__name__)
+
 
 def get_band_description(db: Session, band_id: int) -> BandDescription | None:
     return (
@@ -40,6 +45,37 @@ def get_all_band_descriptions_with_embedding(db: Session) -> List[BandDescriptio
     )
 
 
+# pgvector의 <=> 연산자는 코사인 거리를 반환 (0~2 범위)
+# 코사인 유사도 = 1 - 코사인 거리
+_SIMILAR_BANDS_SQL = """
+    SELECT bd.band_id, 1 - (bd.embedding <=> :vec) AS score
+    FROM band_description bd
+    JOIN band b ON bd.band_id = b.band_id
+    WHERE bd.embedding IS NOT NULL
+      AND (:no_exclude OR bd.band_id != ALL(:exclude_ids))
+      AND (:no_filter_band OR b.is_band = true)
+      AND b.deleted_at IS NULL
+    ORDER BY bd.embedding <=> :vec
+    LIMIT :k
+"""
+
+
+def _similar_bands_params(
+    user_embedding: List[float],
+    top_k: int,
+    exclude_band_ids: Set[int] | None,
+    only_bands: bool,
+) -> Dict[str, Any]:
+    exclude_list = list(exclude_band_ids) if exclude_band_ids else []
+    return {
+        "vec": vector_param(user_embedding),
+        "k": top_k,
+        "no_exclude": len(exclude_list) == 0,
+        "exclude_ids": exclude_list,
+        "no_filter_band": not only_bands,
+    }
+
+
 def find_similar_bands_by_embedding(
     db: Session,
     user_embedding: List[float],
@@ -60,121 +96,409 @@ def find_similar_bands_by_embedding(
     Returns:
         [(band_id, score), ...] 형태의 리스트 (유사도 높은 순)
     """
-    exclude_band_ids = exclude_band_ids or set()
+    result = db.execute(
+        text(_SIMILAR_BANDS_SQL),
+        _similar_bands_params(user_embedding, top_k, exclude_band_ids, only_bands),
+    )
     
-    # pgvector의 <=> 연산자는 코사인 거리를 반환 (0~2 범위)
-    # 코사인 유사도 = 1 - 코사인 거리
+    return [(row.band_id, float(row.score)) for row in result]
+
+
+# 유사도 검색과 응답에 필요한 밴드 정보 조회를 한 번에 (자유 텍스트 추천용)
+_SIMILAR_BANDS_WITH_DETAILS_SQL = """
+    SELECT bd.band_id, b.band_name, b.description, bd.embedding <=> :vec AS distance
+    FROM band_description bd
+    JOIN band b ON bd.band_id = b.band_id
+    WHERE bd.embedding IS NOT NULL
+      AND (:no_exclude OR bd.band_id != ALL(:exclude_ids))
+      AND (:no_filter_band OR b.is_band = true)
+      AND b.deleted_at IS NULL
+    ORDER BY bd.embedding <=> :vec
+    LIMIT :k
+"""
+
+
+def find_similar_bands_with_details(
+    db: Session,
+    user_embedding: List[float],
+    top_k: int = 5,
+    exclude_band_ids: Set[int] | None = None,
+    only_bands: bool = False,
+) -> List[Tuple[int, str, str, float]]:
+    """
+    find_similar_bands_by_embedding과 같은 검색에 밴드 이름/설명을 함께 조회 (DB 1회 왕복).
+
+    Args:
+        db: DB 세션
+        user_embedding: 기준 임베딩 벡터
+        top_k: 반환할 밴드 수
+        exclude_band_ids: 제외할 band_id 집합
+        only_bands: True일 경우 is_band=true인 밴드만 반환
+
+    Returns:
+        [(band_id, band_name, description, distance), ...] 형태의 리스트 (코사인 거리 가까운 순)
+    """
+    result = db.execute(
+        text(_SIMILAR_BANDS_WITH_DETAILS_SQL),
+        _similar_bands_params(user_embedding, top_k, exclude_band_ids, only_bands),
+    )
+
+    return [
+        (row.band_id, row.band_name or "", row.description or "", float(row.distance))
+        for row in result
+    ]
+
+
+def find_similar_bands_by_embeddings(
+    db: Session,
+    user_embeddings: List[List[float]],
+    top_k: int = 3,
+    exclude_band_ids: Set[int] | None = None,
+    only_bands: bool = False,
+) -> List[List[Tuple[int, float]]]:
+    """
+    여러 기준 벡터의 유사 밴드 검색을 한 번에 실행 (psycopg3면 파이프라인 모드로 1회 왕복).
+
+    Args:
+        db: DB 세션
+        user_embeddings: 기준 벡터 리스트
+        top_k: 벡터별 반환할 밴드 수
+        exclude_band_ids: 제외할 band_id 집합
+        only_bands: True일 경우 is_band=true인 밴드만 반환
+
+    Returns:
+        기준 벡터 순서대로 [(band_id, score), ...] 리스트
+    """
+    results = execute_pipelined(
+        db,
+        _SIMILAR_BANDS_SQL,
+        [
+            _similar_bands_params(embedding, top_k, exclude_band_ids, only_bands)
+            for embedding in user_embeddings
+        ],
+    )
+    return [[(row.band_id, float(row.score)) for row in rows] for rows in results]
+
+
+def find_similar_bands_in_candidates(
+    db: Session,
+    user_embedding: List[float],
+    candidate_band_ids: Set[int],
+    top_k: int = 3,
+    exclude_band_ids: Set[int] | None = None,
+    only_bands: bool = False,
+) -> List[Tuple[int, float]]:
+    """
+    주어진 후보 밴드 집합 안에서만 코사인 유사도를 계산하여 상위 k개 반환.
+
+    band_neighbors로 구성한 작은 후보 풀을 정확히 채점하는 용도로,
+    벡터 인덱스(ANN) 스캔 없이 band_id 조건으로만 대상을 좁힙니다.
+
+    Args:
+        db: DB 세션
+        user_embedding: 사용자 임베딩 벡터
+        candidate_band_ids: 채점할 후보 band_id 집합
+        top_k: 반환할 밴드 수
+        exclude_band_ids: 제외할 band_id 집합
+        only_bands: True일 경우 is_band=true인 밴드만 반환
+
+    Returns:
+        [(band_id, score), ...] 형태의 리스트 (유사도 높은 순)
+    """
+    if not candidate_band_ids:
+        return []
+
+    exclude_list = list(exclude_band_ids) if exclude_band_ids else []
+
+    # ORDER BY에 <=> 연산자를 직접 쓰지 않아 인덱스 스캔 대신 후보만 채점
     query = text("""
         SELECT bd.band_id, 1 - (bd.embedding <=> :vec) AS score
         FROM band_description bd
         JOIN band b ON bd.band_id = b.band_id
-        WHERE bd.embedding IS NOT NULL
+        WHERE bd.band_id = ANY(:candidate_ids)
+          AND bd.embedding IS NOT NULL
           AND (:no_exclude OR bd.band_id != ALL(:exclude_ids))
           AND (:no_filter_band OR b.is_band = true)
           AND b.deleted_at IS NULL
-        ORDER BY bd.embedding <=> :vec
+        ORDER BY score DESC
         LIMIT :k
     """)
-    
-    # PostgreSQL 배열 형식으로 변환
-    embedding_str = "[" + ",".join(map(str, user_embedding)) + "]"
-    exclude_list = list(exclude_band_ids) if exclude_band_ids else []
-    
+
     result = db.execute(
         query,
         {
-            "vec": embedding_str,
+            "vec": vector_param(user_embedding),
             "k": top_k,
+            "candidate_ids": list(candidate_band_ids),
             "no_exclude": len(exclude_list) == 0,
             "exclude_ids": exclude_list,
             "no_filter_band": not only_bands,
         }
     )
-    
+
     return [(row.band_id, float(row.score)) for row in result]
 
 
-def get_bands_with_keywords_by_ids(
-    db: Session,
-    band_ids: List[int],
-) -> Dict[int, Dict[str, Any]]:
+def get_keywords_by_ids(db: Session, keyword_ids: List[int]) -> List[str]:
     """
-    band_id 목록으로 밴드 정보와 키워드를 함께 조회.
+    keyword_id 목록으로 키워드 텍스트 조회.
     
     Args:
         db: DB 세션
-        band_ids: 조회할 band_id 리스트
+        keyword_ids: 조회할 keyword_id 리스트
     
     Returns:
-        {band_id: {"band_name": str, "main_image": str, "main_music": str, "keywords": [str, ...]}, ...}
+        키워드 텍스트 리스트
     """
-    if not band_ids:
-        return {}
+    if not keyword_ids:
+        return []
     
-    # 밴드 기본 정보 조회
-    band_query = text("""
-        SELECT band_id, band_name, main_image, main_music
-        FROM band
-        WHERE band_id = ANY(:band_ids)
+    query = text("""
+        SELECT keyword
+        FROM keyword
+        WHERE keyword_id = ANY(:keyword_ids)
           AND deleted_at IS NULL
+        ORDER BY keyword_id
     """)
     
-    band_result = db.execute(band_query, {"band_ids": list(band_ids)})
-    
-    bands_dict: Dict[int, Dict[str, Any]] = {}
-    for row in band_result:
-        bands_dict[row.band_id] = {
-            "band_name": row.band_name,
-            "main_image": row.main_image,
-            "main_music": row.main_music,
-            "keywords": [],
-        }
-    
-    # 키워드 정보 조회 (band_keyword + keyword 조인)
-    keyword_query = text("""
-        SELECT bk.band_id, k.keyword
-        FROM band_keyword bk
-        JOIN keyword k ON bk.keyword_id = k.keyword_id
-        WHERE bk.band_id = ANY(:band_ids)
-          AND bk.deleted_at IS NULL
-          AND k.deleted_at IS NULL
-    """)
-    
-    keyword_result = db.execute(keyword_query, {"band_ids": list(band_ids)})
-    
-    for row in keyword_result:
-        if row.band_id in bands_dict:
-            bands_dict[row.band_id]["keywords"].append(row.keyword)
+    result = db.execute(query, {"keyword_ids": list(keyword_ids)})
     
-    return bands_dict
+    return [row.keyword for row in result if row.keyword]
 
 
-def get_keywords_by_ids(db: Session, keyword_ids: List[int]) -> List[str]:
+def get_all_keywords(db: Session) -> List[str]:
     """
-    keyword_id 목록으로 키워드 텍스트 조회.
+    삭제되지 않은 전체 키워드 텍스트 조회 (키워드 벡터 미리 계산용).
     
     Args:
         db: DB 세션
-        keyword_ids: 조회할 keyword_id 리스트
     
     Returns:
-        키워드 텍스트 리스트
+        키워드 텍스트 리스트 (keyword_id 순)
     """
-    if not keyword_ids:
-        return []
-    
     query = text("""
         SELECT keyword
         FROM keyword
-        WHERE keyword_id = ANY(:keyword_ids)
-          AND deleted_at IS NULL
+        WHERE deleted_at IS NULL
+        ORDER BY keyword_id
     """)
     
-    result = db.execute(query, {"keyword_ids": list(keyword_ids)})
+    result = db.execute(query)
     
     return [row.keyword for row in result if row.keyword]
 
 
+# ============================================================
+# 임베딩 스냅샷 (mmap 공유 파일) 내보내기용 조회
+# ============================================================
+
+def get_embedding_watermark(db: Session) -> str:
+    """
+    임베딩 스냅샷 내용에 영향을 주는 테이블(band_description, band)의 변경 감지용 워터마크.
+
+    Returns:
+        행 수 + 최근 수정/삭제 시각을 이어 붙인 문자열
+    """
+    query = text("""
+        SELECT concat_ws('|',
+            (SELECT concat_ws(',', count(*), count(embedding), max(updated_at), max(deleted_at)) FROM band_description),
+            (SELECT concat_ws(',', count(*), max(updated_at), max(deleted_at)) FROM band)
+        ) AS watermark
+    """)
+    return db.execute(query).scalar() or ""
+
+
+def count_embedding_snapshot_rows(db: Session) -> int:
+    """
+    iter_embedding_snapshot_rows가 반환할 행 수 (임베딩이 있는 밴드 수).
+
+    스냅샷 파일을 미리 최종 크기로 만들어 두고 스트리밍으로 채우기 위해 사용합니다.
+    """
+    query = text("""
+        SELECT count(DISTINCT bd.band_id)
+        FROM band_description bd
+        JOIN band b ON bd.band_id = b.band_id
+        WHERE bd.embedding IS NOT NULL
+    """)
+
+    return int(db.execute(query).scalar() or 0)
+
+
+def iter_embedding_snapshot_rows(db: Session, batch_size: int = 1000):
+    """
+    밴드별 임베딩 1개와 is_band/삭제 여부를 band_id 순으로 스트리밍 조회.
+
+    밴드당 band_description이 여러 개면 band_description_id가 가장 작은 행을 사용합니다
+    (get_recommendation_inputs와 동일).
+
+    Yields:
+        (band_id, embedding, is_band, deleted) 튜플
+    """
+    query = text("""
+        SELECT DISTINCT ON (bd.band_id)
+               bd.band_id, bd.embedding,
+               COALESCE(b.is_band, false) AS is_band,
+               b.deleted_at IS NOT NULL AS deleted
+        FROM band_description bd
+        JOIN band b ON bd.band_id = b.band_id
+        WHERE bd.embedding IS NOT NULL
+        ORDER BY bd.band_id, bd.band_description_id
+    """)
+
+    result = db.execute(query, execution_options={"yield_per": batch_size})
+    for row in result:
+        yield row.band_id, row.embedding, row.is_band, row.deleted
+
+
+# ============================================================
+# 추천 입력 일괄 조회 (1회 왕복)
+# ============================================================
+
+# selected_bands(band_id, ord), selected_keywords(keyword_id) CTE를 받아
+# 밴드 임베딩 행과 키워드 텍스트 행을 UNION ALL로 한 번에 반환
+# (ord: 밴드는 선택 순서 - 클러스터링/보간 입력 순서가 결과에 영향을 주므로 유지, 키워드는 keyword_id)
+_RECOMMENDATION_INPUT_ROWS = """
+    SELECT 'band' AS kind, sb.band_id AS id, bd.embedding AS embedding, NULL::text AS keyword, sb.ord AS ord
+    FROM selected_bands sb
+    LEFT JOIN LATERAL (
+        SELECT embedding
+        FROM band_description
+        WHERE band_id = sb.band_id
+          AND embedding IS NOT NULL
+        ORDER BY band_description_id
+        LIMIT 1
+    ) bd ON true
+    UNION ALL
+    SELECT 'keyword', sk.keyword_id, NULL::vector, k.keyword, sk.keyword_id
+    FROM selected_keywords sk
+    LEFT JOIN keyword k ON k.keyword_id = sk.keyword_id AND k.deleted_at IS NULL
+"""
+
+
+def _collect_recommendation_inputs(rows) -> Dict[str, Any]:
+    inputs: Dict[str, Any] = {
+        "member_id": None,
+        "input_fingerprint": None,
+        "band_ids": [],
+        "band_embeddings": {},
+        "keyword_ids": [],
+        "keywords": [],
+    }
+    for row in rows:
+        if row.kind == "member":
+            inputs["member_id"] = row.id
+            inputs["input_fingerprint"] = row.keyword
+        elif row.kind == "band":
+            inputs["band_ids"].append(row.id)
+            if row.embedding is not None:
+                inputs["band_embeddings"][row.id] = row.embedding
+        else:
+            inputs["keyword_ids"].append(row.id)
+            if row.keyword:
+                inputs["keywords"].append(row.keyword)
+    return inputs
+
+
+def get_recommendation_inputs(
+    db: Session,
+    band_ids: List[int],
+    keyword_ids: List[int],
+) -> Dict[str, Any]:
+    """
+    선택 밴드 임베딩과 선택 키워드 텍스트를 한 번의 쿼리로 조회.
+
+    Args:
+        db: DB 세션
+        band_ids: 선택 밴드 ID 리스트
+        keyword_ids: 선택 키워드 ID 리스트
+
+    Returns:
+        {
+            "band_ids": [중복 제거된 band_id, ...],  # 요청한 순서
+            "band_embeddings": {band_id: embedding, ...},  # 임베딩 있는 밴드만
+            "keyword_ids": [중복 제거된 keyword_id, ...],
+            "keywords": [키워드 텍스트, ...],  # keyword_id 순, 삭제된 키워드 제외
+        }
+    """
+    query = f"""
+        WITH selected_bands AS (
+            SELECT t.band_id, min(t.ord) AS ord
+            FROM unnest(CAST(:band_ids AS integer[])) WITH ORDINALITY AS t(band_id, ord)
+            GROUP BY t.band_id
+        ),
+        selected_keywords AS (
+            SELECT DISTINCT unnest(CAST(:keyword_ids AS integer[])) AS keyword_id
+        )
+        {_RECOMMENDATION_INPUT_ROWS}
+        ORDER BY kind, ord
+    """
+
+    # 임베딩 결과가 있으므로 psycopg3면 바이너리로 수신
+    result = execute_binary(db, query, {
+        "band_ids": list(band_ids),
+        "keyword_ids": list(keyword_ids),
+    })
+    inputs = _collect_recommendation_inputs(result)
+    del inputs["member_id"], inputs["input_fingerprint"]
+    return inputs
+
+
+def get_member_context(db: Session, external_id: str) -> Optional[Dict[str, Any]]:
+    """
+    externalId로 회원 ID, 선택 밴드(+임베딩), 선택 키워드(+텍스트)를 한 번의 쿼리로 조회.
+
+    get_member_by_external_id → get_member_band_ids → get_member_keyword_ids
+    → (추천 단계의) 임베딩/키워드 텍스트 조회를 CTE 하나로 합친 버전이며,
+    저장된 추천 세트의 입력 지문(band_recommend_state)도 함께 가져옵니다.
+
+    Args:
+        db: DB 세션
+        external_id: JWT에서 추출한 externalId (UUID)
+
+    Returns:
+        {"member_id": int, "input_fingerprint": str | None,
+         "band_ids", "band_embeddings", "keyword_ids", "keywords"}
+        (밴드/키워드 항목은 get_recommendation_inputs와 동일, band_ids는 회원이 선택한 순서) 또는 회원이 없으면 None
+    """
+    query = f"""
+        WITH m AS (
+            SELECT member_id
+            FROM member
+            WHERE external_id = :external_id
+              AND deleted_at IS NULL
+            LIMIT 1
+        ),
+        selected_bands AS (
+            -- 회원이 선택한 순서(member_band 행 순서) 유지
+            SELECT mb.band_id, min(mb.id) AS ord
+            FROM member_band mb
+            JOIN m ON mb.member_id = m.member_id
+            WHERE mb.band_id IS NOT NULL
+              AND mb.deleted_at IS NULL
+            GROUP BY mb.band_id
+        ),
+        selected_keywords AS (
+            SELECT DISTINCT mk.keyword_id
+            FROM member_keyword mk
+            JOIN m ON mk.member_id = m.member_id
+            WHERE mk.deleted_at IS NULL
+        )
+        -- member 행의 keyword 칸에는 저장된 입력 지문을 담음
+        SELECT 'member' AS kind, m.member_id AS id, NULL::vector AS embedding, brs.input_fingerprint::text AS keyword,
+               0 AS ord
+        FROM m
+        LEFT JOIN band_recommend_state brs ON brs.member_id = m.member_id
+        UNION ALL
+        {_RECOMMENDATION_INPUT_ROWS}
+        ORDER BY kind, ord
+    """
+
+    inputs = _collect_recommendation_inputs(execute_binary(db, query, {"external_id": external_id}))
+    if inputs["member_id"] is None:
+        return None
+    return inputs
+
+
 # ============================================================
 # Member 관련 함수
 # ============================================================
@@ -306,84 +630,223 @@ def save_band_recommends(
     return saved_recommends
 
 
-def get_band_recommends_with_details(
+# ON CONFLICT (member_id, priority) 대상 유일 인덱스 존재 여부 (시작 시 detect_band_recommend_upsert_support로 확인)
+_band_recommend_upsert_supported = False
+
+
+def detect_band_recommend_upsert_support(db: Session) -> bool:
+    """
+    band_recommend에 (member_id, priority) 유일 인덱스가 있는지 확인해 추천 저장 방식 결정.
+
+    인덱스는 Spring 서버 마이그레이션(migrations/spring)으로 만들며, 이름과 무관하게
+    두 컬럼만으로 이루어진 유효한 유일 인덱스(부분 인덱스 제외)가 있으면 upsert를 사용합니다.
+
+    Args:
+        db: DB 세션
+
+    Returns:
+        upsert 사용 여부
+    """
+    global _band_recommend_upsert_supported
+
+    query = text("""
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_index i
+            WHERE i.indrelid = to_regclass('band_recommend')
+              AND i.indisunique
+              AND i.indisvalid
+              AND i.indpred IS NULL
+              AND i.indnkeyatts = 2
+              AND (
+                  SELECT array_agg(a.attname::text ORDER BY a.attname)
+                  FROM pg_attribute a
+                  WHERE a.attrelid = i.indrelid
+                    AND a.attnum = ANY(i.indkey)
+              ) = ARRAY['member_id', 'priority']
+        )
+    """)
+
+    _band_recommend_upsert_supported = bool(db.execute(query).scalar())
+    if _band_recommend_upsert_supported:
+        logger.info("band_recommend (member_id, priority) 유일 인덱스 확인 → upsert 방식으로 추천 저장")
+    else:
+        logger.warning("band_recommend (member_id, priority) 유일 인덱스 없음 → 삭제 후 재삽입 방식으로 추천 저장")
+    return _band_recommend_upsert_supported
+
+
+def replace_band_recommends(
     db: Session,
     member_id: int,
+    recommendations: List[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
     """
-    사용자의 추천 밴드를 Band, TopTrack, Keyword 정보와 함께 조회.
+    사용자의 추천 밴드를 새 추천 세트로 교체 (커밋은 호출자 책임).
+
+    한 문장으로 처리합니다.
+    - unnest로 만든 (priority, band_id, score)를 ON CONFLICT (member_id, priority)로 upsert
+      (band_id/score가 그대로인 행은 갱신하지 않음)
+    - 새 세트보다 priority가 큰 기존 행만 삭제
+
+    - 같은 priority의 soft delete된 행은 deleted_at을 비워 되살림
+
+    유일 인덱스가 없으면(시작 시 확인) 기존 방식(삭제 → 삽입)으로 처리합니다.
+
+    Args:
+        db: DB 세션
+        member_id: 회원 ID
+        recommendations: [{"band_id": int, "score": float}, ...] 형태 (score 높은 순으로 priority 부여)
+
+    Returns:
+        저장된 추천 행 [{"band_id": int, "score": float}, ...] (priority 순)
+    """
+    sorted_recs = sorted(recommendations, key=lambda x: x["score"], reverse=True)
+    saved_rows = [{"band_id": rec["band_id"], "score": rec["score"]} for rec in sorted_recs]
+
+    if _band_recommend_upsert_supported:
+        query = text("""
+            WITH new_recs AS (
+                SELECT t.band_id, t.score, t.priority::integer AS priority
+                FROM unnest(CAST(:band_ids AS integer[]), CAST(:scores AS double precision[]))
+                     WITH ORDINALITY AS t(band_id, score, priority)
+            ),
+            upserted AS (
+                INSERT INTO band_recommend (member_id, priority, band_id, score, created_at, updated_at)
+                SELECT :member_id, priority, band_id, score, now(), now()
+                FROM new_recs
+                ON CONFLICT (member_id, priority) DO UPDATE
+                SET band_id = EXCLUDED.band_id,
+                    score = EXCLUDED.score,
+                    updated_at = EXCLUDED.updated_at,
+                    deleted_at = NULL
+                WHERE band_recommend.band_id IS DISTINCT FROM EXCLUDED.band_id
+                   OR band_recommend.score IS DISTINCT FROM EXCLUDED.score
+                   OR band_recommend.deleted_at IS NOT NULL
+                RETURNING 1
+            ),
+            removed AS (
+                DELETE FROM band_recommend
+                WHERE member_id = :member_id
+                  AND (priority IS NULL OR priority > :rec_count)
+                RETURNING 1
+            )
+            SELECT (SELECT count(*) FROM upserted) AS upserted_count,
+                   (SELECT count(*) FROM removed) AS removed_count
+        """)
+        params = {
+            "member_id": member_id,
+            "band_ids": [rec["band_id"] for rec in sorted_recs],
+            "scores": [float(rec["score"]) for rec in sorted_recs],
+            "rec_count": len(sorted_recs),
+        }
+
+        row = db.execute(query, params).one()
+        logger.info(f"band_recommend 저장: 변경 {row.upserted_count}개, 삭제 {row.removed_count}개")
+        return saved_rows
+
+    delete_band_recommends(db, member_id)
+    save_band_recommends(db, member_id, sorted_recs)
+    return saved_rows
+
+
+def get_band_recommend_fingerprint(db: Session, member_id: int) -> Optional[str]:
+    """
+    사용자의 저장된 추천 세트를 만든 입력 지문 조회.
     
     Args:
         db: DB 세션
         member_id: 회원 ID
     
     Returns:
-        [{
-            "band_id": int,
-            "band_name": str,
-            "image_url": str,
-            "top_track": {"title": str, "external_url": str} or None,
-            "keywords": [str, ...]
-        }, ...]
-    """
-    # 추천 밴드 조회 (priority 순)
+        input_fingerprint 또는 None (저장된 지문 없음)
+    """
     query = text("""
-        SELECT br.band_id, br.priority, br.score,
-               b.band_name, b.main_image,
-               tt.title as track_title, tt.external_url as track_url
-        FROM band_recommend br
-        JOIN band b ON br.band_id = b.band_id
-        LEFT JOIN top_track tt ON b.band_id = tt.band_id
-        WHERE br.member_id = :member_id
-          AND b.deleted_at IS NULL
-        ORDER BY br.priority ASC
+        SELECT input_fingerprint
+        FROM band_recommend_state
+        WHERE member_id = :member_id
     """)
     
-    result = db.execute(query, {"member_id": member_id})
+    return db.execute(query, {"member_id": member_id}).scalar()
+
+
+def save_band_recommend_fingerprint(db: Session, member_id: int, fingerprint: Optional[str]) -> None:
+    """
+    추천 세트와 함께 입력 지문 저장 (커밋은 호출자 책임).
     
-    bands_data = []
-    band_ids = []
+    Args:
+        db: DB 세션
+        member_id: 회원 ID
+        fingerprint: 입력 지문 (None이면 기존 지문 삭제 → 다음 요청 때 재계산)
+    """
+    if fingerprint is None:
+        db.execute(
+            text("DELETE FROM band_recommend_state WHERE member_id = :member_id"),
+            {"member_id": member_id},
+        )
+        return
+    
+    db.execute(
+        text("""
+            INSERT INTO band_recommend_state (member_id, input_fingerprint, updated_at)
+            VALUES (:member_id, :fingerprint, now())
+            ON CONFLICT (member_id) DO UPDATE
+            SET input_fingerprint = EXCLUDED.input_fingerprint,
+                updated_at = EXCLUDED.updated_at
+        """),
+        {"member_id": member_id, "fingerprint": fingerprint},
+    )
+
+
+def get_band_recommend_watermark(db: Session, external_id: str) -> Optional[Tuple[int, str]]:
+    """
+    externalId로 회원 ID와 저장된 추천 세트의 워터마크를 한 번에 조회.
+
+    워터마크는 band_recommend 행 수/최종 수정 시각과 band_recommend_state 수정 시각을 합친 문자열로,
+    어느 워커가 추천을 다시 저장하든 값이 바뀌므로 프로세스별 캐시의 유효성 확인에 사용합니다.
+
+    Args:
+        db: DB 세션
+        external_id: JWT에서 추출한 externalId (UUID)
+
+    Returns:
+        (member_id, 워터마크) 또는 회원이 없으면 None
+    """
+    query = text("""
+        SELECT m.member_id,
+               concat_ws(':',
+                   (SELECT count(*) FROM band_recommend br WHERE br.member_id = m.member_id),
+                   coalesce((SELECT max(br.updated_at) FROM band_recommend br WHERE br.member_id = m.member_id)::text, ''),
+                   coalesce((SELECT brs.updated_at FROM band_recommend_state brs WHERE brs.member_id = m.member_id)::text, '')
+               ) AS watermark
+        FROM member m
+        WHERE m.external_id = :external_id
+          AND m.deleted_at IS NULL
+        LIMIT 1
+    """)
+
+    row = db.execute(query, {"external_id": external_id}).first()
+    if row is None:
+        return None
+    return row.member_id, row.watermark
+
+
+def get_band_recommend_rows(db: Session, member_id: int) -> List[Dict[str, Any]]:
+    """
+    사용자의 저장된 추천 행 조회 (상세 정보는 band_catalog에서 결합).
     
-    for row in result:
-        band_ids.append(row.band_id)
-        
-        top_track = None
-        if row.track_title:
-            top_track = {
-                "title": row.track_title,
-                "externalUrl": row.track_url,
-            }
-        
-        bands_data.append({
-            "band_id": row.band_id,
-            "score": row.score,
-            "band_name": row.band_name,
-            "image_url": row.main_image,
-            "top_track": top_track,
-            "keywords": [],  # 나중에 채움
-        })
-    
-    # 키워드 조회
-    if band_ids:
-        keyword_query = text("""
-            SELECT bk.band_id, k.keyword
-            FROM band_keyword bk
-            JOIN keyword k ON bk.keyword_id = k.keyword_id
-            WHERE bk.band_id = ANY(:band_ids)
-              AND bk.deleted_at IS NULL
-              AND k.deleted_at IS NULL
-        """)
-        
-        keyword_result = db.execute(keyword_query, {"band_ids": band_ids})
-        
-        # band_id -> keywords 매핑
-        band_keywords: Dict[int, List[str]] = {bid: [] for bid in band_ids}
-        for row in keyword_result:
-            if row.keyword:
-                band_keywords[row.band_id].append(row.keyword)
-        
-        # 키워드 채우기
-        for band_data in bands_data:
-            band_data["keywords"] = band_keywords.get(band_data["band_id"], [])
+    Args:
+        db: DB 세션
+        member_id: 회원 ID
+    
+    Returns:
+        [{"band_id": int, "score": float}, ...] (priority 순)
+    """
+    query = text("""
+        SELECT band_id, score
+        FROM band_recommend
+        WHERE member_id = :member_id
+        ORDER BY priority ASC
+    """)
     
-    return bands_data
+    result = db.execute(query, {"member_id": member_id})
+    return [{"band_id": row.band_id, "score": row.score} for row in result]
@@ -0,0 +1,213 @@
+from typing import List, Tuple, Dict, Set, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+
+# ============================================================
+# band_neighbors 조회
+# ============================================================
+
+def get_band_neighbors(
+    db: Session,
+    band_id: int,
+    only_bands: bool = False,
+    limit: int = 3,
+) -> List[Tuple[int, float]]:
+    """
+    사전 계산된 band_neighbors 테이블에서 특정 밴드의 이웃을 조회.
+
+    계산 이후 삭제되었거나 is_band가 바뀐 밴드는 조회 시점에 다시 걸러냅니다.
+
+    Args:
+        db: DB 세션
+        band_id: 기준 밴드 ID
+        only_bands: True일 경우 is_band=true 버전의 이웃 목록 사용
+        limit: 반환할 이웃 수
+
+    Returns:
+        [(neighbor_band_id, score), ...] 형태의 리스트 (유사도 높은 순)
+    """
+    query = text("""
+        SELECT bn.neighbor_band_id, bn.score
+        FROM band_neighbors bn
+        JOIN band b ON bn.neighbor_band_id = b.band_id
+        WHERE bn.band_id = :band_id
+          AND bn.only_bands = :only_bands
+          AND b.deleted_at IS NULL
+          AND (NOT :only_bands OR b.is_band = true)
+        ORDER BY bn.rank ASC
+        LIMIT :k
+    """)
+
+    result = db.execute(
+        query,
+        {"band_id": band_id, "only_bands": only_bands, "k": limit},
+    )
+    return [(row.neighbor_band_id, float(row.score)) for row in result]
+
+
+def get_neighbor_ids_by_band_ids(
+    db: Session,
+    band_ids: List[int],
+    only_bands: bool = False,
+) -> Dict[int, Set[int]]:
+    """
+    여러 밴드의 이웃 ID 집합을 한 번에 조회 (후보 풀 구성용).
+
+    Args:
+        db: DB 세션
+        band_ids: 기준 밴드 ID 리스트
+        only_bands: True일 경우 is_band=true 버전의 이웃 목록 사용
+
+    Returns:
+        {band_id: {neighbor_band_id, ...}, ...} (이웃이 계산되지 않은 밴드는 키 없음)
+    """
+    if not band_ids:
+        return {}
+
+    query = text("""
+        SELECT band_id, neighbor_band_id
+        FROM band_neighbors
+        WHERE band_id = ANY(:band_ids)
+          AND only_bands = :only_bands
+    """)
+
+    result = db.execute(query, {"band_ids": list(band_ids), "only_bands": only_bands})
+
+    neighbors: Dict[int, Set[int]] = {}
+    for row in result:
+        neighbors.setdefault(row.band_id, set()).add(row.neighbor_band_id)
+    return neighbors
+
+
+# ============================================================
+# band_neighbors 재계산
+# ============================================================
+
+def rebuild_band_neighbors(
+    db: Session,
+    band_ids: Optional[List[int]],
+    top_n: int,
+    only_bands: bool = False,
+) -> int:
+    """
+    지정한 밴드들의 이웃 목록을 pgvector로 다시 계산하여 저장 (커밋은 호출자 책임).
+
+    Args:
+        db: DB 세션
+        band_ids: 재계산할 기준 밴드 ID 리스트 (None이면 전체 재계산)
+        top_n: 밴드별로 저장할 이웃 수
+        only_bands: True일 경우 이웃 후보를 is_band=true 밴드로 제한
+
+    Returns:
+        저장된 이웃 row 수
+    """
+    rebuild_all = band_ids is None
+    if not rebuild_all and not band_ids:
+        return 0
+
+    params = {
+        "all": rebuild_all,
+        "band_ids": [] if rebuild_all else list(band_ids),
+        "only_bands": only_bands,
+        "top_n": top_n,
+    }
+
+    db.execute(
+        text("""
+            DELETE FROM band_neighbors
+            WHERE only_bands = :only_bands
+              AND (:all OR band_id = ANY(:band_ids))
+        """),
+        params,
+    )
+
+    # 기준 밴드는 is_band와 무관하게 계산 (V4 입력 밴드는 is_band=false일 수도 있음)
+    result = db.execute(
+        text("""
+            INSERT INTO band_neighbors (band_id, only_bands, rank, neighbor_band_id, score, updated_at)
+            SELECT src.band_id, :only_bands, nb.rank, nb.band_id, nb.score, now()
+            FROM (
+                SELECT DISTINCT ON (band_id) band_id, embedding
+                FROM band_description
+                WHERE embedding IS NOT NULL
+                  AND (:all OR band_id = ANY(:band_ids))
+                ORDER BY band_id, band_description_id
+            ) src
+            CROSS JOIN LATERAL (
+                SELECT bd.band_id,
+                       1 - (bd.embedding <=> src.embedding) AS score,
+                       row_number() OVER (ORDER BY bd.embedding <=> src.embedding) AS rank
+                FROM band_description bd
+                JOIN band b ON bd.band_id = b.band_id
+                WHERE bd.embedding IS NOT NULL
+                  AND bd.band_id != src.band_id
+                  AND b.deleted_at IS NULL
+                  AND (NOT :only_bands OR b.is_band = true)
+                ORDER BY bd.embedding <=> src.embedding
+                LIMIT :top_n
+            ) nb
+        """),
+        params,
+    )
+    return result.rowcount or 0
+
+
+def get_bands_affected_by_change(
+    db: Session,
+    changed_band_ids: List[int],
+    top_n: int,
+    only_bands: bool = False,
+) -> Set[int]:
+    """
+    임베딩이 바뀐 밴드 때문에 이웃 목록이 달라질 수 있는 기준 밴드 조회.
+
+    - 이웃 목록에 변경된 밴드를 이미 포함하고 있는 밴드
+    - 변경된 밴드와의 유사도가 현재 이웃 목록의 최저 점수보다 높은 밴드
+    - 이웃 목록이 아직 top_n개를 채우지 못한 밴드
+
+    Args:
+        db: DB 세션
+        changed_band_ids: 임베딩이 변경된 밴드 ID 리스트
+        top_n: 밴드별 이웃 수
+        only_bands: True일 경우 is_band=true 버전 기준
+
+    Returns:
+        재계산이 필요한 기준 밴드 ID 집합 (변경된 밴드 자신 제외)
+    """
+    if not changed_band_ids:
+        return set()
+
+    params = {
+        "changed_ids": list(changed_band_ids),
+        "only_bands": only_bands,
+        "top_n": top_n,
+    }
+
+    query = text("""
+        SELECT DISTINCT band_id
+        FROM band_neighbors
+        WHERE only_bands = :only_bands
+          AND neighbor_band_id = ANY(:changed_ids)
+        UNION
+        SELECT w.band_id
+        FROM (
+            SELECT band_id, min(score) AS min_score, count(*) AS n
+            FROM band_neighbors
+            WHERE only_bands = :only_bands
+            GROUP BY band_id
+        ) w
+        JOIN band_description src ON src.band_id = w.band_id AND src.embedding IS NOT NULL
+        JOIN band_description c ON c.band_id = ANY(:changed_ids)
+                               AND c.embedding IS NOT NULL
+                               AND c.band_id != w.band_id
+        JOIN band cb ON cb.band_id = c.band_id
+        WHERE cb.deleted_at IS NULL
+          AND (NOT :only_bands OR cb.is_band = true)
+          AND (w.n < :top_n OR 1 - (src.embedding <=> c.embedding) > w.min_score)
+    """)
+
+    result = db.execute(query, params)
+    changed = set(changed_band_ids)
+    return {row.band_id for row in result if row.band_id not in changed}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -41,6 +41,8 @@ class RecommendedBand(BaseModel):
 
 class RecommendationResponse(BaseModel):
     bands: List[RecommendedBand]
+    degraded: Optional[str] = Field(default=None, description="시간 예산 초과/OpenAI 실패로 품질을 낮춘 경우 사유 (keyword_cache: 키워드별 벡터 평균으로 근사, band_only: 키워드 미반영), 정상이면 null")
+    debug: Optional[Dict[str, Any]] = Field(default=None, description="debug=true 요청 시 단계별 소요 시간(ms), trace=true면 진단 이벤트(diagnostics) 포함")
 
 
 # ============================================================
@@ -74,3 +76,4 @@ class FinalRecommendationResponse(BaseModel):
     isSuccess: bool = True
     message: str = "추천 밴드 업데이트 API"
     payload: RecommendationPayload
+    degraded: Optional[str] = Field(default=None, description="시간 예산 초과/OpenAI 실패로 품질을 낮춘 경우 사유 (keyword_cache: 키워드별 벡터 평균으로 근사, band_only: 키워드 미반영), 정상이면 null")
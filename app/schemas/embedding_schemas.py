@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class SingleEmbeddingRequest(BaseModel):
@@ -23,3 +23,13 @@ class BulkIdsEmbeddingRequest(BaseModel):
 class BulkIdsEmbeddingResponse(BaseModel):
     requestedCount: int
     processedCount: int
+
+
+class NeighborRebuildResponse(BaseModel):
+    totalRows: int
+
+
+class SnapshotExportResponse(BaseModel):
+    exported: bool  # false면 다른 워커가 내보내는 중
+    version: Optional[int] = None
+    count: Optional[int] = None
@@ -10,7 +10,7 @@ class RecommendBandRequest(BaseModel):
     - user_text, top_k 외에 추가 필드 필요하면 여기에 추가
     """
     user_text: str = Field(..., description="사용자의 음악 취향 텍스트(줄글)")
-    top_k: int = Field(5, description="추천 받을 밴드 개수")
+    top_k: int = Field(5, ge=1, description="추천 받을 밴드 개수 (서버 상한 RECOMMEND_BAND_MAX_TOP_K)")
 
 
 class BandItem(BaseModel):
@@ -0,0 +1,214 @@
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.repositories.band_catalog_repository import (
+    load_band_catalog_entries,
+    get_band_catalog_watermark,
+    get_band_ids_changed_since,
+)
+from app.repositories.band_description_repository import get_band_recommend_rows
+from app.services.catalog_generation import catalog_generation
+
+logger = logging.getLogger(__name__)
+
+
+class BandCatalog:
+    """
+    응답 결합(hydrate)용 밴드 정보의 프로세스 내 사본.
+
+    band_id → (이름, 이미지, 대표곡 URL, top_track, 키워드 목록)을 메모리에 두고,
+    추천 결과에 상세 정보를 붙일 때 DB 대신 사전 조회로 처리합니다.
+
+    - 시작 시 전체 로드
+    - 카탈로그 세대가 바뀌면(catalog_generation) 다음 조회 때 updated_at 워터마크 이후
+      바뀐 밴드만 다시 로드
+    - 워터마크로 알 수 없는 hard delete(top_track 삭제 등)는 주기적 전체 재로드로 반영
+    - 메모리에 없는 밴드는 DB에서 바로 읽어 채움
+    """
+
+    def __init__(self, full_reload_interval_seconds: float) -> None:
+        self.full_reload_interval_seconds = full_reload_interval_seconds
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._loaded = False
+        self._stale = False
+        self._loaded_at = 0.0
+        self._changed_at: Optional[datetime] = None
+        self._top_track_id = 0
+        self._lock = threading.Lock()
+        self.full_loads = 0
+        self.incremental_refreshes = 0
+        self.read_through_loads = 0
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """
+        전체 카탈로그 로드.
+
+        Args:
+            db: DB 세션 (None이면 자체 세션 사용)
+
+        Returns:
+            로드한 밴드 수
+        """
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            # 로드 도중의 변경을 다음 점진 갱신에서 다시 보도록 워터마크를 먼저 조회
+            changed_at, top_track_id = get_band_catalog_watermark(db)
+            entries = load_band_catalog_entries(db)
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            self._entries = entries
+            self._changed_at = changed_at
+            self._top_track_id = top_track_id
+            self._loaded = True
+            self._stale = False
+            self._loaded_at = time.monotonic()
+            self.full_loads += 1
+
+        logger.info(f"[band_catalog] 전체 로드: 밴드 {len(entries)}개")
+        return len(entries)
+
+    def _refresh(self, db: Session) -> None:
+        """세대 변경 이후 바뀐 밴드만 다시 로드"""
+        changed_at, top_track_id = get_band_catalog_watermark(db)
+        changed_ids = get_band_ids_changed_since(db, self._changed_at, self._top_track_id)
+        entries = load_band_catalog_entries(db, sorted(changed_ids))
+
+        with self._lock:
+            updated = dict(self._entries)
+            for band_id in changed_ids:
+                # 조회되지 않은 밴드는 삭제된 밴드
+                if band_id in entries:
+                    updated[band_id] = entries[band_id]
+                else:
+                    updated.pop(band_id, None)
+            self._entries = updated
+            self._changed_at = changed_at
+            self._top_track_id = top_track_id
+            self._stale = False
+            self.incremental_refreshes += 1
+
+        logger.info(f"[band_catalog] 점진 갱신: 밴드 {len(changed_ids)}개")
+
+    def _ensure_fresh(self, db: Session) -> None:
+        # 외부 변경은 catalog_generation 백그라운드 poll이 감지해 리스너로 mark_stale 호출
+        if not self._loaded or time.monotonic() - self._loaded_at >= self.full_reload_interval_seconds:
+            self.load(db)
+        elif self._stale:
+            self._refresh(db)
+
+    def get_many(self, db: Session, band_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        band_id 목록의 카탈로그 정보 조회 (삭제된 밴드는 결과에 없음).
+
+        Args:
+            db: 갱신/미적재 밴드 조회에 사용할 DB 세션
+            band_ids: 조회할 band_id 리스트
+
+        Returns:
+            {band_id: {"band_name", "main_image", "main_music", "top_track", "keywords"}, ...}
+            (호출자가 수정해도 되도록 키워드 리스트는 복사본)
+        """
+        if not band_ids:
+            return {}
+
+        try:
+            self._ensure_fresh(db)
+        except Exception as e:
+            # 갱신 실패 시 기존 사본으로 응답하고 다음 조회 때 다시 시도
+            logger.warning(f"[band_catalog] 갱신 실패, 기존 사본 사용: {e}")
+
+        entries = self._entries
+        missing = [band_id for band_id in dict.fromkeys(band_ids) if band_id not in entries]
+        if missing:
+            loaded = load_band_catalog_entries(db, missing)
+            if loaded:
+                with self._lock:
+                    self._entries = {**self._entries, **loaded}
+                    self.read_through_loads += 1
+            entries = {**entries, **loaded}
+
+        return {
+            band_id: dict(entries[band_id], keywords=list(entries[band_id]["keywords"]))
+            for band_id in band_ids
+            if band_id in entries
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "loaded": self._loaded,
+            "stale": self._stale,
+            "fullLoads": self.full_loads,
+            "incrementalRefreshes": self.incremental_refreshes,
+            "readThroughLoads": self.read_through_loads,
+        }
+
+
+band_catalog = BandCatalog(settings.BAND_CATALOG_FULL_RELOAD_SECONDS)
+
+# 카탈로그 세대가 바뀌면 다음 조회 때 바뀐 밴드만 다시 로드
+catalog_generation.add_listener(lambda generation: band_catalog.mark_stale())
+
+
+def hydrate_band_recommends(db: Session, recommends: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    저장된 추천 행([{"band_id", "score"}, ...])에 밴드 상세 정보를 결합 (삭제된 밴드 제외).
+
+    Args:
+        db: DB 세션
+        recommends: priority 순 추천 행 리스트
+
+    Returns:
+        [{
+            "band_id": int,
+            "score": float,
+            "band_name": str,
+            "image_url": str,
+            "top_track": {"title": str, "externalUrl": str} or None,
+            "keywords": [str, ...]
+        }, ...]
+    """
+    bands_info = band_catalog.get_many(db, [rec["band_id"] for rec in recommends])
+
+    band_details = []
+    for rec in recommends:
+        band_info = bands_info.get(rec["band_id"])
+        if band_info is None:
+            continue
+        band_details.append({
+            "band_id": rec["band_id"],
+            "score": rec["score"],
+            "band_name": band_info["band_name"],
+            "image_url": band_info["main_image"],
+            "top_track": band_info["top_track"],
+            "keywords": band_info["keywords"],
+        })
+    return band_details
+
+
+def get_band_recommends_with_details(db: Session, member_id: int) -> List[Dict[str, Any]]:
+    """
+    사용자의 저장된 추천 밴드를 상세 정보와 함께 조회 (band_recommend 1회 조회 + 카탈로그 결합).
+
+    Args:
+        db: DB 세션
+        member_id: 회원 ID
+
+    Returns:
+        hydrate_band_recommends와 같은 형식의 리스트 (priority 순)
+    """
+    return hydrate_band_recommends(db, get_band_recommend_rows(db, member_id))
@@ -1,5 +1,7 @@
 from typing import Optional
 
+import numpy as np
+
 from sqlalchemy.orm import Session
 
 from app.schemas.band_description_schemas import BandDescriptionResponse
@@ -11,11 +13,12 @@ def fetch_band_description(db: Session, band_id: int) -> Optional[BandDescriptio
     if row is None:
         return None
 
+    # pgvector 값(numpy 배열)을 한 번에 float 리스트로 변환
     embedding_list = None
     if row.embedding is not None:
-        embedding_list = list(row.embedding)
+        embedding_list = np.asarray(row.embedding, dtype=float).tolist()
 
-    return BandDescriptionResponse(
+    return BandDescriptionResponse.model_construct(
         bandId=row.band_id,
         description=row.description,
         createdAt=row.created_at,
@@ -0,0 +1,195 @@
+import logging
+from typing import List, Tuple, Set, Optional, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.services.catalog_generation import catalog_generation
+from app.services.embedding_snapshot import embedding_snapshot
+from app.repositories.band_description_repository import (
+    find_similar_bands_by_embedding,
+    find_similar_bands_in_candidates,
+)
+from app.repositories.band_neighbor_repository import (
+    get_band_neighbors,
+    get_neighbor_ids_by_band_ids,
+    rebuild_band_neighbors,
+    get_bands_affected_by_change,
+)
+
+logger = logging.getLogger(__name__)
+
+# 두 가지 버전의 이웃 목록: 전체 밴드 / is_band=true 밴드
+NEIGHBOR_VARIANTS = (False, True)
+
+
+# ============================================================
+# 이웃 테이블 갱신
+# ============================================================
+
+def rebuild_all_band_neighbors() -> int:
+    """
+    전체 밴드의 이웃 목록을 두 버전 모두 다시 계산.
+
+    Returns:
+        저장된 이웃 row 수 (두 버전 합계)
+    """
+    db: Session = SessionLocal()
+    try:
+        total = 0
+        for only_bands in NEIGHBOR_VARIANTS:
+            total += rebuild_band_neighbors(
+                db, None, settings.BAND_NEIGHBORS_TOP_N, only_bands=only_bands
+            )
+        db.commit()
+        catalog_generation.bump("band_neighbors 전체 재계산")
+        logger.info(f"[band_neighbors] 전체 재계산 완료: {total}개 row")
+        return total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def refresh_band_neighbors(changed_band_ids: Iterable[int]) -> int:
+    """
+    임베딩이 바뀐 밴드 기준으로 이웃 목록을 점진적으로 갱신.
+
+    변경된 밴드 자신과, 변경된 밴드 때문에 이웃 목록이 달라질 수 있는
+    밴드만 다시 계산합니다. 실패해도 임베딩 갱신 자체는 유지되도록
+    예외를 로그로만 남깁니다.
+
+    Args:
+        changed_band_ids: 임베딩이 변경된 band_id 목록
+
+    Returns:
+        재계산한 기준 밴드 수 (두 버전 합계)
+    """
+    changed = sorted(set(changed_band_ids))
+    if not changed or not settings.BAND_NEIGHBORS_ENABLED:
+        return 0
+
+    top_n = settings.BAND_NEIGHBORS_TOP_N
+    db: Session = SessionLocal()
+    try:
+        refreshed = 0
+        for only_bands in NEIGHBOR_VARIANTS:
+            affected = get_bands_affected_by_change(db, changed, top_n, only_bands=only_bands)
+            targets = sorted(affected | set(changed))
+            rebuild_band_neighbors(db, targets, top_n, only_bands=only_bands)
+            refreshed += len(targets)
+        db.commit()
+        catalog_generation.bump("band_neighbors 점진 갱신")
+        logger.info(
+            f"[band_neighbors] 점진 갱신 완료: 변경 {len(changed)}개 → 재계산 {refreshed}개"
+        )
+        return refreshed
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[band_neighbors] 점진 갱신 실패 (다음 갱신 때 재시도 필요): {e}")
+        return 0
+    finally:
+        db.close()
+
+
+# ============================================================
+# 이웃 테이블 기반 검색
+# ============================================================
+
+def lookup_single_band_neighbors(
+    db: Session,
+    band_id: int,
+    top_k: int,
+    only_bands: bool = False,
+) -> Optional[List[Tuple[int, float]]]:
+    """
+    단일 밴드 추천을 사전 계산된 이웃 목록으로 바로 응답.
+
+    Args:
+        db: DB 세션
+        band_id: 사용자가 선택한 밴드 ID
+        top_k: 반환할 밴드 수
+        only_bands: True일 경우 is_band=true 버전 사용
+
+    Returns:
+        [(band_id, score), ...] 또는 이웃이 부족하면 None (벡터 검색으로 폴백)
+    """
+    if not settings.BAND_NEIGHBORS_ENABLED or top_k > settings.BAND_NEIGHBORS_TOP_N:
+        return None
+
+    neighbors = get_band_neighbors(db, band_id, only_bands=only_bands, limit=top_k)
+    if len(neighbors) < top_k:
+        return None
+    return neighbors
+
+
+def search_with_neighbor_seed(
+    db: Session,
+    user_embedding: List[float],
+    seed_band_ids: Set[int],
+    top_k: int,
+    exclude_band_ids: Set[int] | None = None,
+    only_bands: bool = False,
+) -> List[Tuple[int, float]]:
+    """
+    선택 밴드들의 이웃 목록을 후보 풀로 삼아 사용자 벡터로 정확히 채점.
+
+    선택 밴드 수가 적어 사용자 벡터가 선택 밴드 근처에 있는 경우에만 사용하며,
+    후보가 부족하거나 이웃이 계산되지 않은 밴드가 있으면 pgvector 검색으로 폴백합니다.
+
+    Args:
+        db: DB 세션
+        user_embedding: 사용자 임베딩 벡터
+        seed_band_ids: 후보 풀을 만들 선택 밴드 ID 집합
+        top_k: 반환할 밴드 수
+        exclude_band_ids: 제외할 band_id 집합
+        only_bands: True일 경우 is_band=true인 밴드만 반환
+
+    Returns:
+        [(band_id, score), ...] 형태의 리스트 (유사도 높은 순)
+    """
+    exclude_band_ids = exclude_band_ids or set()
+
+    use_seed = (
+        settings.BAND_NEIGHBORS_ENABLED
+        and 0 < len(seed_band_ids) <= settings.BAND_NEIGHBORS_SEED_MAX_BANDS
+    )
+    if use_seed:
+        neighbors = get_neighbor_ids_by_band_ids(db, list(seed_band_ids), only_bands=only_bands)
+        if len(neighbors) == len(seed_band_ids):
+            candidates = set().union(*neighbors.values()) - exclude_band_ids
+            if len(candidates) >= top_k:
+                # 최신 임베딩 스냅샷이 있으면 DB 대신 메모리(mmap)에서 채점
+                snapshot = embedding_snapshot.get()
+                if snapshot is not None:
+                    results = snapshot.score_candidates(
+                        user_embedding=user_embedding,
+                        candidate_band_ids=candidates,
+                        top_k=top_k,
+                        exclude_band_ids=exclude_band_ids,
+                        only_bands=only_bands,
+                    )
+                else:
+                    results = find_similar_bands_in_candidates(
+                        db=db,
+                        user_embedding=user_embedding,
+                        candidate_band_ids=candidates,
+                        top_k=top_k,
+                        exclude_band_ids=exclude_band_ids,
+                        only_bands=only_bands,
+                    )
+                if len(results) >= top_k:
+                    logger.info(f"  이웃 후보 풀 사용: 후보 {len(candidates)}개 → {len(results)}개 선택")
+                    return results
+
+        logger.info("  이웃 후보 풀 부족 → pgvector 검색으로 폴백")
+
+    return find_similar_bands_by_embedding(
+        db=db,
+        user_embedding=user_embedding,
+        top_k=top_k,
+        exclude_band_ids=exclude_band_ids,
+        only_bands=only_bands,
+    )
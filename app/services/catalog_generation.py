@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 추천 결과에 영향을 주는 테이블들의 변경 감지용 워터마크
+# (행 수 + 최근 수정/삭제 시각이 바뀌면 카탈로그가 바뀐 것으로 간주)
+_WATERMARK_QUERY = text("""
+    SELECT concat_ws('|',
+        (SELECT concat_ws(',', count(*), max(updated_at), max(deleted_at)) FROM band),
+        (SELECT concat_ws(',', count(*), count(embedding), max(updated_at), max(deleted_at)) FROM band_description),
+        (SELECT concat_ws(',', count(*), max(updated_at), max(deleted_at)) FROM keyword),
+        (SELECT concat_ws(',', count(*), max(updated_at), max(deleted_at)) FROM band_keyword),
+        (SELECT concat_ws(',', count(*), max(top_track_id)) FROM top_track)
+    ) AS watermark
+""")
+
+
+class CatalogGeneration:
+    """
+    밴드/키워드/임베딩 카탈로그의 세대(generation) 카운터.
+
+    - 이 프로세스에서 임베딩을 갱신하면 bump()로 즉시 증가
+    - Spring 서버 등 외부 변경은 백그라운드 스레드가 poll 간격마다 DB 워터마크를 비교해 감지
+      (요청 경로의 current()는 DB를 조회하지 않음)
+    - 세대가 바뀌면 등록된 리스너(캐시 무효화 등)를 호출
+    """
+
+    def __init__(self, poll_interval_seconds: float) -> None:
+        self.poll_interval_seconds = poll_interval_seconds
+        self._generation = 0
+        self._watermark: Optional[str] = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[int], None]] = []
+        self._wakeup = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """DB 워터마크 해시 (프로세스/재시작과 무관하게 같은 카탈로그면 같은 값, 첫 확인 전에는 None)"""
+        return self._watermark
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        """첫 워터마크 확인 후 주기적 확인 스레드 시작 (서버 시작 시 1회)"""
+        if self._poller is not None:
+            return
+        self.poll()
+        self._poller = threading.Thread(target=self._run_polls, name="catalog-generation", daemon=True)
+        self._poller.start()
+
+    def _run_polls(self) -> None:
+        while True:
+            # bump() 직후에는 간격을 기다리지 않고 바로 워터마크를 다시 확인
+            self._wakeup.wait(self.poll_interval_seconds)
+            self._wakeup.clear()
+            self.poll()
+
+    def current(self) -> int:
+        """현재 세대 반환 (DB 조회 없음)"""
+        return self._generation
+
+    def bump(self, reason: str) -> int:
+        """이 프로세스에서 카탈로그를 바꾼 직후 호출 (백그라운드 스레드가 워터마크도 곧바로 재확인)"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        logger.info(f"[catalog] 세대 증가 → {generation} ({reason})")
+        self._notify(generation)
+        self._wakeup.set()
+        return generation
+
+    def poll(self) -> None:
+        """DB 워터마크를 확인해 바뀌었으면 세대 증가 (백그라운드 스레드/시작 시 호출)"""
+        try:
+            db: Session = SessionLocal()
+            try:
+                raw = db.execute(_WATERMARK_QUERY).scalar() or ""
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"[catalog] 워터마크 조회 실패, 기존 세대 유지: {e}")
+            return
+
+        watermark = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        with self._lock:
+            if watermark == self._watermark:
+                return
+            first_poll = self._watermark is None
+            self._watermark = watermark
+            if first_poll:
+                return
+            self._generation += 1
+            generation = self._generation
+
+        logger.info(f"[catalog] DB 변경 감지 → 세대 {generation}")
+        self._notify(generation)
+
+    def _notify(self, generation: int) -> None:
+        for listener in self._listeners:
+            try:
+                listener(generation)
+            except Exception as e:
+                logger.error(f"[catalog] 세대 변경 리스너 실행 실패: {e}")
+
+
+catalog_generation = CatalogGeneration(settings.CATALOG_POLL_INTERVAL_SECONDS)
@@ -1,38 +1,85 @@
 import time
-from typing import Tuple, List
+from datetime import datetime
+from typing import Tuple, List, Union, Optional
 
 from openai import OpenAI
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.openai_client import get_openai_client
+from app.core.metrics import OPENAI_LATENCY, OPENAI_REQUESTS, OPENAI_TOKENS
 from app.core.db import SessionLocal
 from app.models.band_description import BandDescription
+from app.services.catalog_generation import catalog_generation
+from app.services.band_neighbor_service import (
+    refresh_band_neighbors,
+    rebuild_all_band_neighbors,
+)
 
 
 class EmbeddingService:
 
     def __init__(self) -> None:
-        if not settings.has_openai_key:
-            raise RuntimeError("OPENAI_API_KEY가 설정되어 있지 않습니다.")
-
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
         self.model_name = settings.OPENAI_EMBEDDING_MODEL
 
+    # 프로세스 공유 클라이언트 (첫 호출 때 생성, 커넥션 풀/타임아웃/재시도는 app/core/openai_client.py 설정)
+    @property
+    def client(self) -> OpenAI:
+        return get_openai_client()
+
+    # 임베딩 API 호출 (호출 수/지연/토큰 사용량/오류 메트릭 기록)
+    # timeout(초)을 주면 그 시간 안에 끝나지 않을 때 재시도 없이 실패 (요청 시간 예산 안에서 호출할 때)
+    def _create_embeddings(self, operation: str, inputs: Union[str, List[str]], timeout: Optional[float] = None):
+
+        client = self.client
+        if timeout is not None:
+            client = client.with_options(timeout=timeout, max_retries=0)
+
+        start = time.perf_counter()
+        try:
+            response = client.embeddings.create(
+                model=self.model_name,
+                input=inputs,
+            )
+        except Exception as e:
+            OPENAI_REQUESTS.labels(operation=operation, outcome=type(e).__name__).inc()
+            raise
+        finally:
+            OPENAI_LATENCY.labels(operation=operation).observe(time.perf_counter() - start)
+
+        OPENAI_REQUESTS.labels(operation=operation, outcome="ok").inc()
+        if response.usage is not None:
+            OPENAI_TOKENS.labels(operation=operation).inc(response.usage.total_tokens)
+        return response
+
     # 단일 텍스트 임베딩 생성
-    def embed_single_text(self, text: str) -> Tuple[str, list[float]]:
+    def embed_single_text(
+        self,
+        text: str,
+        operation: str = "single",
+        timeout: Optional[float] = None,
+    ) -> Tuple[str, list[float]]:
 
         cleaned = text.strip()
         if not cleaned:
             raise ValueError("입력 text가 비어 있습니다.")
 
-        response = self.client.embeddings.create(
-            model=self.model_name,
-            input=cleaned,
-        )
+        response = self._create_embeddings(operation, cleaned, timeout=timeout)
 
         embedding = response.data[0].embedding
         return response.model, embedding
 
+    # 여러 텍스트 임베딩을 한 번에 생성 (입력 순서대로 반환, DB 저장 없음)
+    def embed_texts(self, texts: List[str], operation: str = "batch") -> Tuple[str, List[list[float]]]:
+
+        cleaned = [text.strip() for text in texts]
+        if not cleaned or not all(cleaned):
+            raise ValueError("입력 texts에 빈 값이 있습니다.")
+
+        response = self._create_embeddings(operation, cleaned)
+
+        return response.model, [item.embedding for item in response.data]
+
     # 특정 band_description_id 배열에 대해서만 임베딩 생성/갱신
     def update_band_descriptions_by_ids(self, band_description_ids: List[int]) -> int:
 
@@ -58,6 +105,8 @@ class EmbeddingService:
             if not rows:
                 return 0
 
+            changed_band_ids = set()
+
             # 배치 단위로 잘라서 임베딩 호출
             for i in range(0, len(rows), batch_size):
                 batch_rows = rows[i : i + batch_size]
@@ -72,17 +121,21 @@ class EmbeddingService:
 
                 batch_rows_valid, texts_valid = zip(*valid_pairs)
 
-                response = self.client.embeddings.create(
-                    model=self.model_name,
-                    input=list(texts_valid),
-                )
+                response = self._create_embeddings("batch", list(texts_valid))
 
+                now = datetime.now()
                 for row, item in zip(batch_rows_valid, response.data):
                     row.embedding = item.embedding
+                    row.updated_at = now
+                    changed_band_ids.add(row.band_id)
 
                 total_processed += len(batch_rows_valid)
 
             db.commit()
+            catalog_generation.bump("임베딩 갱신 (update-by-ids)")
+
+            # 임베딩이 바뀐 밴드 기준으로 이웃 테이블 점진 갱신
+            refresh_band_neighbors(changed_band_ids)
 
             return total_processed
 
@@ -104,6 +157,7 @@ class EmbeddingService:
                 .update({BandDescription.embedding: None}, synchronize_session=False)
             )
             db.commit()
+            catalog_generation.bump("임베딩 초기화 (reset)")
         except Exception as e:
             db.rollback()
             print(f"임베딩 초기화 중 에러 발생, 롤백: {e}")
@@ -112,15 +166,20 @@ class EmbeddingService:
             db.close()
 
         # 2) 임베딩 업데이트 메소드 사용하여 임베딩 생성
-        total_processed = self.update_missing_band_description_embedding()
+        total_processed = self.update_missing_band_description_embedding(refresh_neighbors=False)
+
+        # 3) 전체 임베딩이 바뀌었으므로 이웃 테이블은 점진 갱신 대신 전체 재계산
+        if settings.BAND_NEIGHBORS_ENABLED:
+            rebuild_all_band_neighbors()
         return total_processed
 
 
     # 임베딩이 없는 band_description에 대해 임베딩 수행
-    def update_missing_band_description_embedding(self) -> int:
+    def update_missing_band_description_embedding(self, refresh_neighbors: bool = True) -> int:
 
         batch_size = 100
         total_processed = 0
+        changed_band_ids = set()
 
         while True:
             db: Session = SessionLocal()
@@ -144,15 +203,16 @@ class EmbeddingService:
 
                 print(f"{len(rows)}개 행 임베딩 생성 중... (누적 {total_processed}개)")
 
-                response = self.client.embeddings.create(
-                    model=self.model_name,
-                    input=texts,
-                )
+                response = self._create_embeddings("batch", texts)
 
+                now = datetime.now()
                 for row, item in zip(rows, response.data):
                     row.embedding = item.embedding
+                    row.updated_at = now
+                    changed_band_ids.add(row.band_id)
 
                 db.commit()
+                catalog_generation.bump("임베딩 갱신 (update-missing)")
                 total_processed += len(rows)
 
             except Exception as e:
@@ -165,6 +225,10 @@ class EmbeddingService:
             time.sleep(0.2)
 
         print(f"임베딩 완료 : 총 {total_processed}개 행 처리됨.")
+
+        # 임베딩이 바뀐 밴드 기준으로 이웃 테이블 점진 갱신
+        if refresh_neighbors:
+            refresh_band_neighbors(changed_band_ids)
         return total_processed
 
 
@@ -0,0 +1,432 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import fcntl
+import hashlib
+import itertools
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.repositories.band_description_repository import (
+    count_embedding_snapshot_rows,
+    get_embedding_watermark,
+    iter_embedding_snapshot_rows,
+)
+from app.services.catalog_generation import catalog_generation
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".export.lock"
+SNAPSHOT_FORMAT = 1
+
+# 스냅샷 한 버전을 구성하는 배열 파일 (모두 같은 행 순서, band_id 오름차순)
+ARRAY_FILES = {
+    "embeddings": "embeddings.npy",  # float32 (N, dim)
+    "norms": "norms.npy",            # float32 (N,)
+    "band_ids": "band_ids.npy",      # int64 (N,)
+    "is_band": "is_band.npy",        # bool (N,)
+    "deleted": "deleted.npy",        # bool (N,)
+}
+
+# 내보낼 때 한 번에 DB에서 받아 파일에 쓰는 행 수
+EXPORT_BATCH_SIZE = 1000
+
+
+def _hash_watermark(raw: str) -> str:
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# ============================================================
+# 내보내기 (band_description → .npy)
+# ============================================================
+
+def _write_snapshot_arrays(db: Session, tmp_dir: str, count: int) -> Tuple[int, int]:
+    """
+    스냅샷 행을 스트리밍으로 읽어 tmp_dir의 .npy 파일에 바로 기록.
+
+    Args:
+        db: DB 세션
+        tmp_dir: 배열 파일을 쓸 임시 디렉터리
+        count: count_embedding_snapshot_rows로 센 행 수
+
+    Returns:
+        (행 수, 임베딩 차원)
+
+    Raises:
+        RuntimeError: 세는 사이에 행 수가 바뀐 경우 (다음 검증 때 다시 내보냄)
+    """
+    rows = iter_embedding_snapshot_rows(db, batch_size=EXPORT_BATCH_SIZE)
+    first = next(rows, None)
+    if first is None or count == 0:
+        if (first is None) != (count == 0):
+            raise RuntimeError("내보내는 도중 임베딩 행 수가 바뀜")
+        empty = {
+            "embeddings": np.zeros((0, 0), dtype=np.float32),
+            "norms": np.zeros(0, dtype=np.float32),
+            "band_ids": np.zeros(0, dtype=np.int64),
+            "is_band": np.zeros(0, dtype=bool),
+            "deleted": np.zeros(0, dtype=bool),
+        }
+        for name, filename in ARRAY_FILES.items():
+            np.save(os.path.join(tmp_dir, filename), empty[name])
+        return 0, 0
+
+    dim = len(first[1])
+    shapes = {
+        "embeddings": ((count, dim), np.float32),
+        "norms": ((count,), np.float32),
+        "band_ids": ((count,), np.int64),
+        "is_band": ((count,), bool),
+        "deleted": ((count,), bool),
+    }
+    arrays = {
+        name: np.lib.format.open_memmap(
+            os.path.join(tmp_dir, ARRAY_FILES[name]), mode="w+", dtype=dtype, shape=shape
+        )
+        for name, (shape, dtype) in shapes.items()
+    }
+
+    written = 0
+    batch_start = 0
+    for band_id, embedding, row_is_band, row_deleted in itertools.chain([first], rows):
+        if written >= count:
+            raise RuntimeError("내보내는 도중 임베딩 행 수가 바뀜")
+        arrays["embeddings"][written] = np.asarray(embedding, dtype=np.float32)
+        arrays["band_ids"][written] = band_id
+        arrays["is_band"][written] = bool(row_is_band)
+        arrays["deleted"][written] = bool(row_deleted)
+        written += 1
+        if written - batch_start == EXPORT_BATCH_SIZE:
+            _fill_norms(arrays, batch_start, written)
+            batch_start = written
+    if written != count:
+        raise RuntimeError("내보내는 도중 임베딩 행 수가 바뀜")
+    _fill_norms(arrays, batch_start, written)
+
+    for array in arrays.values():
+        array.flush()
+    return count, dim
+
+
+def _fill_norms(arrays: Dict[str, np.ndarray], start: int, end: int) -> None:
+    arrays["norms"][start:end] = np.linalg.norm(arrays["embeddings"][start:end], axis=1)
+
+
+def export_embedding_snapshot(db: Optional[Session] = None, directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    band_description 임베딩을 새 스냅샷 버전으로 내보냄.
+
+    행 수를 먼저 세어 임시 디렉터리에 최종 크기의 .npy 파일(open_memmap)을 만들고
+    DB 결과를 배치 단위로 스트리밍해 바로 채우므로 전체 행렬을 메모리에 올리지 않습니다.
+    배열 파일을 모두 쓴 뒤 버전 디렉터리로 rename하고,
+    마지막에 manifest.json을 교체(os.replace)하므로 읽는 쪽은 항상 완성된 버전만 봅니다.
+    여러 워커가 동시에 호출해도 파일 잠금으로 한 곳에서만 내보냅니다.
+
+    Args:
+        db: DB 세션 (None이면 자체 세션 사용)
+        directory: 스냅샷 디렉터리 (None이면 EMBEDDING_SNAPSHOT_DIR)
+
+    Returns:
+        새 manifest 또는 다른 워커가 내보내는 중이면 None
+    """
+    directory = directory or settings.EMBEDDING_SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, LOCK_FILE), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("[embedding_snapshot] 다른 워커가 내보내는 중 → 생략")
+            return None
+
+        previous = _read_manifest(directory)
+        version = (previous["version"] + 1) if previous else 1
+        version_dir = f"v{version}"
+
+        tmp_dir = os.path.join(directory, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            # 내보내는 도중의 변경은 다음 검증에서 다시 감지되도록 워터마크를 먼저 조회
+            watermark = _hash_watermark(get_embedding_watermark(db))
+            count, dim = _write_snapshot_arrays(db, tmp_dir, count_embedding_snapshot_rows(db))
+            os.rename(tmp_dir, os.path.join(directory, version_dir))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        finally:
+            if own_session:
+                db.close()
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": version,
+            "path": version_dir,
+            "watermark": watermark,
+            "count": count,
+            "dim": dim,
+            "createdAt": datetime.now().isoformat(),
+        }
+        tmp_manifest = os.path.join(directory, f".{MANIFEST_FILE}.tmp")
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_manifest, os.path.join(directory, MANIFEST_FILE))
+
+        # 현재 + 직전 버전만 유지 (이미 mmap한 워커는 파일이 지워져도 계속 읽을 수 있음)
+        keep = {version_dir, previous["path"] if previous else None}
+        for entry in os.listdir(directory):
+            if entry.startswith("v") and entry not in keep:
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+        logger.info(f"[embedding_snapshot] 버전 {version} 내보내기 완료: 밴드 {count}개, dim={dim}")
+        return manifest
+
+
+# ============================================================
+# 읽기 (mmap)
+# ============================================================
+
+class EmbeddingSnapshot:
+    """mmap으로 연 스냅샷 한 버전 (읽기 전용, 워커 간 페이지 캐시 공유)"""
+
+    def __init__(self, directory: str, manifest: Dict[str, Any]) -> None:
+        self.version: int = manifest["version"]
+        self.watermark: str = manifest["watermark"]
+        path = os.path.join(directory, manifest["path"])
+        arrays = {
+            name: np.load(os.path.join(path, filename), mmap_mode="r")
+            for name, filename in ARRAY_FILES.items()
+        }
+        self.embeddings: np.ndarray = arrays["embeddings"]
+        self.norms: np.ndarray = arrays["norms"]
+        self.band_ids: np.ndarray = arrays["band_ids"]
+        self.is_band: np.ndarray = arrays["is_band"]
+        self.deleted: np.ndarray = arrays["deleted"]
+        self._row_by_band_id: Dict[int, int] = {
+            int(band_id): row for row, band_id in enumerate(self.band_ids.tolist())
+        }
+
+    def __len__(self) -> int:
+        return len(self._row_by_band_id)
+
+    def get_embeddings(self, band_ids: List[int]) -> Dict[int, np.ndarray]:
+        """
+        band_id → 임베딩 복사본 (스냅샷에 없는 밴드, 즉 임베딩 없는 밴드는 제외).
+
+        DB 조회(get_recommendation_inputs)와 마찬가지로 삭제 여부는 보지 않습니다.
+        """
+        found = {}
+        for band_id in dict.fromkeys(band_ids):
+            row = self._row_by_band_id.get(band_id)
+            if row is not None:
+                found[band_id] = np.array(self.embeddings[row])
+        return found
+
+    def score_candidates(
+        self,
+        user_embedding: np.ndarray,
+        candidate_band_ids: Set[int],
+        top_k: int,
+        exclude_band_ids: Set[int] | None = None,
+        only_bands: bool = False,
+    ) -> List[Tuple[int, float]]:
+        """
+        후보 밴드만 코사인 유사도로 채점해 상위 top_k 반환 (find_similar_bands_in_candidates와 같은 조건).
+
+        Returns:
+            [(band_id, score), ...] 형태의 리스트 (유사도 높은 순)
+        """
+        exclude_band_ids = exclude_band_ids or set()
+        rows = [
+            self._row_by_band_id[band_id]
+            for band_id in candidate_band_ids
+            if band_id in self._row_by_band_id and band_id not in exclude_band_ids
+        ]
+        if not rows:
+            return []
+
+        rows = np.asarray(sorted(rows))
+        keep = ~self.deleted[rows]
+        if only_bands:
+            keep &= self.is_band[rows]
+        rows = rows[keep]
+        if len(rows) == 0:
+            return []
+
+        query = np.asarray(user_embedding, dtype=np.float32)
+        denom = self.norms[rows] * np.linalg.norm(query)
+        scores = (self.embeddings[rows] @ query) / np.where(denom == 0, 1.0, denom)
+
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(int(self.band_ids[rows[i]]), float(scores[i])) for i in order]
+
+
+class EmbeddingSnapshotStore:
+    """
+    현재 스냅샷 버전을 관리 (재시작 없이 새 버전으로 교체).
+
+    - manifest.json이 바뀌면 새 버전을 mmap으로 열고 참조만 교체
+    - 카탈로그 세대가 바뀌면 DB 워터마크와 비교해 스냅샷이 최신인지 확인하고,
+      오래됐으면 사용을 멈추고(DB 조회로 폴백) 백그라운드에서 새 버전을 내보냄
+    """
+
+    def __init__(self, directory: str, enabled: bool, check_interval_seconds: float) -> None:
+        self.directory = directory
+        self.enabled = enabled
+        self.check_interval_seconds = check_interval_seconds
+        self._snapshot: Optional[EmbeddingSnapshot] = None
+        self._manifest_mtime: Optional[int] = None
+        self._last_check = 0.0
+        self._fresh = False
+        self._verified_generation: Optional[int] = None
+        self._last_verify = 0.0
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self.swaps = 0
+        self.stale_hits = 0
+
+    def open(self) -> None:
+        """시작 시 현재 버전을 열고 최신인지 확인 (없거나 오래됐으면 백그라운드 내보내기)"""
+        if not self.enabled:
+            return
+        self._check_manifest(force=True)
+        self._schedule_verify()
+
+    def get(self) -> Optional[EmbeddingSnapshot]:
+        """
+        사용 가능한 최신 스냅샷 반환.
+
+        Returns:
+            EmbeddingSnapshot 또는 비활성/없음/오래됨이면 None (호출자는 DB 조회로 폴백)
+        """
+        if not self.enabled:
+            return None
+
+        self._check_manifest()
+        generation = catalog_generation.current()
+        if (
+            generation != self._verified_generation
+            and time.monotonic() - self._last_verify >= self.check_interval_seconds
+        ):
+            self._schedule_verify()
+
+        if self._snapshot is None or not self._fresh:
+            self.stale_hits += 1
+            return None
+        return self._snapshot
+
+    def _check_manifest(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval_seconds:
+            return
+        self._last_check = now
+
+        try:
+            mtime = os.stat(os.path.join(self.directory, MANIFEST_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+
+        manifest = _read_manifest(self.directory)
+        if manifest is None or manifest.get("format") != SNAPSHOT_FORMAT:
+            return
+        try:
+            snapshot = EmbeddingSnapshot(self.directory, manifest)
+        except Exception as e:
+            logger.warning(f"[embedding_snapshot] 버전 {manifest.get('version')} 열기 실패: {e}")
+            return
+
+        with self._lock:
+            previous = self._snapshot
+            self._snapshot = snapshot
+            self._manifest_mtime = mtime
+            # 새 버전은 DB 워터마크와 비교하기 전까지 사용하지 않음
+            self._fresh = False
+            self._verified_generation = None
+            self.swaps += 1
+        logger.info(
+            f"[embedding_snapshot] 버전 교체: {previous.version if previous else None} → {snapshot.version} "
+            f"(밴드 {len(snapshot)}개)"
+        )
+
+    def mark_unverified(self) -> None:
+        """카탈로그가 바뀐 직후 호출 - DB와 다시 비교하기 전까지 스냅샷 사용 중지"""
+        self._fresh = False
+
+    def _schedule_verify(self) -> None:
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._last_verify = time.monotonic()
+            self._worker = threading.Thread(target=self._verify, name="embedding-snapshot", daemon=True)
+            self._worker.start()
+
+    def _verify(self) -> None:
+        """DB 워터마크와 스냅샷 비교, 오래됐으면 새 버전 내보내기"""
+        try:
+            generation = catalog_generation.current()
+            db: Session = SessionLocal()
+            try:
+                watermark = _hash_watermark(get_embedding_watermark(db))
+            finally:
+                db.close()
+
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.watermark == watermark:
+                self._fresh = True
+                self._verified_generation = generation
+                return
+
+            self._fresh = False
+            logger.info("[embedding_snapshot] 스냅샷이 DB보다 오래됨 → 새 버전 내보내기")
+            if export_embedding_snapshot(directory=self.directory) is not None:
+                self._check_manifest(force=True)
+                snapshot = self._snapshot
+                if snapshot is not None and snapshot.watermark == watermark:
+                    self._fresh = True
+                    self._verified_generation = generation
+        except Exception as e:
+            logger.error(f"[embedding_snapshot] 스냅샷 검증/내보내기 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "version": snapshot.version if snapshot else None,
+            "size": len(snapshot) if snapshot else 0,
+            "fresh": self._fresh,
+            "swaps": self.swaps,
+            "staleHits": self.stale_hits,
+        }
+
+
+embedding_snapshot = EmbeddingSnapshotStore(
+    directory=settings.EMBEDDING_SNAPSHOT_DIR,
+    enabled=settings.EMBEDDING_SNAPSHOT_ENABLED,
+    check_interval_seconds=settings.EMBEDDING_SNAPSHOT_CHECK_INTERVAL_SECONDS,
+)
+
+# 카탈로그 세대가 바뀌면 검증 전까지 스냅샷 사용 중지 (다음 get()에서 재검증)
+catalog_generation.add_listener(lambda generation: embedding_snapshot.mark_unverified())
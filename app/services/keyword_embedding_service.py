@@ -0,0 +1,213 @@
+import time
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core import deadline
+from app.core.cache import TTLLRUCache
+from app.core.config import settings
+from app.core.metrics import KEYWORD_EMBEDDING_OUTCOMES
+from app.repositories.band_description_repository import get_all_keywords
+from app.services.embedding_service import embedding_service
+
+logger = logging.getLogger(__name__)
+
+# 키워드 벡터는 텍스트와 모델로만 정해지므로 카탈로그 세대와 무관하게 오래 보관
+# (모델, 키워드 문장) → 임베딩
+keyword_sentence_cache = TTLLRUCache(
+    "keyword_sentence_embedding",
+    max_size=settings.KEYWORD_EMBEDDING_CACHE_MAX_SIZE,
+    ttl_seconds=settings.KEYWORD_EMBEDDING_CACHE_TTL_SECONDS,
+)
+# (모델, 키워드 1개) → 임베딩 (문장 임베딩을 못 구했을 때 평균으로 근사하는 데 사용)
+keyword_vector_cache = TTLLRUCache(
+    "keyword_vector",
+    max_size=settings.KEYWORD_EMBEDDING_CACHE_MAX_SIZE,
+    ttl_seconds=settings.KEYWORD_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass
+class KeywordEmbedding:
+    """
+    키워드 임베딩 조회 결과.
+
+    Attributes:
+        vector: 키워드 문장 임베딩 (구하지 못했으면 None → 밴드 기반 벡터만 사용)
+        source: cache | openai | hedge | keyword_cache(키워드별 벡터 평균으로 근사) | unavailable
+        error: 실패/시간 초과 사유
+    """
+    vector: Optional[np.ndarray]
+    source: str
+    error: Optional[str] = None
+
+    @property
+    def degraded(self) -> bool:
+        return self.source in ("keyword_cache", "unavailable")
+
+
+def _frozen(embedding) -> np.ndarray:
+    """캐시에 넣는 벡터는 여러 요청이 공유하므로 읽기 전용으로"""
+    vector = np.asarray(embedding, dtype=np.float64)
+    vector.flags.writeable = False
+    return vector
+
+
+class KeywordEmbeddingService:
+    """
+    요청 시간 예산 안에서 키워드 문장 임베딩을 구함.
+
+    1. 같은 문장의 임베딩이 캐시에 있으면 바로 사용
+    2. OpenAI 호출 (타임아웃 = min(설정값, 남은 예산 - 이후 단계 몫))
+       - 헤징을 켜면 첫 호출이 HEDGE_DELAY 안에 끝나지 않거나 실패했을 때 같은 요청을 한 번 더 보내 먼저 온 응답 사용
+    3. 시간 초과/실패 시 키워드별 캐시 벡터가 모두 있으면 평균으로 근사 (degraded)
+    4. 그것도 없으면 None (호출자는 키워드 없이 밴드 기반으로 추천, degraded)
+
+    시간 초과로 버린 호출도 백그라운드에서 끝나면 캐시를 채워 다음 요청이 사용합니다.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="keyword-embedding",
+                    )
+        return self._pool
+
+    def _request(self, keywords: List[str], sentence: str, timeout: float) -> np.ndarray:
+        """OpenAI 호출 1회 (작업자 스레드에서 실행) - 성공하면 캐시에 저장"""
+        _, embedding = embedding_service.embed_single_text(sentence, operation="keyword", timeout=timeout)
+        vector = _frozen(embedding)
+        keyword_sentence_cache.set((embedding_service.model_name, sentence), vector)
+        if len(keywords) == 1:
+            keyword_vector_cache.set((embedding_service.model_name, keywords[0]), vector)
+        return vector
+
+    def _timeout(self) -> float:
+        timeout = settings.KEYWORD_EMBEDDING_TIMEOUT_MS / 1000
+        left = deadline.remaining()
+        if left is not None:
+            # 검색/결합 등 이후 단계가 쓸 시간은 남겨둠
+            timeout = min(timeout, left - settings.RECOMMEND_DEADLINE_RESERVE_MS / 1000)
+        return timeout
+
+    def _call_with_deadline(self, keywords: List[str], sentence: str, timeout: float) -> KeywordEmbedding:
+        pool = self._get_pool()
+        started = time.monotonic()
+        end = started + timeout
+        hedge_at = started + settings.KEYWORD_EMBEDDING_HEDGE_DELAY_MS / 1000
+        can_hedge = settings.KEYWORD_EMBEDDING_HEDGE_ENABLED
+
+        futures: Dict[Future, str] = {pool.submit(self._request, keywords, sentence, timeout): "openai"}
+        error: Optional[str] = None
+
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                break
+
+            wait_until = min(end, hedge_at) if can_hedge else end
+            done, _ = wait(list(futures), timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                source = futures.pop(future)
+                if future.exception() is None:
+                    return KeywordEmbedding(future.result(), source)
+                error = f"{type(future.exception()).__name__}: {future.exception()}"
+                logger.warning(f"[keyword_embedding] {source} 호출 실패 - {error}")
+
+            now = time.monotonic()
+            # 첫 호출이 늦거나 실패했으면 남은 시간 안에서 한 번 더 (헤지)
+            if can_hedge and (now >= hedge_at or not futures) and now < end:
+                can_hedge = False
+                futures[pool.submit(self._request, keywords, sentence, end - now)] = "hedge"
+                continue
+
+            if not futures:
+                break
+
+        return KeywordEmbedding(None, "unavailable", error=error or f"{timeout * 1000:.0f}ms 초과")
+
+    def _approximate(self, keywords: List[str]) -> Optional[np.ndarray]:
+        """키워드별 캐시 벡터가 모두 있으면 정규화 평균 (문장 임베딩의 근사)"""
+        vectors = [keyword_vector_cache.get((embedding_service.model_name, keyword)) for keyword in keywords]
+        if any(vector is None for vector in vectors):
+            return None
+        mean = np.mean(vectors, axis=0)
+        return mean / np.linalg.norm(mean)
+
+    def resolve(self, keywords: List[str]) -> KeywordEmbedding:
+        """
+        키워드 리스트 → 키워드 문장 임베딩 (예외를 던지지 않고 품질을 낮춰 반환).
+
+        Args:
+            keywords: 키워드 텍스트 리스트
+
+        Returns:
+            KeywordEmbedding
+        """
+        if not keywords:
+            raise ValueError("키워드 리스트가 비어있습니다.")
+
+        # 키워드를 공백으로 연결하여 문장 생성
+        sentence = " ".join(keywords)
+        cached = keyword_sentence_cache.get((embedding_service.model_name, sentence))
+        if cached is not None:
+            result = KeywordEmbedding(cached, "cache")
+        else:
+            timeout = self._timeout()
+            if timeout > 0:
+                result = self._call_with_deadline(keywords, sentence, timeout)
+            else:
+                result = KeywordEmbedding(None, "unavailable", error="요청 시간 예산 소진")
+
+            if result.vector is None:
+                approximate = self._approximate(keywords)
+                if approximate is not None:
+                    result = KeywordEmbedding(approximate, "keyword_cache", error=result.error)
+
+        KEYWORD_EMBEDDING_OUTCOMES.labels(source=result.source).inc()
+        if result.degraded:
+            logger.warning(f"[keyword_embedding] {result.source}로 대체 - {result.error}")
+        return result
+
+    def precompute(self, db: Session) -> int:
+        """
+        전체 키워드의 개별 벡터를 미리 계산해 캐시에 저장 (시간 초과 시 근사용).
+
+        Returns:
+            새로 계산한 키워드 수
+        """
+        missing = [
+            keyword for keyword in get_all_keywords(db)
+            if keyword_vector_cache.get((embedding_service.model_name, keyword)) is None
+        ]
+        batch_size = 100
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i : i + batch_size]
+            _, embeddings = embedding_service.embed_texts(batch, operation="keyword_batch")
+            for keyword, embedding in zip(batch, embeddings):
+                vector = _frozen(embedding)
+                keyword_vector_cache.set((embedding_service.model_name, keyword), vector)
+                keyword_sentence_cache.set((embedding_service.model_name, keyword), vector)
+        return len(missing)
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+keyword_embedding_service = KeywordEmbeddingService(max_workers=settings.KEYWORD_EMBEDDING_MAX_WORKERS)
@@ -0,0 +1,211 @@
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.repositories.band_catalog_repository import get_band_keyword_pairs
+from app.services.catalog_generation import catalog_generation
+
+logger = logging.getLogger(__name__)
+
+
+class _IndexData:
+    """한 번 만든 뒤 수정하지 않는 역색인 사본 (갱신 시 참조만 교체)"""
+
+    def __init__(self, pairs: List[Tuple[int, int]]) -> None:
+        # 밴드마다 비트 위치(slot)를 band_id 오름차순으로 부여
+        self.band_ids = np.asarray(sorted({band_id for _, band_id in pairs}), dtype=np.int64)
+        self.slot_by_band_id: Dict[int, int] = {
+            int(band_id): slot for slot, band_id in enumerate(self.band_ids.tolist())
+        }
+        self.all_bits = (1 << len(self.band_ids)) - 1
+
+        # keyword_id → 밴드 비트셋 (bit i = slot i 밴드가 키워드를 가짐)
+        # - packed: 밴드 수 길이로 맞춘 uint8 배열 (slot 단위 조회용, overlap_counts)
+        # - bitsets: 같은 비트를 담은 Python int (키워드 간 AND/OR용, match)
+        slots_by_keyword: Dict[int, List[int]] = {}
+        for keyword_id, band_id in pairs:
+            slots_by_keyword.setdefault(keyword_id, []).append(self.slot_by_band_id[band_id])
+        self.packed: Dict[int, np.ndarray] = {
+            keyword_id: _pack_slots(slots, len(self.band_ids)) for keyword_id, slots in slots_by_keyword.items()
+        }
+        self.bitsets: Dict[int, int] = {
+            keyword_id: int.from_bytes(packed.tobytes(), "little") for keyword_id, packed in self.packed.items()
+        }
+        self.pairs = len(pairs)
+
+
+def _pack_slots(slots: List[int], size: int) -> np.ndarray:
+    """slot 목록 → 길이 ceil(size / 8)의 비트 배열 (bit j of byte i = slot 8i + j)"""
+    flags = np.zeros(size, dtype=np.uint8)
+    flags[slots] = 1
+    return np.packbits(flags, bitorder="little")
+
+
+class KeywordBandIndex:
+    """
+    keyword_id → 밴드 비트셋 역색인 (band_keyword 기준, 삭제된 밴드/키워드/연결 제외).
+
+    키워드 조건으로 후보 밴드를 고르는 일을 비트 연산(AND/OR)으로 처리해,
+    하이브리드 검색이 벡터 채점 대상을 작은 후보 집합으로 좁힐 수 있게 합니다.
+
+    - 첫 조회 때 전체 로드
+    - 카탈로그 세대가 바뀌면(catalog_generation) 다음 조회 때 전체 재구성
+      (band_keyword 변경은 세대 워터마크에 포함, 쌍 목록만 읽으므로 재구성 비용이 작음)
+    - 재구성에 실패하면 기존 사본으로 응답하고 다음 조회 때 다시 시도
+    """
+
+    def __init__(self) -> None:
+        self._data: Optional[_IndexData] = None
+        self._stale = False
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.last_load_ms: Optional[float] = None
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """
+        band_keyword 전체로 역색인 재구성.
+
+        Args:
+            db: DB 세션 (None이면 자체 세션 사용)
+
+        Returns:
+            색인한 (키워드, 밴드) 쌍 수
+        """
+        start = time.perf_counter()
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            # 로드 도중의 변경은 다음 세대 변경에서 다시 반영되도록 stale 표시를 먼저 해제
+            self._stale = False
+            pairs = get_band_keyword_pairs(db)
+        finally:
+            if own_session:
+                db.close()
+
+        data = _IndexData(pairs)
+        with self._lock:
+            self._data = data
+            self.loads += 1
+            self.last_load_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        logger.info(
+            f"[keyword_index] 로드: 키워드 {len(data.bitsets)}개, 밴드 {len(data.band_ids)}개, "
+            f"연결 {data.pairs}개 ({self.last_load_ms}ms)"
+        )
+        return data.pairs
+
+    def _get(self, db: Session) -> _IndexData:
+        # 외부 변경은 catalog_generation 백그라운드 poll이 감지해 리스너로 mark_stale 호출
+        if self._data is None:
+            self.load(db)
+        elif self._stale:
+            try:
+                self.load(db)
+            except Exception as e:
+                self._stale = True
+                logger.warning(f"[keyword_index] 재구성 실패, 기존 사본 사용: {e}")
+        return self._data
+
+    @staticmethod
+    def _decode(data: _IndexData, bits: int) -> Set[int]:
+        """비트셋 → band_id 집합"""
+        if not bits:
+            return set()
+        raw = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        slots = np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+        return set(data.band_ids[slots].tolist())
+
+    def match(self, db: Session, keyword_ids: Iterable[int], min_overlap: int = 1) -> Set[int]:
+        """
+        선택 키워드 중 min_overlap개 이상을 가진 밴드 조회.
+
+        비트셋마다 "k개 이상 일치" 비트셋을 한 단계씩 갱신 (levels[k] |= levels[k-1] & bits),
+        min_overlap=1이면 OR, 선택 수와 같으면 AND와 같습니다.
+
+        Args:
+            db: 역색인 로드/갱신에 사용할 DB 세션
+            keyword_ids: 선택 키워드 ID 목록
+            min_overlap: 최소 일치 키워드 수 (1 ~ 선택 키워드 수)
+
+        Returns:
+            band_id 집합
+        """
+        data = self._get(db)
+        bitsets = [data.bitsets.get(keyword_id, 0) for keyword_id in set(keyword_ids)]
+        if not bitsets or min_overlap < 1 or min_overlap > len(bitsets):
+            return set()
+
+        levels = [data.all_bits] + [0] * min_overlap
+        for bits in bitsets:
+            for k in range(min_overlap, 0, -1):
+                levels[k] |= levels[k - 1] & bits
+        return self._decode(data, levels[min_overlap])
+
+    def overlap_counts(self, db: Session, keyword_ids: Iterable[int], band_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        밴드별로 선택 키워드 중 몇 개를 가졌는지 계산.
+
+        Args:
+            db: 역색인 로드/갱신에 사용할 DB 세션
+            keyword_ids: 선택 키워드 ID 목록
+            band_ids: 확인할 band_id 목록
+
+        Returns:
+            {band_id: 일치 키워드 수} (일치가 없는 밴드는 0)
+        """
+        data = self._get(db)
+        packed = [data.packed[keyword_id] for keyword_id in set(keyword_ids) if keyword_id in data.packed]
+
+        band_ids = list(band_ids)
+        counts = dict.fromkeys(band_ids, 0)
+        if not packed:
+            return counts
+
+        # 색인에 있는 밴드만 slot → (바이트 위치, 비트 위치)로 바꿔 키워드마다 한 번에 읽음
+        # (밴드 수 길이의 int를 밴드마다 shift하지 않음)
+        known_ids: List[int] = []
+        known_slots: List[int] = []
+        for band_id in band_ids:
+            slot = data.slot_by_band_id.get(band_id)
+            if slot is not None:
+                known_ids.append(band_id)
+                known_slots.append(slot)
+        if not known_ids:
+            return counts
+        slots = np.asarray(known_slots, dtype=np.int64)
+        byte_index = slots >> 3
+        bit_index = (slots & 7).astype(np.uint8)
+
+        totals = np.zeros(len(known_ids), dtype=np.int32)
+        for bits in packed:
+            totals += (bits[byte_index] >> bit_index) & 1
+
+        for band_id, total in zip(known_ids, totals.tolist()):
+            counts[band_id] = total
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        data = self._data
+        return {
+            "loaded": data is not None,
+            "stale": self._stale,
+            "keywords": len(data.bitsets) if data is not None else 0,
+            "bands": len(data.band_ids) if data is not None else 0,
+            "pairs": data.pairs if data is not None else 0,
+            "loads": self.loads,
+            "lastLoadMs": self.last_load_ms,
+        }
+
+
+keyword_band_index = KeywordBandIndex()
+
+# 카탈로그 세대가 바뀌면 다음 조회 때 다시 구성
+catalog_generation.add_listener(lambda generation: keyword_band_index.mark_stale())
@@ -0,0 +1,279 @@
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Any, Optional, Callable
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core import diagnostics, profiling
+from app.core.metrics import RECOMMEND_DEGRADED, STAGE_LATENCY
+from app.repositories.band_description_repository import get_recommendation_inputs, get_keywords_by_ids
+from app.services.embedding_snapshot import embedding_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecommendationContext:
+    """
+    추천 파이프라인 한 번의 실행 동안 단계 사이에 전달되는 상태.
+
+    각 단계는 앞 단계의 산출물을 읽고 자기 산출물을 채웁니다.
+    """
+    db: Session
+    version: str
+    band_ids: List[int]
+    keyword_ids: List[int]
+    top_k: int
+    exclude_input: bool = True
+    only_bands: bool = False
+
+    # 호출자가 미리 조회한 입력 (get_member_context 등). 있으면 fetch 단계의 DB 조회 생략
+    preloaded_embeddings: Optional[Dict[int, Any]] = None
+    preloaded_keywords: Optional[List[str]] = None
+
+    # [fetch] 선택 밴드 임베딩 (band_id 오름차순으로 정렬해 입력 순서와 무관하게 결정적)
+    selected_band_ids: List[int] = field(default_factory=list)
+    selected_embeddings: Optional[np.ndarray] = None
+
+    # [profile] 검색 기준 벡터 (V1/V2: 사용자 벡터 1개, V3/V4: 클러스터 centroid 3개)
+    profile_vectors: List[np.ndarray] = field(default_factory=list)
+    cluster_counts: List[int] = field(default_factory=list)
+
+    # [fetch] 선택 키워드 텍스트 (keyword_id 순)
+    keywords: List[str] = field(default_factory=list)
+
+    # [keyword_blend] 키워드 반영 후 실제 검색에 사용할 벡터
+    keyword_embedding: Optional[np.ndarray] = None
+    keyword_applied: bool = False
+    search_vectors: List[np.ndarray] = field(default_factory=list)
+
+    # [retrieve] 검색 벡터별 후보 [(band_id, score), ...]
+    candidates: List[List[Tuple[int, float]]] = field(default_factory=list)
+
+    # [diversify] 최종 선택 [(band_id, score, 검색 벡터 idx), ...]
+    ranked: List[Tuple[int, float, int]] = field(default_factory=list)
+
+    # [hydrate] 응답용 결과
+    results: List[Dict[str, Any]] = field(default_factory=list)
+
+    timings: Dict[str, float] = field(default_factory=dict)
+    fallback_from: Optional[str] = None
+    # 시간 예산 초과/실패로 품질을 낮춘 경우 사유 (keyword_cache | band_only)
+    degraded: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.version.upper()
+
+
+Stage = Callable[[RecommendationContext], None]
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    """
+    추천 버전 하나를 구성하는 단계 조합.
+
+    Attributes:
+        version: 버전 이름 (v1~v4)
+        profile_builder: 선택 밴드 임베딩 → 검색 기준 벡터
+        keyword_blender: 키워드 임베딩을 기준 벡터에 반영
+        retriever: 기준 벡터별 유사 밴드 후보 검색
+        diversifier: 후보에서 최종 추천 선택
+        hydrator: 밴드 이름/이미지/키워드 등 상세 정보 결합
+        only_bands: True면 is_band=true 밴드만 추천
+        top_k: 고정 반환 개수 (None이면 요청 값 사용)
+        min_bands: 필요한 최소 선택 밴드 수 (미달 시 fallback 구성으로 전환)
+        fallback: min_bands 미달 시 사용할 구성
+    """
+    version: str
+    profile_builder: Stage
+    keyword_blender: Stage
+    retriever: Stage
+    diversifier: Stage
+    hydrator: Stage
+    only_bands: bool = False
+    top_k: Optional[int] = None
+    min_bands: int = 1
+    fallback: Optional["PipelineConfig"] = None
+
+
+@dataclass
+class RecommendationResult:
+    """파이프라인 실행 결과 (추천 목록 + 디버그용 단계별 소요 시간)"""
+    version: str
+    bands: List[Dict[str, Any]]
+    timings: Dict[str, float]
+    fallback_from: Optional[str] = None
+    cache_hit: bool = False
+    # trace 요청일 때만 채워지는 구조화된 진단 이벤트
+    diagnostics: Optional[List[Dict[str, Any]]] = None
+    # 품질을 낮춰 응답한 사유 (None이면 정상) - 캐시하지 않음
+    degraded: Optional[str] = None
+
+    def debug_info(self) -> Dict[str, Any]:
+        info = {
+            "version": self.version,
+            "fallbackFrom": self.fallback_from,
+            "cacheHit": self.cache_hit,
+            "degraded": self.degraded,
+            "timingsMs": self.timings,
+        }
+        if self.diagnostics is not None:
+            info["diagnostics"] = self.diagnostics
+        return info
+
+
+@contextmanager
+def stage_timer(ctx: RecommendationContext, stage: str):
+    """단계 실행 시간을 ms 단위로 ctx.timings에 기록 (단계별 지연 히스토그램에도 기록)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        ctx.timings[stage] = round(ctx.timings.get(stage, 0.0) + elapsed * 1000, 3)
+        STAGE_LATENCY.labels(version=ctx.version, stage=stage).observe(elapsed)
+        profiling.record_stage(stage, elapsed)
+
+
+def fetch_selected_embeddings(ctx: RecommendationContext) -> None:
+    """
+    선택 밴드 임베딩 + 선택 키워드 텍스트 조회 (모든 버전 공통, 요청당 1회 쿼리).
+
+    미리 조회한 입력이 있으면 DB를 다시 조회하지 않고, 최신 임베딩 스냅샷이 있으면
+    임베딩은 스냅샷(mmap)에서 읽습니다. 버전 폴백이 일어나도 이미 조회한 임베딩을 그대로 재사용합니다.
+    """
+    snapshot = None
+    if ctx.preloaded_embeddings is not None and ctx.preloaded_keywords is not None:
+        by_band_id = dict(ctx.preloaded_embeddings)
+        ctx.keywords = list(ctx.preloaded_keywords)
+    elif (snapshot := embedding_snapshot.get()) is not None:
+        by_band_id = snapshot.get_embeddings(ctx.band_ids)
+        ctx.keywords = get_keywords_by_ids(ctx.db, ctx.keyword_ids)
+    else:
+        inputs = get_recommendation_inputs(ctx.db, ctx.band_ids, ctx.keyword_ids)
+        by_band_id = inputs["band_embeddings"]
+        ctx.keywords = inputs["keywords"]
+
+    # 선택하지 않은 밴드가 섞여 들어오지 않도록 요청한 밴드로 한정
+    requested = set(ctx.band_ids)
+    by_band_id = {bid: emb for bid, emb in by_band_id.items() if bid in requested}
+
+    if not by_band_id:
+        raise ValueError("선택한 밴드 중 임베딩이 있는 밴드가 없습니다.")
+
+    # 선택 순서 유지 (KMeans/보간 입력 순서가 바뀌면 같은 회원이라도 결과가 달라질 수 있음, 정렬은 캐시/지문 키에서만)
+    ctx.selected_band_ids = [bid for bid in dict.fromkeys(ctx.band_ids) if bid in by_band_id]
+    ctx.selected_embeddings = np.array([by_band_id[bid] for bid in ctx.selected_band_ids])
+
+    diagnostics.emit(
+        logger,
+        "fetch",
+        version=ctx.version,
+        source=f"snapshot:v{snapshot.version}" if snapshot is not None else "db",
+        band_ids=ctx.selected_band_ids,
+        keywords=ctx.keywords,
+    )
+
+
+def _switch_to_fallback(ctx: RecommendationContext, config: PipelineConfig, reason: str) -> PipelineConfig:
+    fallback = config.fallback
+    logger.info("[%s] %s → %s로 폴백", ctx.label, reason, fallback.version.upper())
+    ctx.fallback_from = ctx.fallback_from or config.version
+    ctx.version = fallback.version
+    ctx.only_bands = fallback.only_bands
+    if fallback.top_k is not None:
+        ctx.top_k = fallback.top_k
+    return fallback
+
+
+def run_pipeline(
+    config: PipelineConfig,
+    db: Session,
+    band_ids: List[int],
+    keyword_ids: List[int],
+    top_k: Optional[int] = None,
+    exclude_input: bool = True,
+    band_embeddings: Optional[Dict[int, Any]] = None,
+    keywords: Optional[List[str]] = None,
+    trace: bool = False,
+) -> RecommendationResult:
+    """
+    구성(config)에 따라 fetch → profile → keyword_blend → retrieve → diversify → hydrate 실행.
+
+    Args:
+        config: 버전별 단계 구성
+        db: DB 세션
+        band_ids: 사용자가 선택한 밴드 ID 리스트
+        keyword_ids: 사용자가 선택한 키워드 ID 리스트
+        top_k: 반환할 추천 밴드 수 (config.top_k가 있으면 무시)
+        exclude_input: 입력한 밴드를 추천 결과에서 제외할지 여부
+        band_embeddings: 미리 조회한 {band_id: embedding} (keywords와 함께 주면 fetch 조회 생략)
+        keywords: 미리 조회한 키워드 텍스트 리스트
+        trace: True면 단계별 진단 이벤트를 수집해 결과에 포함
+
+    Returns:
+        RecommendationResult (추천 목록 + 단계별 소요 시간)
+    """
+    ctx = RecommendationContext(
+        db=db,
+        version=config.version,
+        band_ids=list(band_ids),
+        keyword_ids=list(keyword_ids),
+        top_k=config.top_k or top_k or 3,
+        exclude_input=exclude_input,
+        only_bands=config.only_bands,
+        preloaded_embeddings=band_embeddings,
+        preloaded_keywords=keywords,
+    )
+
+    total_start = time.perf_counter()
+    # 프로파일링 중인 요청이면 이 스레드(요청 처리 스레드)의 호출 스택을 샘플링
+    profiling.bind_current_thread()
+
+    with diagnostics.trace(trace) as events:
+        # 선택 밴드 수가 부족하면 조회 전에 폴백 구성으로 전환
+        if config.fallback and len(set(band_ids)) < config.min_bands:
+            config = _switch_to_fallback(ctx, config, f"밴드 {len(set(band_ids))}개 < {config.min_bands}개")
+
+        with stage_timer(ctx, "fetch"):
+            fetch_selected_embeddings(ctx)
+
+        if config.fallback and len(ctx.selected_band_ids) < config.min_bands:
+            config = _switch_to_fallback(
+                ctx, config, f"임베딩 있는 밴드 {len(ctx.selected_band_ids)}개 < {config.min_bands}개"
+            )
+
+        with stage_timer(ctx, "profile"):
+            config.profile_builder(ctx)
+        with stage_timer(ctx, "keyword_blend"):
+            config.keyword_blender(ctx)
+        with stage_timer(ctx, "retrieve"):
+            config.retriever(ctx)
+        with stage_timer(ctx, "diversify"):
+            config.diversifier(ctx)
+        with stage_timer(ctx, "hydrate"):
+            config.hydrator(ctx)
+
+    ctx.timings["total"] = round((time.perf_counter() - total_start) * 1000, 3)
+    if ctx.degraded is not None:
+        RECOMMEND_DEGRADED.labels(version=ctx.version, reason=ctx.degraded).inc()
+
+    # 요청당 요약 한 줄 (상세 분석은 DEBUG 레벨 또는 trace 요청에서만)
+    logger.info(
+        "[%s] 추천 완료 - 밴드 %d개, 키워드 %d개 → %d개 반환, 소요 시간(ms) %s",
+        ctx.label, len(band_ids), len(keyword_ids), len(ctx.results), ctx.timings,
+    )
+
+    return RecommendationResult(
+        version=ctx.version,
+        bands=ctx.results,
+        timings=ctx.timings,
+        fallback_from=ctx.fallback_from,
+        diagnostics=events,
+        degraded=ctx.degraded,
+    )
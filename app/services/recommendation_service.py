@@ -1,56 +1,39 @@
-from typing import List, Tuple, Dict, Any
+from dataclasses import replace
+from typing import List, Dict, Any, Optional, Set, Tuple
 import logging
+import time
+import json
+import hashlib
 
 import numpy as np
-from sklearn.cluster import KMeans
 from sqlalchemy.orm import Session
 
+from app.core import diagnostics, profiling
+from app.core.cache import TTLLRUCache
+from app.core.config import settings
+from app.core.executor import cpu_executor
+from app.core.metrics import RECOMMEND_HYBRID_OUTCOMES, observe_stage
 from app.repositories.band_description_repository import (
-    get_band_descriptions_by_ids,
-    find_similar_bands_by_embedding,
-    get_bands_with_keywords_by_ids,
-    get_keywords_by_ids,
+    find_similar_bands_by_embeddings,
+    find_similar_bands_in_candidates,
+)
+from app.services.keyword_embedding_service import keyword_embedding_service
+from app.services.catalog_generation import catalog_generation
+from app.services.band_catalog import band_catalog
+from app.services.embedding_snapshot import embedding_snapshot
+from app.services.keyword_index import keyword_band_index
+from app.services.band_neighbor_service import (
+    lookup_single_band_neighbors,
+    search_with_neighbor_seed,
+)
+from app.services.recommendation_pipeline import (
+    RecommendationContext,
+    RecommendationResult,
+    PipelineConfig,
+    run_pipeline,
 )
-from app.services.embedding_service import embedding_service
 
-# 로거 설정
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
-
-
-def embed_keywords(keywords: List[str]) -> np.ndarray:
-    """
-    키워드 리스트를 문장으로 합쳐서 임베딩 벡터 생성.
-    
-    Args:
-        keywords: 키워드 텍스트 리스트
-    
-    Returns:
-        키워드 임베딩 벡터 (1536차원)
-    """
-    if not keywords:
-        raise ValueError("키워드 리스트가 비어있습니다.")
-    
-    # 키워드를 공백으로 연결하여 문장 생성
-    keyword_sentence = " ".join(keywords)
-    
-    logger.info("-" * 50)
-    logger.info("[키워드 임베딩 생성]")
-    logger.info(f"  입력 키워드 개수: {len(keywords)}")
-    logger.info(f"  키워드 목록: {keywords}")
-    logger.info(f"  결합 문장: \"{keyword_sentence}\"")
-    
-    model_name, embedding = embedding_service.embed_single_text(keyword_sentence)
-    
-    embedding_array = np.array(embedding)
-    
-    logger.info(f"  임베딩 모델: {model_name}")
-    logger.info(f"  벡터 차원: {len(embedding)}")
-    logger.info(f"  벡터 norm: {np.linalg.norm(embedding_array):.4f}")
-    logger.info(f"  벡터 샘플 (첫 5개): {embedding_array[:5]}")
-    logger.info("-" * 50)
-    
-    return embedding_array
 
 
 def slerp(v0: np.ndarray, v1: np.ndarray, t: float) -> np.ndarray:
@@ -66,54 +49,24 @@ def slerp(v0: np.ndarray, v1: np.ndarray, t: float) -> np.ndarray:
         t: 보간 비율 (0~1)
     
     Returns:
-        보간된 벡터
+        보간된 벡터 (단위 벡터)
     """
-    logger.info("-" * 50)
-    logger.info("[Slerp 구면 선형 보간]")
-    
-    # 원본 벡터 정보
-    v0_original_norm = np.linalg.norm(v0)
-    v1_original_norm = np.linalg.norm(v1)
-    logger.info(f"  사용자 벡터 원본 norm: {v0_original_norm:.4f}")
-    logger.info(f"  키워드 벡터 원본 norm: {v1_original_norm:.4f}")
-    
     # 정규화
-    v0_norm = v0 / v0_original_norm
-    v1_norm = v1 / v1_original_norm
+    v0_norm = v0 / np.linalg.norm(v0)
+    v1_norm = v1 / np.linalg.norm(v1)
     
     # 두 벡터 사이의 각도 계산
     dot = np.clip(np.dot(v0_norm, v1_norm), -1.0, 1.0)
     theta = np.arccos(dot)
-    theta_degrees = np.degrees(theta)
-    
-    logger.info(f"  두 벡터 간 코사인 유사도: {dot:.4f}")
-    logger.info(f"  두 벡터 간 각도 (θ): {theta_degrees:.2f}°")
-    logger.info(f"  보간 비율 (t): {t:.3f} ({t*100:.1f}%)")
     
-    # 각도가 매우 작으면 (거의 같은 방향) 선형 보간
+    # 각도가 매우 작으면 (거의 같은 방향) 사용자 벡터 유지
     if theta < 1e-6:
-        logger.info("  ⚠️ 두 벡터가 거의 동일한 방향 → 사용자 벡터 유지")
-        logger.info("-" * 50)
         return v0_norm
     
     # Slerp 공식
     sin_theta = np.sin(theta)
-    result = (np.sin((1 - t) * theta) / sin_theta) * v0_norm + \
-             (np.sin(t * theta) / sin_theta) * v1_norm
-    
-    # 결과 분석
-    rotation_angle = theta_degrees * t
-    logger.info(f"  실제 회전 각도: {rotation_angle:.2f}° (θ × t)")
-    
-    # 회전 후 벡터와 원본들 간의 유사도
-    result_v0_sim = np.dot(result, v0_norm)
-    result_v1_sim = np.dot(result, v1_norm)
-    logger.info(f"  [회전 후 벡터] ↔ [원본 사용자 벡터] 유사도: {result_v0_sim:.4f}")
-    logger.info(f"  [회전 후 벡터] ↔ [키워드 벡터] 유사도: {result_v1_sim:.4f}")
-    logger.info(f"  회전 후 벡터 norm: {np.linalg.norm(result):.4f}")
-    logger.info("-" * 50)
-    
-    return result
+    return (np.sin((1 - t) * theta) / sin_theta) * v0_norm + \
+           (np.sin(t * theta) / sin_theta) * v1_norm
 
 
 def adaptive_t(
@@ -135,47 +88,60 @@ def adaptive_t(
     Returns:
         조정된 t 값 (0.05 ~ 0.4 범위)
     """
-    logger.info("-" * 50)
-    logger.info("[Adaptive t 계산 - 유사도 기반 키워드 영향력 조절]")
-    
-    # 코사인 유사도 계산
-    user_norm = np.linalg.norm(user_emb)
-    keyword_norm = np.linalg.norm(keyword_emb)
-    dot_product = np.dot(user_emb, keyword_emb)
-    similarity = dot_product / (user_norm * keyword_norm)
-    
-    logger.info(f"  사용자 벡터 norm: {user_norm:.4f}")
-    logger.info(f"  키워드 벡터 norm: {keyword_norm:.4f}")
-    logger.info(f"  내적 (dot product): {dot_product:.4f}")
-    logger.info(f"  코사인 유사도: {similarity:.4f}")
+    # 코사인 유사도
+    similarity = np.dot(user_emb, keyword_emb) / (np.linalg.norm(user_emb) * np.linalg.norm(keyword_emb))
     
     # 유사도에 따라 t 조정
     # 공식: t = base_t × (1.2 - similarity × 0.5)
     raw_t = base_t * (1.2 - similarity * 0.5)
     
-    logger.info(f"  기본 t (base_t): {base_t:.3f}")
-    logger.info(f"  조정 공식: t = {base_t} × (1.2 - {similarity:.4f} × 0.5)")
-    logger.info(f"  계산된 t (raw): {raw_t:.4f}")
-    
     # 범위 제한
-    final_t = float(np.clip(raw_t, 0.05, 0.4))
-    
-    if raw_t != final_t:
-        logger.info(f"  ⚠️ 범위 클리핑: {raw_t:.4f} → {final_t:.3f} (범위: 0.05~0.40)")
-    
-    # 해석
-    if similarity >= 0.8:
-        interpretation = "높음 (이미 비슷함) → 키워드 영향 최소화"
-    elif similarity >= 0.5:
-        interpretation = "중간 → 키워드 적당히 반영"
-    else:
-        interpretation = "낮음 (방향 다름) → 키워드 영향 극대화"
-    
-    logger.info(f"  유사도 해석: {interpretation}")
-    logger.info(f"  ✅ 최종 t: {final_t:.3f} ({final_t*100:.1f}% 키워드 방향으로 회전)")
-    logger.info("-" * 50)
-    
-    return final_t
+    return float(np.clip(raw_t, 0.05, 0.4))
+
+
+def adaptive_t_batch(
+    user_embs: np.ndarray,
+    keyword_emb: np.ndarray,
+    base_t: float = 0.25,
+) -> np.ndarray:
+    """
+    adaptive_t의 배치 버전 - 여러 기준 벡터의 t를 한 번의 행렬 연산으로 계산.
+
+    Args:
+        user_embs: 기준 벡터 행렬 (n, dim)
+        keyword_emb: 키워드 임베딩 벡터 (dim,)
+        base_t: 기본 보간 비율
+
+    Returns:
+        기준 벡터별 t 값 (n,), 0.05 ~ 0.4 범위
+    """
+    similarity = (user_embs @ keyword_emb) / (np.linalg.norm(user_embs, axis=1) * np.linalg.norm(keyword_emb))
+    return np.clip(base_t * (1.2 - similarity * 0.5), 0.05, 0.4)
+
+
+def slerp_batch(v0s: np.ndarray, v1: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    """
+    slerp의 배치 버전 - 여러 시작 벡터를 같은 끝 벡터 방향으로 각자의 t만큼 보간.
+
+    Args:
+        v0s: 시작 벡터 행렬 (n, dim)
+        v1: 끝 벡터 (키워드 벡터, dim)
+        ts: 시작 벡터별 보간 비율 (n,)
+
+    Returns:
+        보간된 단위 벡터 행렬 (n, dim)
+    """
+    v0_norm = v0s / np.linalg.norm(v0s, axis=1, keepdims=True)
+    v1_norm = v1 / np.linalg.norm(v1)
+
+    theta = np.arccos(np.clip(v0_norm @ v1_norm, -1.0, 1.0))
+
+    # 각도가 매우 작으면 (거의 같은 방향) 사용자 벡터 유지
+    same_direction = theta < 1e-6
+    sin_theta = np.where(same_direction, 1.0, np.sin(theta))
+    w0 = np.where(same_direction, 1.0, np.sin((1 - ts) * theta) / sin_theta)
+    w1 = np.where(same_direction, 0.0, np.sin(ts * theta) / sin_theta)
+    return w0[:, None] * v0_norm + w1[:, None] * v1_norm
 
 
 def build_user_embedding(embeddings: List[np.ndarray]) -> np.ndarray:
@@ -186,47 +152,648 @@ def build_user_embedding(embeddings: List[np.ndarray]) -> np.ndarray:
     - 3개 이상: k=3 K-means 클러스터링 후 멤버 수 기반 가중 평균
     """
     n = len(embeddings)
-    logger.info(f"[build_user_embedding] 입력 임베딩 개수: {n}")
     
     if n == 1:
-        logger.info("[build_user_embedding] 1개 → 그대로 사용")
         return embeddings[0]
     
     if n == 2:
-        logger.info("[build_user_embedding] 2개 → 단순 평균")
         return np.mean(embeddings, axis=0)
     
     # 3개 이상: K-means (k=3)
-    logger.info("[build_user_embedding] 3개 이상 → K-means(k=3) 클러스터링 시작")
-    
-    X = np.array(embeddings)
-    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-    labels = kmeans.fit_predict(X)
-    
-    # 각 클러스터의 centroid와 멤버 수 계산
-    centroids = kmeans.cluster_centers_  # shape: (3, dim)
-    cluster_counts = np.bincount(labels, minlength=3)  # 각 클러스터의 멤버 수
-    
-    # 클러스터링 결과 로그
-    logger.info("=" * 50)
-    logger.info("[클러스터링 결과]")
-    for i in range(3):
-        logger.info(f" 클러스터 {i}: {cluster_counts[i]}개 벡터")
-        logger.info(f" centroid: {centroids[i][:10]}")
-    logger.info("=" * 70)
+    centroids, cluster_counts = fit_cluster_centroids(np.array(embeddings))
     
     # 가중 평균 (멤버 수 기반)
-    total = cluster_counts.sum()
-    weights = cluster_counts / total  # shape: (3,)
-    
-    logger.info(f"[가중치] 클러스터별 가중치: {weights}")
-    
-    user_embedding = np.average(centroids, axis=0, weights=weights)
-    
-    logger.info(f"[사용자 벡터] 최종 사용자 임베딩 : {user_embedding[:10]}")
-    logger.info(f"[사용자 벡터] 벡터 norm: {np.linalg.norm(user_embedding):.4f}")
-    
-    return user_embedding
+    weights = cluster_counts / cluster_counts.sum()
+    return np.average(centroids, axis=0, weights=weights)
+
+
+def fit_cluster_centroids(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    K-means(k=3)로 클러스터 centroid와 클러스터별 멤버 수 계산.
+
+    작업자 풀(프로세스 포함)에서 실행되므로 모듈 최상위 함수로 둡니다.
+    scikit-learn은 임포트 비용이 커서 첫 호출 때 임포트합니다 (서버 시작 시 warmup에서 미리 호출).
+
+    Returns:
+        (centroids (3, dim), cluster_counts (3,))
+    """
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
+    labels = kmeans.fit_predict(embeddings)
+    return kmeans.cluster_centers_, np.bincount(labels, minlength=3)
+
+
+def blend_keyword_vectors(
+    vectors: List[np.ndarray],
+    cluster_counts: List[int],
+    keyword_embedding: np.ndarray,
+) -> Tuple[List[np.ndarray], List[Optional[float]]]:
+    """
+    각 기준 벡터에 키워드 임베딩을 adaptive t + Slerp로 반영.
+
+    빈 클러스터는 검색하지 않으므로 회전도 생략합니다.
+    기준 벡터들을 한 번의 행렬 연산으로 처리합니다 (adaptive_t_batch + slerp_batch).
+
+    Returns:
+        (검색 벡터 리스트, 기준 벡터별 t 값 (생략 시 None))
+    """
+    search_vectors = list(vectors)
+    ts: List[Optional[float]] = [None] * len(vectors)
+
+    active = [i for i, count in enumerate(cluster_counts) if count > 0]
+    if not active:
+        return search_vectors, ts
+
+    matrix = np.asarray([vectors[i] for i in active])
+    active_ts = adaptive_t_batch(matrix, keyword_embedding)
+    blended = slerp_batch(matrix, keyword_embedding, active_ts)
+    for row, i in enumerate(active):
+        search_vectors[i] = blended[row]
+        ts[i] = float(active_ts[row])
+    return search_vectors, ts
+
+
+# ============================================================
+# 파이프라인 단계 구현
+# ============================================================
+
+# CPU 연산(K-means, Slerp)은 cpu_executor에서 실행해 BLAS 스레드 수와 동시 작업 수를 제한
+
+# [profile builder]
+
+def build_single_profile(ctx: RecommendationContext) -> None:
+    """선택 밴드 전체로 사용자 벡터 1개 생성 (V1/V2)"""
+    embeddings = list(ctx.selected_embeddings)
+    ctx.profile_vectors = [cpu_executor.run(build_user_embedding, embeddings)]
+    ctx.cluster_counts = [len(embeddings)]
+
+    if diagnostics.enabled(logger):
+        diagnostics.emit(
+            logger,
+            "profile.single",
+            version=ctx.version,
+            bands=len(embeddings),
+            method="single" if len(embeddings) == 1 else "mean" if len(embeddings) == 2 else "kmeans_weighted",
+            band_norms=[float(n) for n in np.linalg.norm(ctx.selected_embeddings, axis=1)],
+            profile_norm=float(np.linalg.norm(ctx.profile_vectors[0])),
+        )
+
+
+def build_cluster_profiles(ctx: RecommendationContext) -> None:
+    """K-means(k=3)로 클러스터 centroid 3개 생성 (V3/V4)"""
+    centroids, cluster_counts = cpu_executor.run(fit_cluster_centroids, ctx.selected_embeddings)
+
+    ctx.profile_vectors = [centroids[i] for i in range(3)]
+    ctx.cluster_counts = [int(c) for c in cluster_counts]
+
+    if diagnostics.enabled(logger):
+        diagnostics.emit(
+            logger,
+            "profile.clusters",
+            version=ctx.version,
+            bands=len(ctx.selected_band_ids),
+            cluster_counts=ctx.cluster_counts,
+            centroid_norms=[float(n) for n in np.linalg.norm(centroids, axis=1)],
+        )
+
+
+# [keyword blender]
+
+def no_keyword_blend(ctx: RecommendationContext) -> None:
+    """키워드 미사용 (V1): 기준 벡터를 그대로 검색에 사용"""
+    ctx.search_vectors = list(ctx.profile_vectors)
+
+
+def slerp_keyword_blend(ctx: RecommendationContext) -> None:
+    """키워드 임베딩을 각 기준 벡터에 Slerp로 반영 (V2~V4)"""
+    ctx.search_vectors = list(ctx.profile_vectors)
+
+    if not ctx.keyword_ids:
+        logger.info("[%s keyword_blend] 키워드 없음 → 밴드 기반 벡터만 사용", ctx.label)
+        return
+
+    # 키워드 텍스트는 fetch 단계에서 밴드 임베딩과 함께 조회됨
+    if not ctx.keywords:
+        logger.info("[%s keyword_blend] 유효한 키워드 없음 → 밴드 기반 벡터만 사용", ctx.label)
+        return
+
+    # 요청 시간 예산 안에서 조회 (캐시 → OpenAI(+헤지) → 키워드별 벡터 평균 → 없음)
+    with observe_stage("keyword_embedding", ctx.version):
+        keyword = keyword_embedding_service.resolve(ctx.keywords)
+
+    if diagnostics.enabled(logger):
+        diagnostics.emit(
+            logger,
+            "keyword_embedding",
+            keywords=list(ctx.keywords),
+            sentence=" ".join(ctx.keywords),
+            source=keyword.source,
+            error=keyword.error,
+            norm=float(np.linalg.norm(keyword.vector)) if keyword.vector is not None else None,
+        )
+
+    if keyword.vector is None:
+        ctx.degraded = "band_only"
+        logger.warning("[%s keyword_blend] 키워드 임베딩 없음 (%s) → 밴드 기반 벡터만 사용", ctx.label, keyword.error)
+        return
+    if keyword.degraded:
+        ctx.degraded = keyword.source
+    ctx.keyword_embedding = keyword.vector
+
+    ctx.search_vectors, ts = cpu_executor.run(
+        blend_keyword_vectors, ctx.profile_vectors, ctx.cluster_counts, ctx.keyword_embedding
+    )
+    ctx.keyword_applied = True
+
+    if diagnostics.enabled(logger):
+        _emit_blend_diagnostics(ctx, ts)
+
+
+def _emit_blend_diagnostics(ctx: RecommendationContext, ts: List[Optional[float]]) -> None:
+    """키워드 반영 전후 벡터 비교 (진단이 켜진 경우에만 호출)"""
+    keyword_unit = ctx.keyword_embedding / np.linalg.norm(ctx.keyword_embedding)
+    for i, t in enumerate(ts):
+        if t is None:
+            continue
+        before = ctx.profile_vectors[i] / np.linalg.norm(ctx.profile_vectors[i])
+        after = ctx.search_vectors[i]
+        similarity = float(np.dot(before, keyword_unit))
+        theta_degrees = float(np.degrees(np.arccos(np.clip(similarity, -1.0, 1.0))))
+        diagnostics.emit(
+            logger,
+            "keyword_blend.slerp",
+            version=ctx.version,
+            vector=i,
+            t=t,
+            profile_keyword_similarity=similarity,
+            theta_degrees=theta_degrees,
+            rotation_degrees=theta_degrees * t,
+            result_profile_similarity=float(np.dot(after, before)),
+            result_keyword_similarity=float(np.dot(after, keyword_unit)),
+            change_magnitude=float(np.linalg.norm(after - before)),
+        )
+
+
+# [retriever]
+
+def _hybrid_mode(ctx: RecommendationContext) -> Optional[str]:
+    """키워드 하이브리드 검색 방식 (restrict | boost), 꺼져 있거나 선택 키워드가 없으면 None"""
+    mode = settings.RECOMMEND_HYBRID_MODE
+    if mode not in ("restrict", "boost") or not ctx.keyword_ids:
+        return None
+    return mode
+
+
+def keyword_restricted_search(
+    ctx: RecommendationContext,
+    vectors: List[np.ndarray],
+    top_k: int,
+    exclude_ids: Set[int],
+) -> Optional[List[List[Tuple[int, float]]]]:
+    """
+    선택 키워드를 가진 밴드(비트셋 교집합/합집합)만 후보로 두고 벡터별로 채점.
+
+    최신 임베딩 스냅샷이 있으면 메모리(mmap)에서, 없으면 후보 band_id 조건으로 DB에서 채점합니다.
+
+    Returns:
+        벡터 순서대로 [(band_id, score), ...] 리스트,
+        후보/결과가 부족하거나 역색인을 쓸 수 없으면 None (일반 검색으로 폴백)
+    """
+    min_overlap = min(max(1, settings.RECOMMEND_HYBRID_MIN_OVERLAP), len(set(ctx.keyword_ids)))
+    try:
+        candidates = keyword_band_index.match(ctx.db, ctx.keyword_ids, min_overlap) - exclude_ids
+    except Exception as e:
+        logger.warning("[%s retrieve] 키워드 역색인 조회 실패 → 일반 검색: %s", ctx.label, e)
+        return None
+
+    # 최종 추천 수만큼은 후보가 있어야 키워드 조건을 지킬 수 있음
+    needed = min(top_k, ctx.top_k)
+    snapshot = embedding_snapshot.get()
+    if len(candidates) < needed or (
+        snapshot is None and len(candidates) > settings.RECOMMEND_HYBRID_MAX_DB_CANDIDATES
+    ):
+        diagnostics.emit(logger, "retrieve.keyword_fallback", version=ctx.version, candidates=len(candidates))
+        return None
+
+    results = []
+    for vector in vectors:
+        if snapshot is not None:
+            scored = snapshot.score_candidates(
+                user_embedding=vector,
+                candidate_band_ids=candidates,
+                top_k=top_k,
+                exclude_band_ids=exclude_ids,
+                only_bands=ctx.only_bands,
+            )
+        else:
+            scored = find_similar_bands_in_candidates(
+                db=ctx.db,
+                user_embedding=vector.tolist(),
+                candidate_band_ids=candidates,
+                top_k=top_k,
+                exclude_band_ids=exclude_ids,
+                only_bands=ctx.only_bands,
+            )
+        # is_band 필터/임베딩 없는 밴드로 후보가 줄어든 경우
+        if len(scored) < needed:
+            diagnostics.emit(logger, "retrieve.keyword_fallback", version=ctx.version, candidates=len(candidates))
+            return None
+        results.append(scored)
+
+    diagnostics.emit(
+        logger,
+        "retrieve.keyword_restricted",
+        version=ctx.version,
+        min_overlap=min_overlap,
+        candidates=len(candidates),
+        source="snapshot" if snapshot is not None else "db",
+    )
+    return results
+
+
+def keyword_boost(
+    ctx: RecommendationContext,
+    results: List[Tuple[int, float]],
+    top_k: int,
+) -> List[Tuple[int, float]]:
+    """
+    선택 키워드와 겹치는 만큼 점수를 올려 재정렬 후 상위 top_k 반환.
+
+    점수 += RECOMMEND_HYBRID_BOOST × (겹친 키워드 수 / 선택 키워드 수)
+    """
+    keyword_ids = set(ctx.keyword_ids)
+    try:
+        overlaps = keyword_band_index.overlap_counts(ctx.db, keyword_ids, [band_id for band_id, _ in results])
+    except Exception as e:
+        logger.warning("[%s retrieve] 키워드 역색인 조회 실패 → 가산 없이 사용: %s", ctx.label, e)
+        return results[:top_k]
+
+    weight = settings.RECOMMEND_HYBRID_BOOST / len(keyword_ids)
+    boosted = [(band_id, score + weight * overlaps.get(band_id, 0)) for band_id, score in results]
+    boosted.sort(key=lambda x: x[1], reverse=True)
+
+    diagnostics.emit(
+        logger,
+        "retrieve.keyword_boost",
+        version=ctx.version,
+        overlaps={band_id: count for band_id, count in overlaps.items() if count},
+    )
+    return boosted[:top_k]
+
+
+def single_vector_retriever(ctx: RecommendationContext) -> None:
+    """
+    사용자 벡터 1개로 top_k 검색 (V1/V2).
+
+    키워드 미적용 단일 밴드는 band_neighbors로 바로 응답하고,
+    키워드 미적용 1~2개 밴드는 이웃 후보 풀에서 채점, 그 외에는 pgvector 검색.
+    (키워드로 보간한 벡터나 boost용 넉넉한 검색은 선택 밴드 이웃 밖의 밴드도 필요하므로 이웃 후보 풀을 쓰지 않음)
+    키워드 하이브리드 검색이 켜져 있으면 키워드 후보 안에서 검색(restrict)하거나 넉넉히 검색해 가산 후 재정렬(boost).
+    """
+    exclude_ids = set(ctx.selected_band_ids) if ctx.exclude_input else None
+    mode = _hybrid_mode(ctx)
+    fetch_k = ctx.top_k * settings.RECOMMEND_HYBRID_BOOST_OVERFETCH if mode == "boost" else ctx.top_k
+
+    similarity_results = None
+    if mode == "restrict":
+        restricted = keyword_restricted_search(ctx, ctx.search_vectors[:1], ctx.top_k, exclude_ids or set())
+        RECOMMEND_HYBRID_OUTCOMES.labels(
+            version=ctx.version, outcome="restricted" if restricted is not None else "fallback"
+        ).inc()
+        if restricted is not None:
+            similarity_results = restricted[0]
+
+    if similarity_results is None and ctx.exclude_input and not ctx.keyword_applied and len(ctx.selected_band_ids) == 1:
+        similarity_results = lookup_single_band_neighbors(
+            ctx.db, ctx.selected_band_ids[0], fetch_k, only_bands=ctx.only_bands
+        )
+        if similarity_results is not None:
+            diagnostics.emit(logger, "retrieve.neighbors_table", version=ctx.version, band_id=ctx.selected_band_ids[0])
+
+    if similarity_results is None:
+        use_seed = ctx.exclude_input and not ctx.keyword_applied and mode != "boost"
+        similarity_results = search_with_neighbor_seed(
+            db=ctx.db,
+            user_embedding=ctx.search_vectors[0].tolist(),
+            seed_band_ids=set(ctx.selected_band_ids) if use_seed else set(),
+            top_k=fetch_k,
+            exclude_band_ids=exclude_ids,
+            only_bands=ctx.only_bands,
+        )
+
+    if mode == "boost":
+        similarity_results = keyword_boost(ctx, similarity_results, ctx.top_k)
+        RECOMMEND_HYBRID_OUTCOMES.labels(version=ctx.version, outcome="boosted").inc()
+
+    ctx.candidates = [similarity_results]
+
+
+def per_cluster_retriever(ctx: RecommendationContext) -> None:
+    """
+    각 클러스터 기준 벡터마다 상위 10개 후보 검색 (V3/V4, 빈 클러스터는 스킵).
+
+    클러스터별 검색은 서로 독립적이므로 한 번에 보냄 (psycopg3면 파이프라인 모드).
+    키워드 하이브리드 검색은 single_vector_retriever와 같은 방식으로 적용.
+    """
+    exclude_ids = set(ctx.selected_band_ids) if ctx.exclude_input else set()
+    mode = _hybrid_mode(ctx)
+    # 클러스터 간 중복 제거를 위해 넉넉히 가져옴
+    top_k = 10
+
+    active = [i for i, count in enumerate(ctx.cluster_counts) if count > 0]
+    if len(active) < len(ctx.search_vectors):
+        diagnostics.emit(logger, "retrieve.skip_empty_clusters", version=ctx.version, active=active)
+
+    vectors = [ctx.search_vectors[i] for i in active]
+    results = None
+    if mode == "restrict":
+        results = keyword_restricted_search(ctx, vectors, top_k, exclude_ids)
+        RECOMMEND_HYBRID_OUTCOMES.labels(
+            version=ctx.version, outcome="restricted" if results is not None else "fallback"
+        ).inc()
+
+    if results is None:
+        results = find_similar_bands_by_embeddings(
+            db=ctx.db,
+            user_embeddings=vectors,
+            top_k=top_k * settings.RECOMMEND_HYBRID_BOOST_OVERFETCH if mode == "boost" else top_k,
+            exclude_band_ids=exclude_ids,
+            only_bands=ctx.only_bands,
+        )
+
+    if mode == "boost":
+        results = [keyword_boost(ctx, candidates, top_k) for candidates in results]
+        RECOMMEND_HYBRID_OUTCOMES.labels(version=ctx.version, outcome="boosted").inc()
+
+    ctx.candidates = [[] for _ in ctx.search_vectors]
+    for i, candidates in zip(active, results):
+        ctx.candidates[i] = candidates
+
+
+# [diversifier]
+
+def top_k_diversifier(ctx: RecommendationContext) -> None:
+    """단일 검색 결과에서 상위 top_k 선택 (V1/V2)"""
+    ctx.ranked = [(band_id, score, 0) for band_id, score in ctx.candidates[0][:ctx.top_k]]
+
+    diagnostics.emit(logger, "diversify.top_k", version=ctx.version, ranked=ctx.ranked)
+
+
+def cluster_diversifier(ctx: RecommendationContext) -> None:
+    """
+    클러스터별 다양성 확보 선택 (V3/V4).
+
+    - 각 클러스터의 1등: 필수 포함
+    - 각 클러스터의 2등 중 점수 높은 2개: 추가 포함
+    - 클러스터 간 중복 밴드는 먼저 뽑힌 클러스터에만 포함
+    """
+    cluster_top1 = []  # 각 클러스터의 1등 (band_id, score, cluster_idx)
+    cluster_top2 = []  # 각 클러스터의 2등 (band_id, score, cluster_idx)
+    already_recommended = set()  # 중복 방지
+
+    for i, results in enumerate(ctx.candidates):
+        cluster_bands = []
+        for band_id, score in results:
+            if band_id not in already_recommended:
+                cluster_bands.append((band_id, score, i))
+                already_recommended.add(band_id)
+                if len(cluster_bands) == 2:
+                    break
+
+        if len(cluster_bands) >= 1:
+            cluster_top1.append(cluster_bands[0])
+        if len(cluster_bands) >= 2:
+            cluster_top2.append(cluster_bands[1])
+
+    final_recommended = cluster_top1.copy()
+    cluster_top2_sorted = sorted(cluster_top2, key=lambda x: x[1], reverse=True)
+    final_recommended.extend(cluster_top2_sorted[:2])
+
+    # 최종 점수 순으로 정렬
+    final_recommended.sort(key=lambda x: x[1], reverse=True)
+    ctx.ranked = final_recommended
+
+    diagnostics.emit(
+        logger,
+        "diversify.clusters",
+        version=ctx.version,
+        top1=len(cluster_top1),
+        top2=len(cluster_top2_sorted[:2]),
+        ranked=ctx.ranked,
+    )
+
+
+# [hydrator]
+
+def hydrate_band_details(ctx: RecommendationContext) -> None:
+    """추천 밴드의 이름/이미지/대표곡/키워드를 결합 (메모리 카탈로그 조회)"""
+    recommended_band_ids = [band_id for band_id, _, _ in ctx.ranked]
+    bands_info = band_catalog.get_many(ctx.db, recommended_band_ids)
+
+    ctx.results = []
+    for band_id, score, _ in ctx.ranked:
+        band_info = bands_info.get(band_id, {})
+        ctx.results.append({
+            "band_id": band_id,
+            "score": score,
+            "band_name": band_info.get("band_name"),
+            "image_url": band_info.get("main_image"),
+            "band_music": band_info.get("main_music"),
+            "keywords": band_info.get("keywords", []),
+        })
+
+
+# ============================================================
+# 버전별 파이프라인 구성
+# ============================================================
+
+V2_CONFIG = PipelineConfig(
+    version="v2",
+    profile_builder=build_single_profile,
+    keyword_blender=slerp_keyword_blend,
+    retriever=single_vector_retriever,
+    diversifier=top_k_diversifier,
+    hydrator=hydrate_band_details,
+)
+
+V1_CONFIG = replace(V2_CONFIG, version="v1", keyword_blender=no_keyword_blend)
+
+# V3/V4 폴백용 V2 (top 3 고정, is_band 필터 없음)
+V2_FALLBACK_CONFIG = replace(V2_CONFIG, top_k=3)
+
+V3_CONFIG = PipelineConfig(
+    version="v3",
+    profile_builder=build_cluster_profiles,
+    keyword_blender=slerp_keyword_blend,
+    retriever=per_cluster_retriever,
+    diversifier=cluster_diversifier,
+    hydrator=hydrate_band_details,
+    top_k=5,
+    min_bands=3,
+    fallback=V2_FALLBACK_CONFIG,
+)
+
+V4_CONFIG = replace(V3_CONFIG, version="v4", only_bands=True)
+
+PIPELINE_CONFIGS: Dict[str, PipelineConfig] = {
+    "v1": V1_CONFIG,
+    "v2": V2_CONFIG,
+    "v3": V3_CONFIG,
+    "v4": V4_CONFIG,
+}
+
+
+# ============================================================
+# 추천 결과 캐시
+# ============================================================
+
+# (버전, 정렬된 bandIds, 정렬된 keywordIds, top_k, exclude_input, 카탈로그 세대) → RecommendationResult
+recommendation_cache = TTLLRUCache(
+    "recommendation",
+    max_size=settings.RECOMMEND_CACHE_MAX_SIZE,
+    ttl_seconds=settings.RECOMMEND_CACHE_TTL_SECONDS,
+)
+
+# 카탈로그가 바뀌면 이전 세대 결과는 더 이상 조회되지 않으므로 즉시 비움
+catalog_generation.add_listener(lambda generation: recommendation_cache.clear())
+
+
+def _recommendation_cache_key(
+    config: PipelineConfig,
+    band_ids: List[int],
+    keyword_ids: List[int],
+    top_k: Optional[int],
+    exclude_input: bool,
+    generation: int,
+) -> Tuple:
+    return (
+        config.version,
+        tuple(sorted(set(band_ids))),
+        tuple(sorted(set(keyword_ids))),
+        config.top_k or top_k or 3,
+        exclude_input,
+        generation,
+    )
+
+
+def _copy_result(result: RecommendationResult, cache_hit: bool, timings: Dict[str, float]) -> RecommendationResult:
+    """캐시에 든 결과가 호출자 쪽에서 수정되지 않도록 얕은 복사본 반환"""
+    return replace(
+        result,
+        bands=[dict(band, keywords=list(band["keywords"])) for band in result.bands],
+        timings=timings,
+        cache_hit=cache_hit,
+        diagnostics=None,
+    )
+
+
+def build_input_fingerprint(
+    version: str,
+    band_ids: List[int],
+    keyword_ids: List[int],
+) -> Optional[str]:
+    """
+    추천 입력 지문 생성 (선택 순서/중복과 무관).
+
+    카탈로그 워터마크를 포함하므로 임베딩이나 밴드/키워드 정보가 바뀌면 지문도 바뀝니다.
+
+    Args:
+        version: 알고리즘 버전
+        band_ids: 선택 밴드 ID 리스트
+        keyword_ids: 선택 키워드 ID 리스트
+
+    Returns:
+        sha256 hex 문자열, 카탈로그 워터마크를 알 수 없으면 None (항상 재계산)
+    """
+    watermark = catalog_generation.watermark
+    if watermark is None:
+        return None
+
+    inputs = {
+        "version": version,
+        "bands": sorted(set(band_ids)),
+        "keywords": sorted(set(keyword_ids)),
+        "catalog": watermark,
+    }
+    # 하이브리드 검색 방식이 바뀌면 결과도 바뀌므로 포함 (off면 기존 지문 유지)
+    if settings.RECOMMEND_HYBRID_MODE != "off":
+        inputs["hybrid"] = settings.RECOMMEND_HYBRID_MODE
+    payload = json.dumps(inputs, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def recommend(
+    version: str,
+    db: Session,
+    band_ids: List[int],
+    keyword_ids: Optional[List[int]] = None,
+    top_k: Optional[int] = None,
+    exclude_input: bool = True,
+    use_cache: bool = True,
+    band_embeddings: Optional[Dict[int, Any]] = None,
+    keywords: Optional[List[str]] = None,
+    trace: bool = False,
+) -> RecommendationResult:
+    """
+    버전 이름으로 추천 파이프라인 실행 (단계별 소요 시간 포함).
+
+    결과는 입력(정렬된 밴드/키워드 ID, 버전, top_k)과 카탈로그 세대로 캐시되며,
+    임베딩이나 밴드/키워드 정보가 바뀌면 세대가 올라가 자동으로 무효화됩니다.
+
+    Args:
+        version: "v1" ~ "v4"
+        db: DB 세션
+        band_ids: 사용자가 선택한 밴드 ID 리스트
+        keyword_ids: 사용자가 선택한 키워드 ID 리스트 (V1은 무시)
+        top_k: 반환할 추천 밴드 수 (V3/V4는 5개 고정)
+        exclude_input: 입력한 밴드를 추천 결과에서 제외할지 여부
+        use_cache: False면 캐시를 건너뛰고 항상 다시 계산
+        band_embeddings: 미리 조회한 {band_id: embedding} (get_member_context 결과 등)
+        keywords: 미리 조회한 키워드 텍스트 리스트 (band_embeddings와 함께 전달)
+        trace: True면 진단 이벤트를 수집 (캐시 조회는 건너뛰고 실제로 계산)
+
+    Returns:
+        RecommendationResult
+    """
+    config = PIPELINE_CONFIGS[version]
+    if config.keyword_blender is no_keyword_blend:
+        keyword_ids = []
+        keywords = [] if band_embeddings is not None else None
+    keyword_ids = keyword_ids or []
+
+    use_cache = use_cache and settings.RECOMMEND_CACHE_ENABLED
+    cache_key = None
+    if use_cache and not trace:
+        start = time.perf_counter()
+        cache_key = _recommendation_cache_key(
+            config, band_ids, keyword_ids, top_k, exclude_input, catalog_generation.current()
+        )
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            elapsed = time.perf_counter() - start
+            profiling.record_stage("cache", elapsed)
+            elapsed_ms = round(elapsed * 1000, 3)
+            logger.info("[%s] 추천 결과 캐시 적중 (%sms)", version.upper(), elapsed_ms)
+            return _copy_result(cached, cache_hit=True, timings={"cache": elapsed_ms, "total": elapsed_ms})
+
+    result = run_pipeline(
+        config,
+        db=db,
+        band_ids=band_ids,
+        keyword_ids=keyword_ids,
+        top_k=top_k,
+        exclude_input=exclude_input,
+        band_embeddings=band_embeddings,
+        keywords=keywords,
+        trace=trace,
+    )
+
+    # 품질을 낮춘 결과는 캐시하지 않음 (다음 요청은 정상 경로로 다시 계산)
+    if cache_key is not None and result.degraded is None:
+        recommendation_cache.set(cache_key, _copy_result(result, cache_hit=False, timings=dict(result.timings)))
+
+    return result
 
 
 def recommend_bands_v1(
@@ -249,82 +816,7 @@ def recommend_bands_v1(
     Returns:
         [{"band_id": int, "score": float, "band_name": str, "image_url": str, "band_music": str, "keywords": [str]}, ...]
     """
-    logger.info("=" * 70)
-    logger.info("🎸 [V1] 밴드 기반 추천 시작")
-    logger.info("=" * 70)
-    logger.info(f"[V1 입력]")
-    logger.info(f"  밴드 IDs: {band_ids}")
-    logger.info(f"  요청 개수: {len(band_ids)}개")
-    logger.info(f"  반환할 추천 수 (top_k): {top_k}")
-    logger.info(f"  입력 밴드 제외 여부: {exclude_input}")
-    
-    unique_band_ids = list(dict.fromkeys(band_ids))
-    if len(unique_band_ids) != len(band_ids):
-        logger.info(f"  ⚠️ 중복 제거: {len(band_ids)}개 → {len(unique_band_ids)}개")
-    
-    # 1. 사용자가 선택한 밴드들의 임베딩 가져오기
-    logger.info("-" * 50)
-    logger.info("[V1 Step 1] 밴드 임베딩 조회")
-    selected_bands = get_band_descriptions_by_ids(db, unique_band_ids)
-    
-    if not selected_bands:
-        raise ValueError("선택한 밴드 중 임베딩이 있는 밴드가 없습니다.")
-    
-    logger.info(f"  조회된 밴드: {len(selected_bands)}개")
-    for band in selected_bands:
-        emb_norm = np.linalg.norm(np.array(band.embedding)) if band.embedding is not None else 0
-        logger.info(f"    - band_id={band.band_id}, 임베딩 norm={emb_norm:.4f}")
-    
-    selected_embeddings = [np.array(b.embedding) for b in selected_bands]
-    selected_band_ids = {b.band_id for b in selected_bands}
-    
-    # 2. 사용자 임베딩 벡터 생성
-    logger.info("-" * 50)
-    logger.info("[V1 Step 2] 사용자 벡터 생성")
-    user_embedding = build_user_embedding(selected_embeddings)
-    logger.info(f"  최종 사용자 벡터 norm: {np.linalg.norm(user_embedding):.4f}")
-    
-    # 3. DB 쿼리로 코사인 유사도 계산 + 정렬 + top_k 반환 (pgvector 활용)
-    exclude_ids = selected_band_ids if exclude_input else None
-    
-    logger.info("-" * 50)
-    logger.info("[V1 Step 3] pgvector 유사도 검색")
-    logger.info(f"  제외할 밴드: {len(exclude_ids) if exclude_ids else 0}개 {list(exclude_ids) if exclude_ids else []}")
-    
-    similarity_results = find_similar_bands_by_embedding(
-        db=db,
-        user_embedding=user_embedding.tolist(),
-        top_k=top_k,
-        exclude_band_ids=exclude_ids,
-    )
-    
-    # 결과 로그
-    logger.info("=" * 70)
-    logger.info(f"[V1 추천 결과] 상위 {top_k}개:")
-    for i, (band_id, score) in enumerate(similarity_results[:top_k], 1):
-        logger.info(f"  {i}. band_id={band_id}, score={score:.4f}")
-    logger.info("=" * 70)
-    
-    # 4. 추천된 밴드들의 상세 정보 조회
-    recommended_band_ids = [band_id for band_id, _ in similarity_results[:top_k]]
-    bands_info = get_bands_with_keywords_by_ids(db, recommended_band_ids)
-    
-    # 5. 결과 조합
-    results = []
-    for band_id, score in similarity_results[:top_k]:
-        band_info = bands_info.get(band_id, {})
-        results.append({
-            "band_id": band_id,
-            "score": score,
-            "band_name": band_info.get("band_name"),
-            "image_url": band_info.get("main_image"),
-            "band_music": band_info.get("main_music"),
-            "keywords": band_info.get("keywords", []),
-        })
-    
-    logger.info(f"[V1 최종 결과] 밴드 상세 정보 포함 {len(results)}개 반환")
-    
-    return results
+    return recommend("v1", db, band_ids, top_k=top_k, exclude_input=exclude_input).bands
 
 
 def recommend_bands_v2(
@@ -350,133 +842,7 @@ def recommend_bands_v2(
     Returns:
         [{"band_id": int, "score": float, ...}, ...]
     """
-    logger.info("=" * 70)
-    logger.info("🎸🏷️ [V2] 밴드 + 키워드 기반 추천 시작")
-    logger.info("=" * 70)
-    logger.info("[V2 입력]")
-    logger.info(f"  밴드 IDs: {band_ids}")
-    logger.info(f"  밴드 개수: {len(band_ids)}개")
-    logger.info(f"  키워드 IDs: {keyword_ids}")
-    logger.info(f"  키워드 개수: {len(keyword_ids)}개")
-    logger.info(f"  반환할 추천 수 (top_k): {top_k}")
-    logger.info(f"  입력 밴드 제외 여부: {exclude_input}")
-    
-    unique_band_ids = list(dict.fromkeys(band_ids))
-    if len(unique_band_ids) != len(band_ids):
-        logger.info(f"  ⚠️ 밴드 중복 제거: {len(band_ids)}개 → {len(unique_band_ids)}개")
-    
-    # 1. 사용자가 선택한 밴드들의 임베딩 가져오기
-    logger.info("-" * 50)
-    logger.info("[V2 Step 1] 밴드 임베딩 조회")
-    selected_bands = get_band_descriptions_by_ids(db, unique_band_ids)
-    
-    if not selected_bands:
-        raise ValueError("선택한 밴드 중 임베딩이 있는 밴드가 없습니다.")
-    
-    logger.info(f"  조회된 밴드: {len(selected_bands)}개")
-    for band in selected_bands:
-        emb_norm = np.linalg.norm(np.array(band.embedding)) if band.embedding is not None else 0
-        logger.info(f"    - band_id={band.band_id}, 임베딩 norm={emb_norm:.4f}")
-    
-    selected_embeddings = [np.array(b.embedding) for b in selected_bands]
-    selected_band_ids = {b.band_id for b in selected_bands}
-    
-    # 2. 밴드 기반 사용자 임베딩 벡터 생성 (V1과 동일)
-    logger.info("-" * 50)
-    logger.info("[V2 Step 2] 밴드 기반 사용자 벡터 생성")
-    user_embedding_before = build_user_embedding(selected_embeddings)
-    user_embedding = user_embedding_before.copy()
-    
-    user_vec_norm_before = np.linalg.norm(user_embedding_before)
-    logger.info(f"  밴드 기반 사용자 벡터 norm: {user_vec_norm_before:.4f}")
-    
-    # 3. 키워드가 있으면 Slerp로 결합
-    logger.info("-" * 50)
-    logger.info("[V2 Step 3] 키워드 벡터 생성 및 Slerp 적용")
-    
-    keyword_applied = False
-    if keyword_ids:
-        # 키워드 텍스트 조회
-        keywords = get_keywords_by_ids(db, keyword_ids)
-        
-        if keywords:
-            logger.info(f"  조회된 키워드: {len(keywords)}개")
-            logger.info(f"  키워드 목록: {keywords}")
-            
-            # 키워드 임베딩 생성
-            keyword_embedding = embed_keywords(keywords)
-            
-            # 유사도 기반 t 계산
-            t = adaptive_t(user_embedding, keyword_embedding)
-            
-            # Slerp로 사용자 벡터에 키워드 방향 반영
-            user_embedding = slerp(user_embedding, keyword_embedding, t)
-            keyword_applied = True
-            
-            # 변화량 분석
-            logger.info("-" * 50)
-            logger.info("[V2 벡터 변화 분석]")
-            
-            # 변화 전후 비교
-            change_magnitude = np.linalg.norm(user_embedding - user_embedding_before / user_vec_norm_before)
-            before_after_similarity = np.dot(
-                user_embedding_before / user_vec_norm_before,
-                user_embedding / np.linalg.norm(user_embedding)
-            )
-            
-            logger.info(f"  원본 사용자 벡터 norm: {user_vec_norm_before:.4f}")
-            logger.info(f"  회전 후 벡터 norm: {np.linalg.norm(user_embedding):.4f}")
-            logger.info(f"  [원본 사용자 벡터] ↔ [회전 후 벡터] 유사도: {before_after_similarity:.4f}")
-            logger.info(f"  키워드 기여도 (t): {t:.3f} ({t*100:.1f}%)")
-            logger.info(f"  ✅ 키워드 반영 완료!")
-        else:
-            logger.info("  ⚠️ 유효한 키워드 없음 → 밴드 기반 벡터만 사용")
-    else:
-        logger.info("  ⚠️ 키워드 없음 → 밴드 기반 벡터만 사용")
-    
-    # 4. DB 쿼리로 코사인 유사도 계산
-    exclude_ids = selected_band_ids if exclude_input else None
-    
-    logger.info("-" * 50)
-    logger.info("[V2 Step 4] pgvector 유사도 검색")
-    logger.info(f"  최종 사용자 벡터 norm: {np.linalg.norm(user_embedding):.4f}")
-    logger.info(f"  키워드 적용 여부: {'✅ 적용됨' if keyword_applied else '❌ 미적용'}")
-    logger.info(f"  제외할 밴드: {len(exclude_ids) if exclude_ids else 0}개 {list(exclude_ids) if exclude_ids else []}")
-    
-    similarity_results = find_similar_bands_by_embedding(
-        db=db,
-        user_embedding=user_embedding.tolist(),
-        top_k=top_k,
-        exclude_band_ids=exclude_ids,
-    )
-    
-    # 결과 로그
-    logger.info("=" * 70)
-    logger.info(f"[V2 추천 결과] 상위 {top_k}개:")
-    for i, (band_id, score) in enumerate(similarity_results[:top_k], 1):
-        logger.info(f"  {i}. band_id={band_id}, score={score:.4f}")
-    logger.info("=" * 70)
-    
-    # 5. 추천된 밴드들의 상세 정보 조회
-    recommended_band_ids = [band_id for band_id, _ in similarity_results[:top_k]]
-    bands_info = get_bands_with_keywords_by_ids(db, recommended_band_ids)
-    
-    # 6. 결과 조합
-    results = []
-    for band_id, score in similarity_results[:top_k]:
-        band_info = bands_info.get(band_id, {})
-        results.append({
-            "band_id": band_id,
-            "score": score,
-            "band_name": band_info.get("band_name"),
-            "image_url": band_info.get("main_image"),
-            "band_music": band_info.get("main_music"),
-            "keywords": band_info.get("keywords", []),
-        })
-    
-    logger.info(f"[V2 최종 결과] 밴드 상세 정보 포함 {len(results)}개 반환")
-    
-    return results
+    return recommend("v2", db, band_ids, keyword_ids, top_k=top_k, exclude_input=exclude_input).bands
 
 
 def recommend_bands_v3(
@@ -506,202 +872,7 @@ def recommend_bands_v3(
     Returns:
         [{"band_id": int, "score": float, ...}, ...]
     """
-    logger.info("=" * 70)
-    logger.info("🎸🏷️🎯 [V3] 클러스터별 키워드 반영 추천 시작")
-    logger.info("=" * 70)
-    logger.info("[V3 입력]")
-    logger.info(f"  밴드 IDs: {band_ids}")
-    logger.info(f"  밴드 개수: {len(band_ids)}개")
-    logger.info(f"  키워드 IDs: {keyword_ids}")
-    logger.info(f"  키워드 개수: {len(keyword_ids)}개")
-    
-    unique_band_ids = list(dict.fromkeys(band_ids))
-    
-    # 밴드가 3개 미만이면 V2로 폴백
-    if len(unique_band_ids) < 3:
-        logger.info(f"  ⚠️ 밴드 {len(unique_band_ids)}개 < 3개 → V2로 폴백")
-        logger.info("=" * 70)
-        return recommend_bands_v2(
-            db=db,
-            band_ids=band_ids,
-            keyword_ids=keyword_ids,
-            top_k=3,
-            exclude_input=exclude_input,
-        )
-    
-    # 1. 사용자가 선택한 밴드들의 임베딩 가져오기
-    logger.info("-" * 50)
-    logger.info("[V3 Step 1] 밴드 임베딩 조회")
-    selected_bands = get_band_descriptions_by_ids(db, unique_band_ids)
-    
-    if not selected_bands:
-        raise ValueError("선택한 밴드 중 임베딩이 있는 밴드가 없습니다.")
-    
-    if len(selected_bands) < 3:
-        logger.info(f"  ⚠️ 임베딩 있는 밴드 {len(selected_bands)}개 < 3개 → V2로 폴백")
-        return recommend_bands_v2(
-            db=db,
-            band_ids=band_ids,
-            keyword_ids=keyword_ids,
-            top_k=3,
-            exclude_input=exclude_input,
-        )
-    
-    logger.info(f"  조회된 밴드: {len(selected_bands)}개")
-    for band in selected_bands:
-        emb_norm = np.linalg.norm(np.array(band.embedding)) if band.embedding is not None else 0
-        logger.info(f"    - band_id={band.band_id}, 임베딩 norm={emb_norm:.4f}")
-    
-    selected_embeddings = [np.array(b.embedding) for b in selected_bands]
-    selected_band_ids = {b.band_id for b in selected_bands}
-    
-    # 2. K-means 클러스터링 (k=3)
-    logger.info("-" * 50)
-    logger.info("[V3 Step 2] K-means 클러스터링 (k=3)")
-    
-    X = np.array(selected_embeddings)
-    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-    labels = kmeans.fit_predict(X)
-    centroids = kmeans.cluster_centers_  # shape: (3, dim)
-    cluster_counts = np.bincount(labels, minlength=3)
-    
-    logger.info("[클러스터링 결과]")
-    for i in range(3):
-        logger.info(f"  클러스터 {i}: {cluster_counts[i]}개 벡터, centroid norm={np.linalg.norm(centroids[i]):.4f}")
-    
-    # 3. 키워드 임베딩 생성
-    logger.info("-" * 50)
-    logger.info("[V3 Step 3] 키워드 임베딩 생성")
-    
-    keyword_embedding = None
-    if keyword_ids:
-        keywords = get_keywords_by_ids(db, keyword_ids)
-        if keywords:
-            logger.info(f"  조회된 키워드: {keywords}")
-            keyword_embedding = embed_keywords(keywords)
-        else:
-            logger.info("  ⚠️ 유효한 키워드 없음")
-    else:
-        logger.info("  ⚠️ 키워드 없음")
-    
-    # 4. 각 centroid에 Slerp 적용
-    logger.info("-" * 50)
-    logger.info("[V3 Step 4] 각 클러스터 centroid에 키워드 Slerp 적용")
-    
-    adjusted_centroids = []
-    for i in range(3):
-        centroid = centroids[i]
-        
-        if keyword_embedding is not None and cluster_counts[i] > 0:
-            # 유사도 기반 t 계산
-            t = adaptive_t(centroid, keyword_embedding)
-            logger.info(f"  클러스터 {i}: t={t:.3f}")
-            
-            # Slerp로 키워드 방향 반영
-            adjusted = slerp(centroid, keyword_embedding, t)
-            adjusted_centroids.append(adjusted)
-            
-            logger.info(f"    [원본 centroid] ↔ [회전 후 centroid] 유사도: {np.dot(centroid/np.linalg.norm(centroid), adjusted):.4f}")
-        else:
-            # 키워드 없으면 원본 centroid 사용 (정규화)
-            adjusted_centroids.append(centroid / np.linalg.norm(centroid))
-            logger.info(f"  클러스터 {i}: 키워드 없음 → 원본 centroid 사용")
-    
-    # 5. 각 조정된 centroid에 가장 가까운 밴드 2개씩 검색
-    logger.info("-" * 50)
-    logger.info("[V3 Step 5] 각 클러스터별 상위 2개 밴드 검색")
-    
-    exclude_ids = selected_band_ids if exclude_input else set()
-    cluster_top1 = []  # 각 클러스터의 1등 (band_id, score, cluster_idx)
-    cluster_top2 = []  # 각 클러스터의 2등 (band_id, score, cluster_idx)
-    already_recommended = set()  # 중복 방지
-    
-    for i, adj_centroid in enumerate(adjusted_centroids):
-        # 빈 클러스터는 스킵
-        if cluster_counts[i] == 0:
-            logger.info(f"  클러스터 {i}: 비어있음 → 스킵")
-            continue
-        
-        # 해당 centroid로 가장 유사한 밴드 검색 (top_k를 넉넉히 가져와서 중복 체크)
-        results = find_similar_bands_by_embedding(
-            db=db,
-            user_embedding=adj_centroid.tolist(),
-            top_k=10,  # 넉넉히 가져옴
-            exclude_band_ids=exclude_ids,
-        )
-        
-        # 각 클러스터에서 2개씩 뽑기
-        cluster_bands = []
-        for band_id, score in results:
-            if band_id not in already_recommended:
-                cluster_bands.append((band_id, score, i))
-                already_recommended.add(band_id)
-                if len(cluster_bands) == 2:
-                    break
-        
-        # 1등과 2등 분리
-        if len(cluster_bands) >= 1:
-            cluster_top1.append(cluster_bands[0])
-            logger.info(f"  클러스터 {i} - 1등: band_id={cluster_bands[0][0]}, score={cluster_bands[0][1]:.4f}")
-        
-        if len(cluster_bands) >= 2:
-            cluster_top2.append(cluster_bands[1])
-            logger.info(f"  클러스터 {i} - 2등: band_id={cluster_bands[1][0]}, score={cluster_bands[1][1]:.4f}")
-        
-        if len(cluster_bands) == 0:
-            logger.info(f"  클러스터 {i}: 추천할 밴드 없음")
-        elif len(cluster_bands) == 1:
-            logger.info(f"  클러스터 {i}: 2등 밴드 없음 (1개만 발견)")
-    
-    # 6. 최종 추천 목록 구성
-    logger.info("-" * 50)
-    logger.info("[V3 Step 6] 최종 추천 목록 구성")
-    
-    # 각 클러스터 1등 3개는 필수 포함
-    final_recommended = cluster_top1.copy()
-    logger.info(f"  필수 포함 (각 클러스터 1등): {len(cluster_top1)}개")
-    
-    # 각 클러스터 2등 중 점수 높은 순으로 정렬하여 상위 2개 추가
-    cluster_top2_sorted = sorted(cluster_top2, key=lambda x: x[1], reverse=True)
-    additional_bands = cluster_top2_sorted[:2]
-    final_recommended.extend(additional_bands)
-    
-    logger.info(f"  추가 포함 (2등 중 상위): {len(additional_bands)}개")
-    for band_id, score, cluster_idx in additional_bands:
-        logger.info(f"    클러스터 {cluster_idx} - band_id={band_id}, score={score:.4f}")
-    
-    # 7. 최종 점수 순으로 정렬
-    final_recommended.sort(key=lambda x: x[1], reverse=True)
-    
-    logger.info("-" * 50)
-    logger.info("[V3 추천 결과] 총 5개 밴드")
-    for i, (band_id, score, cluster_idx) in enumerate(final_recommended, 1):
-        logger.info(f"  {i}. band_id={band_id}, score={score:.4f} (클러스터 {cluster_idx})")
-    
-    # 8. 밴드 상세 정보 조회
-    recommended_band_ids = [band_id for band_id, _, _ in final_recommended]
-    bands_info = get_bands_with_keywords_by_ids(db, recommended_band_ids)
-    
-    # 9. 결과 조합
-    results = []
-    for band_id, score, cluster_idx in final_recommended:
-        band_info = bands_info.get(band_id, {})
-        results.append({
-            "band_id": band_id,
-            "score": score,
-            "band_name": band_info.get("band_name"),
-            "image_url": band_info.get("main_image"),
-            "band_music": band_info.get("main_music"),
-            "keywords": band_info.get("keywords", []),
-        })
-    
-    logger.info("=" * 70)
-    logger.info(f"[V3 최종 결과] {len(results)}개 밴드 반환")
-    logger.info(f"  - 각 클러스터 1등: 3개 (필수)")
-    logger.info(f"  - 각 클러스터 2등 중 상위: 2개 (추가)")
-    logger.info("=" * 70)
-    
-    return results
+    return recommend("v3", db, band_ids, keyword_ids, exclude_input=exclude_input).bands
 
 
 def recommend_bands_v4(
@@ -716,13 +887,6 @@ def recommend_bands_v4(
     V3와 동일한 로직이지만, 추천 대상을 is_band=true인 밴드로 제한.
     입력된 band_ids는 is_band 값과 무관하게 클러스터링에 사용됨.
     
-    각 클러스터의 centroid에 키워드 벡터를 Slerp로 적용하여
-    3개의 조정된 중심 벡터를 만들고, 각각에 가장 가까운 밴드 2개씩 검색.
-    
-    - 각 클러스터의 1등 3개: 필수 반환
-    - 각 클러스터의 2등 중 점수 높은 2개: 추가 반환
-    - 총 5개 밴드 반환
-    
     밴드가 3개 미만이면 V2로 폴백 (V2는 is_band 필터 없음).
     
     Args:
@@ -734,202 +898,4 @@ def recommend_bands_v4(
     Returns:
         [{"band_id": int, "score": float, ...}, ...]
     """
-    logger.info("=" * 70)
-    logger.info("🎸🏷️🎯🔍 [V4] 클러스터별 키워드 반영 + is_band 필터링 추천 시작")
-    logger.info("=" * 70)
-    logger.info("[V4 입력]")
-    logger.info(f"  밴드 IDs: {band_ids}")
-    logger.info(f"  밴드 개수: {len(band_ids)}개")
-    logger.info(f"  키워드 IDs: {keyword_ids}")
-    logger.info(f"  키워드 개수: {len(keyword_ids)}개")
-    logger.info(f"  필터링: is_band=true 밴드만 추천")
-    
-    unique_band_ids = list(dict.fromkeys(band_ids))
-    
-    # 밴드가 3개 미만이면 V2로 폴백
-    if len(unique_band_ids) < 3:
-        logger.info(f"  ⚠️ 밴드 {len(unique_band_ids)}개 < 3개 → V2로 폴백 (is_band 필터 없음)")
-        logger.info("=" * 70)
-        return recommend_bands_v2(
-            db=db,
-            band_ids=band_ids,
-            keyword_ids=keyword_ids,
-            top_k=3,
-            exclude_input=exclude_input,
-        )
-    
-    # 1. 사용자가 선택한 밴드들의 임베딩 가져오기
-    logger.info("-" * 50)
-    logger.info("[V4 Step 1] 밴드 임베딩 조회")
-    selected_bands = get_band_descriptions_by_ids(db, unique_band_ids)
-    
-    if not selected_bands:
-        raise ValueError("선택한 밴드 중 임베딩이 있는 밴드가 없습니다.")
-    
-    if len(selected_bands) < 3:
-        logger.info(f"  ⚠️ 임베딩 있는 밴드 {len(selected_bands)}개 < 3개 → V2로 폴백 (is_band 필터 없음)")
-        return recommend_bands_v2(
-            db=db,
-            band_ids=band_ids,
-            keyword_ids=keyword_ids,
-            top_k=3,
-            exclude_input=exclude_input,
-        )
-    
-    logger.info(f"  조회된 밴드: {len(selected_bands)}개")
-    for band in selected_bands:
-        emb_norm = np.linalg.norm(np.array(band.embedding)) if band.embedding is not None else 0
-        logger.info(f"    - band_id={band.band_id}, 임베딩 norm={emb_norm:.4f}")
-    
-    selected_embeddings = [np.array(b.embedding) for b in selected_bands]
-    selected_band_ids = {b.band_id for b in selected_bands}
-    
-    # 2. K-means 클러스터링 (k=3)
-    logger.info("-" * 50)
-    logger.info("[V4 Step 2] K-means 클러스터링 (k=3)")
-    
-    X = np.array(selected_embeddings)
-    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-    labels = kmeans.fit_predict(X)
-    centroids = kmeans.cluster_centers_  # shape: (3, dim)
-    cluster_counts = np.bincount(labels, minlength=3)
-    
-    logger.info("[클러스터링 결과]")
-    for i in range(3):
-        logger.info(f"  클러스터 {i}: {cluster_counts[i]}개 벡터, centroid norm={np.linalg.norm(centroids[i]):.4f}")
-    
-    # 3. 키워드 임베딩 생성
-    logger.info("-" * 50)
-    logger.info("[V4 Step 3] 키워드 임베딩 생성")
-    
-    keyword_embedding = None
-    if keyword_ids:
-        keywords = get_keywords_by_ids(db, keyword_ids)
-        if keywords:
-            logger.info(f"  조회된 키워드: {keywords}")
-            keyword_embedding = embed_keywords(keywords)
-        else:
-            logger.info("  ⚠️ 유효한 키워드 없음")
-    else:
-        logger.info("  ⚠️ 키워드 없음")
-    
-    # 4. 각 centroid에 Slerp 적용
-    logger.info("-" * 50)
-    logger.info("[V4 Step 4] 각 클러스터 centroid에 키워드 Slerp 적용")
-    
-    adjusted_centroids = []
-    for i in range(3):
-        centroid = centroids[i]
-        
-        if keyword_embedding is not None and cluster_counts[i] > 0:
-            # 유사도 기반 t 계산
-            t = adaptive_t(centroid, keyword_embedding)
-            logger.info(f"  클러스터 {i}: t={t:.3f}")
-            
-            # Slerp로 키워드 방향 반영
-            adjusted = slerp(centroid, keyword_embedding, t)
-            adjusted_centroids.append(adjusted)
-            
-            logger.info(f"    [원본 centroid] ↔ [회전 후 centroid] 유사도: {np.dot(centroid/np.linalg.norm(centroid), adjusted):.4f}")
-        else:
-            # 키워드 없으면 원본 centroid 사용 (정규화)
-            adjusted_centroids.append(centroid / np.linalg.norm(centroid))
-            logger.info(f"  클러스터 {i}: 키워드 없음 → 원본 centroid 사용")
-    
-    # 5. 각 조정된 centroid에 가장 가까운 is_band=true 밴드 2개씩 검색
-    logger.info("-" * 50)
-    logger.info("[V4 Step 5] 각 클러스터별 상위 2개 밴드 검색 (is_band=true만)")
-    
-    exclude_ids = selected_band_ids if exclude_input else set()
-    cluster_top1 = []  # 각 클러스터의 1등 (band_id, score, cluster_idx)
-    cluster_top2 = []  # 각 클러스터의 2등 (band_id, score, cluster_idx)
-    already_recommended = set()  # 중복 방지
-    
-    for i, adj_centroid in enumerate(adjusted_centroids):
-        # 빈 클러스터는 스킵
-        if cluster_counts[i] == 0:
-            logger.info(f"  클러스터 {i}: 비어있음 → 스킵")
-            continue
-        
-        # 해당 centroid로 가장 유사한 밴드 검색 (only_bands=True)
-        results = find_similar_bands_by_embedding(
-            db=db,
-            user_embedding=adj_centroid.tolist(),
-            top_k=10,  # 넉넉히 가져옴
-            exclude_band_ids=exclude_ids,
-            only_bands=True,  # V4의 핵심: is_band=true만 검색
-        )
-        
-        # 각 클러스터에서 2개씩 뽑기
-        cluster_bands = []
-        for band_id, score in results:
-            if band_id not in already_recommended:
-                cluster_bands.append((band_id, score, i))
-                already_recommended.add(band_id)
-                if len(cluster_bands) == 2:
-                    break
-        
-        # 1등과 2등 분리
-        if len(cluster_bands) >= 1:
-            cluster_top1.append(cluster_bands[0])
-            logger.info(f"  클러스터 {i} - 1등: band_id={cluster_bands[0][0]}, score={cluster_bands[0][1]:.4f}")
-        
-        if len(cluster_bands) >= 2:
-            cluster_top2.append(cluster_bands[1])
-            logger.info(f"  클러스터 {i} - 2등: band_id={cluster_bands[1][0]}, score={cluster_bands[1][1]:.4f}")
-        
-        if len(cluster_bands) == 0:
-            logger.info(f"  클러스터 {i}: 추천할 밴드 없음 (is_band=true 조건)")
-        elif len(cluster_bands) == 1:
-            logger.info(f"  클러스터 {i}: 2등 밴드 없음 (1개만 발견)")
-    
-    # 6. 최종 추천 목록 구성
-    logger.info("-" * 50)
-    logger.info("[V4 Step 6] 최종 추천 목록 구성")
-    
-    # 각 클러스터 1등 3개는 필수 포함
-    final_recommended = cluster_top1.copy()
-    logger.info(f"  필수 포함 (각 클러스터 1등): {len(cluster_top1)}개")
-    
-    # 각 클러스터 2등 중 점수 높은 순으로 정렬하여 상위 2개 추가
-    cluster_top2_sorted = sorted(cluster_top2, key=lambda x: x[1], reverse=True)
-    additional_bands = cluster_top2_sorted[:2]
-    final_recommended.extend(additional_bands)
-    
-    logger.info(f"  추가 포함 (2등 중 상위): {len(additional_bands)}개")
-    for band_id, score, cluster_idx in additional_bands:
-        logger.info(f"    클러스터 {cluster_idx} - band_id={band_id}, score={score:.4f}")
-    
-    # 7. 최종 점수 순으로 정렬
-    final_recommended.sort(key=lambda x: x[1], reverse=True)
-    
-    logger.info("-" * 50)
-    logger.info("[V4 추천 결과] 총 5개 밴드 (is_band=true)")
-    for i, (band_id, score, cluster_idx) in enumerate(final_recommended, 1):
-        logger.info(f"  {i}. band_id={band_id}, score={score:.4f} (클러스터 {cluster_idx})")
-    
-    # 8. 밴드 상세 정보 조회
-    recommended_band_ids = [band_id for band_id, _, _ in final_recommended]
-    bands_info = get_bands_with_keywords_by_ids(db, recommended_band_ids)
-    
-    # 9. 결과 조합
-    results = []
-    for band_id, score, cluster_idx in final_recommended:
-        band_info = bands_info.get(band_id, {})
-        results.append({
-            "band_id": band_id,
-            "score": score,
-            "band_name": band_info.get("band_name"),
-            "image_url": band_info.get("main_image"),
-            "band_music": band_info.get("main_music"),
-            "keywords": band_info.get("keywords", []),
-        })
-    
-    logger.info("=" * 70)
-    logger.info(f"[V4 최종 결과] {len(results)}개 밴드 반환")
-    logger.info(f"  - 각 클러스터 1등: 3개 (필수)")
-    logger.info(f"  - 각 클러스터 2등 중 상위: 2개 (추가)")
-    logger.info(f"  - is_band=true 필터링 적용")
-    logger.info("=" * 70)
-    
-    return results
+    return recommend("v4", db, band_ids, keyword_ids, exclude_input=exclude_input).bands
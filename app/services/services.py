@@ -1,50 +1,141 @@
 # app/services.py
-import os
-from typing import List, Any
+import re
+import logging
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
 
-from dotenv import load_dotenv
-from openai import OpenAI
+import numpy as np
+from openai import APITimeoutError
+from sqlalchemy.orm import Session
 
-load_dotenv()
+from app.core import deadline
+from app.core.cache import TTLLRUCache
+from app.core.config import settings
+from app.repositories.band_description_repository import find_similar_bands_with_details
+from app.services.embedding_service import embedding_service
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+logger = logging.getLogger(__name__)
 
-# TODO:
-# - 필요하면 OpenAI 클라이언트 옵션(타임아웃, 베이스 URL 등) 세분화
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+EMBEDDING_MODEL = settings.OPENAI_EMBEDDING_MODEL
+
+# OpenAI 호출은 별도 클라이언트를 만들지 않고 공유 클라이언트(app/core/openai_client.py)를 쓰는 embedding_service 사용
+
+# 질의 벡터는 텍스트와 모델로만 정해지므로 카탈로그 세대와 무관하게 보관
+# (모델, 정규화한 질의 텍스트) → (응답 모델명, 임베딩)
+query_embedding_cache = TTLLRUCache(
+    "query_embedding",
+    max_size=settings.QUERY_EMBEDDING_CACHE_MAX_SIZE,
+    ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query_text(text: str) -> str:
+    """
+    캐시 적중률을 높이기 위한 질의 텍스트 정규화.
+
+    NFKC 정규화(전각/반각, 호환 문자 통일) → 연속 공백을 하나로 → 앞뒤 공백 제거 → 소문자,
+    마지막으로 RECOMMEND_BAND_MAX_TEXT_CHARS 글자까지만 사용.
+
+    Raises:
+        ValueError: 정규화 후 빈 문자열인 경우
+    """
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+    if not normalized:
+        raise ValueError("user_text가 비어 있습니다.")
+    return normalized[: settings.RECOMMEND_BAND_MAX_TEXT_CHARS]
+
+
+def _embedding_timeout() -> Optional[float]:
+    """요청 시간 예산이 있으면 검색에 쓸 시간을 남긴 만큼만 OpenAI 호출에 사용"""
+    left = deadline.remaining()
+    if left is None:
+        return None
+    timeout = left - settings.RECOMMEND_DEADLINE_RESERVE_MS / 1000
+    if timeout <= 0:
+        raise TimeoutError("요청 시간 예산 소진 - 질의 임베딩을 생성하지 못했습니다.")
+    return timeout
+
+
+def _embed_query(normalized_text: str) -> Tuple[str, np.ndarray]:
+    """정규화한 질의 텍스트 → (모델명, 임베딩), 캐시 우선"""
+    key = (embedding_service.model_name, normalized_text)
+    cached = query_embedding_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        model, embedding = embedding_service.embed_single_text(
+            normalized_text, operation="query", timeout=_embedding_timeout()
+        )
+    except APITimeoutError as e:
+        raise TimeoutError(f"질의 임베딩 생성 시간 초과: {e}") from e
+
+    vector = np.asarray(embedding, dtype=np.float32)
+    # 여러 요청이 공유하므로 읽기 전용으로
+    vector.flags.writeable = False
+    query_embedding_cache.set(key, (model, vector))
+    return model, vector
 
 
 def get_text_embedding(text: str) -> List[float]:
     """
-    TODO:
-    - OpenAI 임베딩 API를 호출해서 text를 벡터로 변환하는 로직 구현
-    - 에러 처리 및 로깅 추가
+    텍스트 → 임베딩 벡터 (정규화 후 캐시 조회, 없으면 OpenAI 호출).
+
+    Args:
+        text: 임베딩할 텍스트
+
+    Returns:
+        임베딩 벡터
 
-    현재는 NotImplementedError만 던짐.
+    Raises:
+        ValueError: 빈 텍스트
+        TimeoutError: 요청 시간 예산 안에 임베딩을 구하지 못한 경우
     """
-    raise NotImplementedError("get_text_embedding() 로직을 구현하세요.")
+    _, vector = _embed_query(normalize_query_text(text))
+    return vector.tolist()
 
 
-def query_similar_bands(embedding: List[float], top_k: int = 5) -> List[Any]:
+def _bounded_top_k(top_k: int) -> int:
+    if top_k < 1:
+        raise ValueError("top_k는 1 이상이어야 합니다.")
+    return min(top_k, settings.RECOMMEND_BAND_MAX_TOP_K)
+
+
+def query_similar_bands(db: Session, embedding: List[float], top_k: int = 5) -> List[Tuple[int, str, str, float]]:
     """
-    TODO:
-    - db.get_connection()으로 커넥션 가져오기
-    - pgvector <=> 연산자를 사용하여 bands 테이블에서 유사한 밴드 조회
-    - rows: [(id, name, genre_desc, distance), ...] 형태로 반환하도록 구현
+    임베딩과 코사인 거리가 가까운 밴드를 이름/설명과 함께 조회 (DB 1회 왕복).
+
+    Args:
+        db: DB 세션
+        embedding: 기준 임베딩 벡터
+        top_k: 반환할 밴드 수 (RECOMMEND_BAND_MAX_TOP_K까지)
 
-    현재는 NotImplementedError만 던짐.
+    Returns:
+        [(id, name, genre_desc, distance), ...] 형태의 리스트 (거리 가까운 순)
     """
-    raise NotImplementedError("query_similar_bands() 로직을 구현하세요.")
+    return find_similar_bands_with_details(db, embedding, _bounded_top_k(top_k))
 
 
-def recommend_bands(user_text: str, top_k: int = 5) -> List[Any]:
+def recommend_bands(db: Session, user_text: str, top_k: int = 5) -> Dict[str, Any]:
     """
-    TODO:
-    - 1) user_text → get_text_embedding()으로 임베딩 생성
-    - 2) query_similar_bands() 호출
-    - 3) 결과 rows를 그대로 반환하거나, 가공해서 리턴
+    자유 텍스트 → 유사 밴드 추천.
+
+    1. 질의 텍스트 정규화 → 임베딩 (같은 질의는 캐시 사용, OpenAI 호출 없음)
+    2. 유사도 검색 + 밴드 정보 조회를 한 쿼리로 실행
+
+    Args:
+        db: DB 세션
+        user_text: 사용자의 음악 취향 텍스트
+        top_k: 추천 받을 밴드 수 (RECOMMEND_BAND_MAX_TOP_K까지)
 
-    현재는 NotImplementedError만 던짐.
+    Returns:
+        {"model": 임베딩 모델명, "query_text": 정규화한 질의 텍스트,
+         "bands": [(id, name, genre_desc, distance), ...]}
     """
-    raise NotImplementedError("recommend_bands() 로직을 구현하세요.")
+    top_k = _bounded_top_k(top_k)
+    normalized = normalize_query_text(user_text)
+    model, vector = _embed_query(normalized)
+    rows = find_similar_bands_with_details(db, vector, top_k)
+    return {"model": model, "query_text": normalized, "bands": rows}
@@ -0,0 +1,79 @@
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLLRUCache
+from app.core.config import settings
+from app.core.responses import dumps
+from app.repositories.band_description_repository import get_band_recommend_watermark
+from app.services.catalog_generation import catalog_generation
+from app.services.band_catalog import get_band_recommends_with_details
+
+logger = logging.getLogger(__name__)
+
+# externalId → (추천 워터마크, ETag, 직렬화된 응답 본문) - 캐시 적중 시 모델 변환/직렬화 없이 그대로 전송
+# 다른 워커가 추천을 다시 저장할 수 있으므로 매 조회마다 DB 워터마크와 비교한 뒤 사용
+stored_recommendation_cache = TTLLRUCache(
+    "stored_recommendation",
+    max_size=settings.STORED_RECOMMEND_CACHE_MAX_SIZE,
+    ttl_seconds=settings.STORED_RECOMMEND_CACHE_TTL_SECONDS,
+)
+
+# 밴드 이름/이미지/키워드가 바뀌면 저장된 추천의 상세 정보도 달라지므로 비움
+catalog_generation.add_listener(lambda generation: stored_recommendation_cache.clear())
+
+
+def make_etag(body: bytes) -> str:
+    """응답 본문 해시로 강한(strong) ETag 생성"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더 값(여러 개/와일드카드/약한 ETag 포함)과 ETag 비교"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def get_stored_recommendations(
+    db: Session,
+    external_id: str,
+    build_response: Callable[[List[Dict[str, Any]]], Any],
+) -> Optional[Tuple[str, bytes]]:
+    """
+    회원의 저장된 추천을 캐시 우선으로 조회 (재계산/쓰기 없음).
+
+    회원 조회와 함께 추천 워터마크를 읽어(가벼운 쿼리 1회) 캐시된 값과 같을 때만 캐시를 사용하므로,
+    다른 워커가 추천을 다시 저장해도 오래된 응답을 돌려주지 않습니다.
+
+    Args:
+        db: DB 세션
+        external_id: JWT에서 추출한 externalId
+        build_response: 상세 정보 리스트 → 응답 모델 변환 함수
+
+    Returns:
+        (ETag, JSON 본문) 또는 회원이 없으면 None
+    """
+    member = get_band_recommend_watermark(db, external_id)
+    if member is None:
+        return None
+    member_id, watermark = member
+
+    cached = stored_recommendation_cache.get(external_id)
+    if cached is not None and cached[0] == watermark:
+        return cached[1], cached[2]
+
+    band_details = get_band_recommends_with_details(db, member_id)
+    body = dumps(build_response(band_details).model_dump())
+    etag = make_etag(body)
+
+    stored_recommendation_cache.set(external_id, (watermark, etag, body))
+    return etag, body
+
+
+def invalidate_stored_recommendations(external_id: str) -> None:
+    """추천을 다시 저장한 직후 호출하여 조회 캐시 무효화"""
+    stored_recommendation_cache.delete(external_id)
@@ -0,0 +1,179 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.db import engine, replica_engines, open_read_session, SessionLocal
+from app.core.executor import cpu_executor
+from app.repositories.band_description_repository import find_similar_bands_by_embedding
+from app.services.band_catalog import band_catalog
+from app.services.keyword_index import keyword_band_index
+from app.services.embedding_snapshot import embedding_snapshot
+from app.services.keyword_embedding_service import keyword_embedding_service
+from app.services.recommendation_service import fit_cluster_centroids
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1536
+
+
+class WarmupState:
+    """
+    서버 시작 시 warmup 단계별 결과 (readiness 판단용).
+
+    필수(required) 단계가 모두 성공해야 ready로 판단합니다.
+    선택 단계(캐시 로드 등)는 실패해도 요청 처리 중에 다시 시도되므로 ready에 영향을 주지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def run_check(self, name: str, fn: Callable[[], Any], required: bool = True) -> None:
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"required": required}
+        try:
+            detail = fn()
+            result["ok"] = True
+            if detail is not None:
+                result["detail"] = detail
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = str(e)
+            logger.error(f"[warmup] {name} 실패: {e}")
+        result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        with self._lock:
+            self.checks[name] = result
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self.finished_at is not None and all(
+                check["ok"] for check in self.checks.values() if check["required"]
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": self.finished_at is not None and all(
+                    check["ok"] for check in self.checks.values() if check["required"]
+                ),
+                "warmupMs": (
+                    round((self.finished_at - self.started_at) * 1000, 3)
+                    if self.finished_at is not None and self.started_at is not None else None
+                ),
+                "checks": {name: dict(check) for name, check in self.checks.items()},
+            }
+
+
+warmup_state = WarmupState()
+
+
+def _warm_db_pool() -> Dict[str, Any]:
+    """
+    커넥션 풀을 미리 채우고 검증 (연결 수립 + pgvector 타입 등록 + SELECT 1).
+    동시에 열어야 풀에 여러 커넥션이 남으므로 모두 연 다음 한꺼번에 반납합니다.
+    """
+    connections = []
+    try:
+        for _ in range(max(1, settings.WARMUP_DB_CONNECTIONS)):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in connections:
+            conn.close()
+
+    replicas = 0
+    for replica_engine in replica_engines:
+        try:
+            with replica_engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            replicas += 1
+        except Exception as e:
+            # 복제본은 없어도 primary로 폴백하므로 경고만
+            logger.warning(f"[warmup] 복제본 연결 실패: {replica_engine.url.host} ({e})")
+    return {"connections": len(connections), "replicas": f"{replicas}/{len(replica_engines)}"}
+
+
+def _warm_clustering() -> Dict[str, Any]:
+    """더미 데이터로 K-means 1회 (scikit-learn 임포트, BLAS/OpenMP 초기화, 작업자 기동)"""
+    embeddings = np.random.default_rng(0).standard_normal((6, EMBEDDING_DIM)).astype(np.float32)
+    cpu_executor.warmup(fit_cluster_centroids, embeddings)
+    return {"workers": cpu_executor.max_workers, "kind": cpu_executor.kind}
+
+
+def _warm_vector_query() -> Dict[str, Any]:
+    """임의 벡터로 유사도 검색 1회 (벡터 인덱스/쿼리 경로 예열)"""
+    vector = np.random.default_rng(0).standard_normal(EMBEDDING_DIM)
+    vector /= np.linalg.norm(vector)
+    db = open_read_session(settings.DB_RECOMMEND_STATEMENT_TIMEOUT_MS)
+    try:
+        results = find_similar_bands_by_embedding(db, vector.tolist(), top_k=1)
+    finally:
+        db.close()
+    return {"results": len(results)}
+
+
+def _load_caches() -> Dict[str, Any]:
+    """응답 결합용 밴드 카탈로그 로드 (카탈로그 워터마크는 시작 시 catalog_generation.start()에서 확인)"""
+    return {"bands": band_catalog.load()}
+
+
+def _open_embedding_snapshot() -> Dict[str, Any]:
+    """공유 임베딩 스냅샷(mmap) 열기 - 없거나 오래됐으면 백그라운드에서 내보냄"""
+    embedding_snapshot.open()
+    return embedding_snapshot.stats()
+
+
+def _load_keyword_index() -> Dict[str, Any]:
+    """키워드 → 밴드 비트셋 역색인 구성 (하이브리드 검색용)"""
+    keyword_band_index.load()
+    return keyword_band_index.stats()
+
+
+def _precompute_keyword_vectors() -> Dict[str, Any]:
+    """전체 키워드의 개별 벡터 미리 계산 (키워드 임베딩 시간 초과 시 근사용, OpenAI 호출)"""
+    db = SessionLocal()
+    try:
+        return {"computed": keyword_embedding_service.precompute(db)}
+    finally:
+        db.close()
+
+
+def run_warmup() -> bool:
+    """
+    서버 시작 시 warmup 실행 (첫 사용자 요청이 연결 수립/초기화 비용을 내지 않도록).
+
+    Returns:
+        ready 여부
+    """
+    warmup_state.started_at = time.perf_counter()
+
+    warmup_state.run_check("dbPool", _warm_db_pool)
+    warmup_state.run_check("vectorQuery", _warm_vector_query)
+    warmup_state.run_check("clustering", _warm_clustering)
+    warmup_state.run_check("bandCatalog", _load_caches, required=False)
+    warmup_state.run_check("embeddingSnapshot", _open_embedding_snapshot, required=False)
+    if settings.RECOMMEND_HYBRID_MODE != "off":
+        warmup_state.run_check("keywordIndex", _load_keyword_index, required=False)
+    if settings.KEYWORD_EMBEDDING_PRECOMPUTE:
+        warmup_state.run_check("keywordVectors", _precompute_keyword_vectors, required=False)
+
+    warmup_state.finished_at = time.perf_counter()
+    snapshot = warmup_state.snapshot()
+    logger.info(f"[warmup] 완료 - ready={snapshot['ready']}, {snapshot['warmupMs']}ms")
+    return snapshot["ready"]
+
+
+def skip_warmup() -> None:
+    """warmup을 끈 경우 - 기존처럼 카탈로그/스냅샷만 로드하고 바로 ready로 표시"""
+    warmup_state.started_at = time.perf_counter()
+    warmup_state.run_check("bandCatalog", _load_caches, required=False)
+    warmup_state.run_check("embeddingSnapshot", _open_embedding_snapshot, required=False)
+    warmup_state.finished_at = time.perf_counter()
@@ -0,0 +1,30 @@
+"""
+벤치마크 결과/기준값 JSON에 함께 기록할 실행 환경 정보.
+
+기준값은 같은 하드웨어에서만 비교해야 하므로 CPU 모델과 코어 수를 파일에 남겨 둡니다.
+"""
+import os
+import platform
+from typing import Any, Dict
+
+
+def _cpu_model() -> str:
+    """CPU 모델명 (Linux는 /proc/cpuinfo, 그 외는 platform.processor())"""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "unknown"
+
+
+def describe_environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpuModel": _cpu_model(),
+        "cpus": os.cpu_count(),
+    }
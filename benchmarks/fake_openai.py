@@ -0,0 +1,130 @@
+"""
+OpenAI 임베딩 API 대역 서버 (벤치마크용).
+
+실제 OpenAI 대신 결정적인(같은 입력 → 같은 벡터) 임베딩을 반환하며,
+지연 시간과 rate limit을 설정해 OpenAI 꼬리 지연/429 상황을 재현합니다.
+
+실행:
+    python -m benchmarks.fake_openai --port 8900 --latency-ms 80 --jitter-ms 40 --rpm 3000
+
+앱 서버는 OPENAI_BASE_URL=http://localhost:8900/v1 로 이 서버를 바라보게 합니다.
+"""
+import time
+import asyncio
+import hashlib
+import argparse
+import threading
+from typing import List, Union
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+EMBEDDING_DIM = 1536
+
+
+class EmbeddingRequest(BaseModel):
+    model: str
+    input: Union[str, List[str]]
+    encoding_format: str = "float"
+
+
+class _TokenBucket:
+    """분당 요청 수(RPM) 제한 - 초과 시 429"""
+
+    def __init__(self, rpm: int) -> None:
+        self.capacity = max(1, rpm)
+        self.tokens = float(self.capacity)
+        self.refill_per_second = rpm / 60.0
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰을 얻으면 0, 아니면 재시도까지 기다려야 하는 초"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.refill_per_second
+
+
+def deterministic_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """텍스트 해시로 시드를 정해 단위 벡터 생성 (같은 텍스트는 항상 같은 벡터)"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector.tolist()
+
+
+def create_app(latency_ms: float, jitter_ms: float, rpm: int, error_rate: float, seed: int) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI Embeddings")
+    bucket = _TokenBucket(rpm) if rpm > 0 else None
+    rng = np.random.default_rng(seed)
+    stats = {"requests": 0, "rateLimited": 0, "errors": 0}
+
+    @app.post("/v1/embeddings")
+    async def create_embeddings(body: EmbeddingRequest):
+        stats["requests"] += 1
+
+        if bucket is not None:
+            retry_after = bucket.acquire()
+            if retry_after > 0:
+                stats["rateLimited"] += 1
+                return JSONResponse(
+                    status_code=429,
+                    headers={"retry-after": f"{retry_after:.3f}"},
+                    content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                )
+
+        # 지연: 기본값 + 지수 분포 꼬리 (실제 API처럼 p99가 p50보다 훨씬 큼)
+        delay_ms = latency_ms + (rng.exponential(jitter_ms) if jitter_ms > 0 else 0.0)
+        await asyncio.sleep(delay_ms / 1000)
+
+        if error_rate > 0 and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Injected failure", "type": "server_error"}},
+            )
+
+        inputs = [body.input] if isinstance(body.input, str) else body.input
+        tokens = sum(max(1, len(text) // 4) for text in inputs)
+        return {
+            "object": "list",
+            "model": body.model,
+            "data": [
+                {"object": "embedding", "index": i, "embedding": deterministic_embedding(text)}
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/stats")
+    async def read_stats():
+        return stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI 임베딩 API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="기본 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=40.0, help="지수 분포 추가 지연의 평균")
+    parser.add_argument("--rpm", type=int, default=0, help="분당 허용 요청 수 (0이면 무제한)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.rpm, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+추천 API 부하/지연 측정기.
+
+seed_fixtures.py가 만든 회원/밴드 데이터로 V1~V4와 최종 추천 API에 동시 요청을 보내
+처리량과 p50/p95/p99 지연을 측정하고, 저장된 기준값(baseline)과 비교해 성능 회귀를 잡습니다.
+
+실행:
+    python -m benchmarks.load_driver --base-url http://localhost:8000 \\
+        --scenario v1 --scenario v4 --scenario final --concurrency 16 --duration 30 \\
+        --baseline benchmarks/baselines/local.json
+
+    # 현재 결과를 기준값으로 저장
+    python -m benchmarks.load_driver ... --save-baseline benchmarks/baselines/local.json
+
+회귀(기준값 대비 지연 증가/처리량 감소가 --tolerance 초과)가 있으면 exit code 1로 종료합니다.
+"""
+import os
+import sys
+import json
+import time
+import base64
+import random
+import asyncio
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import jwt
+import numpy as np
+
+from benchmarks.environment import describe_environment
+
+RECOMMEND_PATHS = {
+    "v1": "/api/bands/recommendations/update/v1",
+    "v2": "/api/bands/recommendations/update/v2",
+    "v3": "/api/bands/recommendations/update/v3",
+    "v4": "/api/bands/recommendations/update/v4",
+    "final": "/api/bands/recommendations/update",
+}
+
+
+class RequestFactory:
+    """
+    시나리오별 요청 생성기.
+
+    unique=True면 매 요청 선택 밴드를 새로 섞어 결과 캐시를 피하고(계산 경로 측정),
+    False면 회원의 실제 선택을 그대로 사용합니다(캐시 적중 포함 현실 부하).
+    """
+
+    def __init__(self, fixture: Dict[str, Any], jwt_secret: bytes, unique: bool, seed: int) -> None:
+        self.members = [m for m in fixture["members"] if m["bandIds"]]
+        self.bands = fixture["bands"]
+        self.keywords = fixture["keywords"]
+        self.jwt_secret = jwt_secret
+        self.unique = unique
+        self.rng = random.Random(seed)
+        self._tokens: Dict[str, str] = {}
+
+    def _token(self, external_id: str) -> str:
+        token = self._tokens.get(external_id)
+        if token is None:
+            token = jwt.encode({"sub": external_id, "exp": int(time.time()) + 3600}, self.jwt_secret, algorithm="HS256")
+            self._tokens[external_id] = token
+        return token
+
+    def build(self, scenario: str) -> Tuple[str, Dict[str, str], Optional[Dict[str, Any]]]:
+        """(path, headers, json body) 반환"""
+        member = self.rng.choice(self.members)
+        path = RECOMMEND_PATHS[scenario]
+
+        if scenario == "final":
+            headers = {"Authorization": f"Bearer {self._token(member['externalId'])}"}
+            if self.unique:
+                path += "?force=true"
+            return path, headers, None
+
+        band_ids = list(member["bandIds"])
+        keyword_ids = list(member["keywordIds"])
+        if self.unique:
+            band_ids = self.rng.sample(range(1, self.bands + 1), k=max(len(band_ids), 3 if scenario in ("v3", "v4") else 1))
+            keyword_ids = self.rng.sample(range(1, self.keywords + 1), k=self.rng.randint(1, 5))
+
+        body: Dict[str, Any] = {"bandIds": band_ids}
+        if scenario != "v1":
+            body["keywords"] = keyword_ids
+        return path, {}, body
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    factory: RequestFactory,
+    scenario: str,
+    deadline: float,
+    measure_after: float,
+    latencies: List[float],
+    statuses: Dict[str, int],
+) -> None:
+    while time.perf_counter() < deadline:
+        path, headers, body = factory.build(scenario)
+        start = time.perf_counter()
+        try:
+            response = await client.post(path, headers=headers, json=body)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+
+        # 워밍업 구간의 요청은 집계하지 않음
+        if start >= measure_after:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+
+async def run_scenario(args: argparse.Namespace, factory: RequestFactory, scenario: str) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        start = time.perf_counter()
+        measure_after = start + args.warmup
+        deadline = measure_after + args.duration
+        await asyncio.gather(*[
+            _worker(client, factory, scenario, deadline, measure_after, latencies, statuses)
+            for _ in range(args.concurrency)
+        ])
+
+    total = len(latencies)
+    errors = total - statuses.get("200", 0)
+    result: Dict[str, Any] = {
+        "requests": total,
+        "errors": errors,
+        "errorRate": round(errors / total, 4) if total else 0.0,
+        "statuses": statuses,
+        "throughputRps": round(total / args.duration, 2),
+    }
+    if total:
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        result.update({"p50Ms": round(float(p50), 2), "p95Ms": round(float(p95), 2), "p99Ms": round(float(p99), 2)})
+    return result
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """기준값 대비 회귀 목록 (비어 있으면 통과)"""
+    regressions = []
+    for scenario, current in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if base is None or "p50Ms" not in current or "p50Ms" not in base:
+            continue
+        for metric in ("p50Ms", "p95Ms", "p99Ms"):
+            limit = base[metric] * (1 + tolerance)
+            if current[metric] > limit:
+                regressions.append(f"{scenario} {metric}: {current[metric]} > {base[metric]} (+{tolerance:.0%})")
+        if current["throughputRps"] < base["throughputRps"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario} throughputRps: {current['throughputRps']} < {base['throughputRps']} (-{tolerance:.0%})"
+            )
+        if current["errorRate"] > base["errorRate"] + 0.01:
+            regressions.append(f"{scenario} errorRate: {current['errorRate']} > {base['errorRate']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="추천 API 부하/지연 측정")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", action="append", choices=list(RECOMMEND_PATHS), help="여러 번 지정 가능 (기본: 전체)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="시나리오별 측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="집계하지 않는 워밍업 시간(초)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--unique", action="store_true", help="매 요청 입력을 새로 만들어 결과 캐시를 피함")
+    parser.add_argument("--fixture", default="benchmarks/data/fixture.json")
+    parser.add_argument("--jwt-secret", default=os.getenv("JWT_SECRET_KEY", ""), help="BASE64 JWT secret (최종 API용)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준값 JSON")
+    parser.add_argument("--save-baseline", help="결과를 기준값으로 저장할 경로")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="허용 회귀 비율")
+    args = parser.parse_args()
+
+    scenarios = args.scenario or list(RECOMMEND_PATHS)
+    if "final" in scenarios and not args.jwt_secret:
+        parser.error("final 시나리오에는 --jwt-secret (또는 JWT_SECRET_KEY)이 필요합니다.")
+
+    fixture = json.loads(Path(args.fixture).read_text())
+    factory = RequestFactory(fixture, base64.b64decode(args.jwt_secret) if args.jwt_secret else b"", args.unique, args.seed)
+
+    results: Dict[str, Any] = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        # 기준값은 같은 하드웨어/같은 fixture seed에서만 비교
+        "environment": describe_environment(),
+        "config": {
+            "baseUrl": args.base_url,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "unique": args.unique,
+            "bands": fixture["bands"],
+            "members": len(fixture["members"]),
+            "index": fixture.get("index"),
+            "fixtureSeed": fixture.get("seed"),
+            "requestSeed": args.seed,
+        },
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        print(f"[{scenario}] 측정 중... (concurrency={args.concurrency}, {args.duration}s)")
+        result = asyncio.run(run_scenario(args, factory, scenario))
+        results["scenarios"][scenario] = result
+        print(f"[{scenario}] {json.dumps(result, ensure_ascii=False)}")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"결과 저장: {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("성능 회귀 감지:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"기준값 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
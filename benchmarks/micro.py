@@ -0,0 +1,195 @@
+"""
+추천 벡터 연산 마이크로벤치마크.
+
+slerp / adaptive_t / build_user_embedding / 클러스터 선택(cluster_diversifier)을
+실제 입력 크기(선택 밴드 1~200개, 차원 256/512/1536, float32/float64, 키워드 유무)로 측정하고,
+여러 프로필을 한 번에 처리하는 배치 버전(adaptive_t_batch + slerp_batch)과 반복 호출을 비교합니다.
+
+실행:
+    python -m benchmarks.micro                      # 전체 그리드
+    python -m benchmarks.micro --quick              # 작은 그리드 (개발 중 빠른 확인)
+    python -m benchmarks.micro --filter slerp --save-baseline benchmarks/baselines/micro-local.json
+    python -m benchmarks.micro --baseline benchmarks/baselines/micro-local.json --tolerance 0.25
+
+기준값 대비 중앙값이 --tolerance 넘게 느려진 케이스가 있으면 exit code 1로 종료합니다.
+"""
+import sys
+import json
+import timeit
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from app.services.recommendation_pipeline import RecommendationContext
+from app.services.recommendation_service import (
+    slerp,
+    slerp_batch,
+    adaptive_t,
+    adaptive_t_batch,
+    build_user_embedding,
+    fit_cluster_centroids,
+    blend_keyword_vectors,
+    cluster_diversifier,
+)
+from benchmarks.environment import describe_environment
+
+FULL_GRID = {
+    "dims": (256, 512, 1536),
+    "dtypes": (np.float32, np.float64),
+    "band_counts": (1, 2, 3, 10, 50, 200),
+    "batch_sizes": (3, 64, 1024),
+}
+QUICK_GRID = {
+    "dims": (1536,),
+    "dtypes": (np.float32,),
+    "band_counts": (3, 50),
+    "batch_sizes": (3, 256),
+}
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def _unit_rows(rng: np.random.Generator, n: int, dim: int, dtype) -> np.ndarray:
+    rows = rng.standard_normal((n, dim)).astype(dtype)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _loop_blend(profiles: np.ndarray, keyword: np.ndarray) -> List[np.ndarray]:
+    """배치 버전 도입 전 방식 (프로필마다 adaptive_t + slerp 호출)"""
+    return [slerp(p, keyword, adaptive_t(p, keyword)) for p in profiles]
+
+
+def _batch_blend(profiles: np.ndarray, keyword: np.ndarray) -> np.ndarray:
+    return slerp_batch(profiles, keyword, adaptive_t_batch(profiles, keyword))
+
+
+def _cluster_selection_context(rng: np.random.Generator, per_cluster: int) -> Callable[[], None]:
+    # 클러스터 간 중복 밴드가 섞인 후보 (실제 검색 결과처럼 점수 내림차순)
+    candidates = []
+    for _ in range(3):
+        ids = rng.choice(per_cluster * 2, size=per_cluster, replace=False).tolist()
+        scores = np.sort(rng.random(per_cluster))[::-1].tolist()
+        candidates.append(list(zip(ids, scores)))
+
+    def run() -> None:
+        ctx = RecommendationContext(db=None, version="v3", band_ids=[], keyword_ids=[], top_k=5)
+        ctx.candidates = candidates
+        cluster_diversifier(ctx)
+
+    return run
+
+
+def build_cases(grid: Dict[str, Any], seed: int) -> Iterator[Case]:
+    rng = np.random.default_rng(seed)
+
+    for dim in grid["dims"]:
+        for dtype in grid["dtypes"]:
+            tag = f"d{dim}/{np.dtype(dtype).name}"
+            v0, v1 = _unit_rows(rng, 2, dim, dtype)
+
+            yield f"slerp/{tag}", lambda v0=v0, v1=v1: slerp(v0, v1, 0.2)
+            yield f"adaptive_t/{tag}", lambda v0=v0, v1=v1: adaptive_t(v0, v1)
+
+            # 여러 프로필의 키워드 반영: 반복 호출 vs 배치
+            for n in grid["batch_sizes"]:
+                profiles = _unit_rows(rng, n, dim, dtype)
+                # 같은 결과인지 먼저 확인 (배치 버전이 의미를 바꾸지 않았는지)
+                np.testing.assert_allclose(
+                    np.asarray(_loop_blend(profiles, v1)), _batch_blend(profiles, v1),
+                    rtol=1e-4, atol=1e-5,
+                )
+                yield f"blend_loop/n{n}/{tag}", lambda p=profiles, k=v1: _loop_blend(p, k)
+                yield f"blend_batch/n{n}/{tag}", lambda p=profiles, k=v1: _batch_blend(p, k)
+
+            # 선택 밴드 수별 프로필 생성 (V1/V2) / 클러스터 + 키워드 반영 (V3/V4)
+            for n in grid["band_counts"]:
+                embeddings = _unit_rows(rng, n, dim, dtype)
+                rows = list(embeddings)
+                yield f"build_user_embedding/n{n}/{tag}", lambda rows=rows: build_user_embedding(rows)
+
+                if n < 3:
+                    continue
+
+                def clusters(embeddings=embeddings):
+                    return fit_cluster_centroids(embeddings)
+
+                def clusters_with_keywords(embeddings=embeddings, keyword=v1):
+                    centroids, counts = fit_cluster_centroids(embeddings)
+                    return blend_keyword_vectors(list(centroids), [int(c) for c in counts], keyword)
+
+                yield f"cluster_profile/n{n}/{tag}/no_keywords", clusters
+                yield f"cluster_profile/n{n}/{tag}/keywords", clusters_with_keywords
+
+    for per_cluster in (10, 50):
+        yield f"cluster_selection/candidates{per_cluster}", _cluster_selection_context(rng, per_cluster)
+
+
+def measure(fn: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, float]:
+    """호출당 시간(µs) - 한 번 측정이 min_time 이상 걸리도록 반복 횟수를 정하고 repeat번 측정"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    runs = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "medianUs": round(float(np.median(runs)), 3),
+        "minUs": round(float(np.min(runs)), 3),
+        "loops": number,
+    }
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is not None and current["medianUs"] > base["medianUs"] * (1 + tolerance):
+            regressions.append(f"{name}: {current['medianUs']}µs > {base['medianUs']}µs (+{tolerance:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="추천 벡터 연산 마이크로벤치마크")
+    parser.add_argument("--quick", action="store_true", help="작은 입력 그리드만 측정")
+    parser.add_argument("--filter", default="", help="케이스 이름에 포함된 문자열로 필터")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="측정 1회당 최소 시간(초)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준값 JSON")
+    parser.add_argument("--save-baseline", help="결과를 기준값으로 저장할 경로")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 회귀 비율")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "environment": {**describe_environment(), "numpy": np.__version__},
+        "config": {"grid": "quick" if args.quick else "full", "seed": args.seed, "filter": args.filter},
+        "cases": {},
+    }
+
+    grid = QUICK_GRID if args.quick else FULL_GRID
+    for name, fn in build_cases(grid, args.seed):
+        if args.filter and args.filter not in name:
+            continue
+        results["cases"][name] = measure(fn, args.min_time, args.repeat)
+        print(f"{name:<55} {results['cases'][name]['medianUs']:>12.3f} µs")
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(results, indent=2))
+        print(f"결과 저장: {path}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("성능 회귀 감지:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"기준값 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
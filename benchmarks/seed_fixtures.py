@@ -0,0 +1,213 @@
+"""
+벤치마크용 합성 카탈로그/회원 데이터 생성기 (Postgres + pgvector).
+
+같은 --seed면 항상 같은 데이터가 만들어지므로 실행 간 결과를 비교할 수 있습니다.
+임베딩은 장르 중심 벡터 주변에 흩어진 단위 벡터로 만들어 실제 카탈로그처럼 군집을 이룹니다.
+
+실행 (전용 벤치마크 DB 사용 - DB 이름에 'bench'가 없으면 --force 필요):
+    python -m benchmarks.seed_fixtures \\
+        --database-url postgresql+psycopg2://postgres:pw@localhost:5432/diggindie_bench \\
+        --bands 100000 --members 5000 --reset --index hnsw
+
+결과 요약(회원 externalId/선택 밴드/키워드)은 --fixture-out(기본 benchmarks/data/fixture.json)에 저장되고
+load_driver.py가 요청 생성에 사용합니다.
+"""
+import io
+import json
+import time
+import uuid
+import argparse
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from app.core.db import Base
+import app.models  # noqa: F401  (모든 테이블을 metadata에 등록)
+
+EMBEDDING_DIM = 1536
+
+# 생성 순서대로 비우고, 시퀀스를 맞출 (테이블, PK 컬럼)
+FIXTURE_TABLES = [
+    ("band_recommend", "band_recommend_id"),
+    ("band_recommend_state", None),
+    ("band_neighbors", None),
+    ("member_keyword", "member_keyword_id"),
+    ("member_band", "id"),
+    ("member", "member_id"),
+    ("band_keyword", "band_keyword_id"),
+    ("top_track", "top_track_id"),
+    ("band_description", "band_description_id"),
+    ("keyword", "keyword_id"),
+    ("band", "band_id"),
+]
+
+KEYWORD_WORDS = [
+    "몽환적인", "청량한", "강렬한", "서정적인", "우울한", "신나는", "잔잔한", "레트로",
+    "사이키델릭", "펑키한", "몽글몽글", "거친", "따뜻한", "차가운", "웅장한", "미니멀",
+    "댄서블", "어쿠스틱", "노이즈", "드리미", "그루비", "슬픈", "희망찬", "도시적인",
+]
+
+
+def _copy_rows(cursor, table: str, columns: List[str], rows: List[str]) -> None:
+    if not rows:
+        return
+    buffer = io.StringIO("".join(rows))
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def _vector_literals(vectors: np.ndarray) -> List[str]:
+    """float32 행렬 → pgvector 텍스트 표현 리스트"""
+    buffer = io.StringIO()
+    np.savetxt(buffer, vectors, fmt="%.6f", delimiter=",")
+    return [f"[{line}]" for line in buffer.getvalue().splitlines()]
+
+
+def seed(args: argparse.Namespace) -> dict:
+    rng = np.random.default_rng(args.seed)
+    engine = create_engine(args.database_url)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    Base.metadata.create_all(engine)
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if args.reset:
+            cursor.execute("TRUNCATE " + ", ".join(table for table, _ in FIXTURE_TABLES) + " RESTART IDENTITY CASCADE")
+
+        # 1) 키워드
+        keywords = [f"{KEYWORD_WORDS[i % len(KEYWORD_WORDS)]}{i // len(KEYWORD_WORDS) or ''}"[:20] for i in range(args.keywords)]
+        _copy_rows(cursor, "keyword", ["keyword_id", "keyword", "created_at"], [
+            f"{i + 1}\t{word}\tnow\n" for i, word in enumerate(keywords)
+        ])
+
+        # 2) 밴드 + 임베딩 + 대표곡 + 밴드 키워드 (청크 단위로 생성해 메모리 사용량 제한)
+        centers = rng.standard_normal((args.genres, EMBEDDING_DIM)).astype(np.float32)
+        centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+        band_genres = rng.integers(0, args.genres, size=args.bands)
+        # 장르별로 자주 붙는 키워드 묶음
+        genre_keywords = rng.integers(1, args.keywords + 1, size=(args.genres, 6))
+
+        band_keyword_id = 0
+        started = time.perf_counter()
+        for start in range(0, args.bands, args.chunk_size):
+            end = min(start + args.chunk_size, args.bands)
+            genres = band_genres[start:end]
+            noise = rng.standard_normal((end - start, EMBEDDING_DIM)).astype(np.float32)
+            vectors = centers[genres] + args.spread * noise / np.sqrt(EMBEDDING_DIM)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            literals = _vector_literals(vectors)
+            is_band = rng.random(end - start) < args.is_band_ratio
+
+            band_rows, description_rows, track_rows, keyword_rows = [], [], [], []
+            for offset, band_id in enumerate(range(start + 1, end + 1)):
+                genre = int(genres[offset])
+                band_rows.append(
+                    f"{band_id}\tband-{band_id}\thttps://img.example.com/{band_id}.jpg\t"
+                    f"https://music.example.com/{band_id}\tgenre {genre} band\t{'t' if is_band[offset] else 'f'}\tnow\tnow\n"
+                )
+                description_rows.append(f"{band_id}\t{band_id}\tgenre {genre} band\t{literals[offset]}\tnow\tnow\n")
+                track_rows.append(f"{band_id}\t{band_id}\ttrack-{band_id}\thttps://track.example.com/{band_id}\n")
+                for keyword_id in sorted(set(rng.choice(genre_keywords[genre], size=3).tolist())):
+                    band_keyword_id += 1
+                    keyword_rows.append(f"{band_keyword_id}\t{band_id}\t{keyword_id}\tnow\n")
+
+            _copy_rows(cursor, "band", ["band_id", "band_name", "main_image", "main_music", "description", "is_band", "created_at", "updated_at"], band_rows)
+            _copy_rows(cursor, "band_description", ["band_description_id", "band_id", "description", "embedding", "created_at", "updated_at"], description_rows)
+            _copy_rows(cursor, "top_track", ["top_track_id", "band_id", "title", "external_url"], track_rows)
+            _copy_rows(cursor, "band_keyword", ["band_keyword_id", "band_id", "keyword_id", "created_at"], keyword_rows)
+            raw.commit()
+            print(f"  밴드 {end}/{args.bands} ({time.perf_counter() - started:.1f}s)")
+
+        # 3) 회원 + 선택 밴드/키워드 (같은 장르 위주로 고르되 일부는 다른 장르에서)
+        members = []
+        member_rows, member_band_rows, member_keyword_rows = [], [], []
+        member_band_id = member_keyword_id = 0
+        for member_id in range(1, args.members + 1):
+            external_id = str(uuid.UUID(bytes=rng.bytes(16), version=4))
+            band_count = int(rng.integers(args.min_member_bands, args.max_member_bands + 1))
+            band_ids = sorted(set((rng.integers(0, args.bands, size=band_count) + 1).tolist()))
+            keyword_ids = sorted(set(rng.integers(1, args.keywords + 1, size=int(rng.integers(0, 6))).tolist()))
+
+            member_rows.append(f"{member_id}\t{external_id}\tbench-{member_id}\tbench-{member_id}@example.com\tnow\n")
+            for band_id in band_ids:
+                member_band_id += 1
+                member_band_rows.append(f"{member_band_id}\t{member_id}\t{band_id}\tnow\n")
+            for keyword_id in keyword_ids:
+                member_keyword_id += 1
+                member_keyword_rows.append(f"{member_keyword_id}\t{member_id}\t{keyword_id}\tnow\n")
+            members.append({"externalId": external_id, "bandIds": band_ids, "keywordIds": keyword_ids})
+
+        _copy_rows(cursor, "member", ["member_id", "external_id", "user_id", "email", "created_at"], member_rows)
+        _copy_rows(cursor, "member_band", ["id", "member_id", "band_id", "created_at"], member_band_rows)
+        _copy_rows(cursor, "member_keyword", ["member_keyword_id", "member_id", "keyword_id", "created_at"], member_keyword_rows)
+
+        # 명시적으로 넣은 ID 이후부터 시퀀스가 이어지도록 조정
+        for table, pk in FIXTURE_TABLES:
+            if pk is not None:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', '{pk}'), GREATEST((SELECT max({pk}) FROM {table}), 1))"
+                )
+        raw.commit()
+
+        # 4) 벡터 인덱스
+        if args.index != "none":
+            print(f"  {args.index} 인덱스 생성 중...")
+            cursor.execute("DROP INDEX IF EXISTS ix_bench_band_description_embedding")
+            cursor.execute(
+                f"CREATE INDEX ix_bench_band_description_embedding ON band_description "
+                f"USING {args.index} (embedding vector_cosine_ops)"
+            )
+        cursor.execute("ANALYZE")
+        raw.commit()
+    finally:
+        raw.close()
+
+    return {
+        "seed": args.seed,
+        "bands": args.bands,
+        "keywords": args.keywords,
+        "genres": args.genres,
+        "index": args.index,
+        "members": members,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 카탈로그/회원 데이터 생성")
+    parser.add_argument("--database-url", required=True, help="SQLAlchemy URL (전용 벤치마크 DB)")
+    parser.add_argument("--bands", type=int, default=10_000, help="밴드 수 (10k ~ 1M)")
+    parser.add_argument("--keywords", type=int, default=200)
+    parser.add_argument("--genres", type=int, default=64, help="임베딩 군집(장르) 수")
+    parser.add_argument("--spread", type=float, default=12.0, help="장르 중심에서 퍼진 정도 (클수록 군집이 흐려짐)")
+    parser.add_argument("--is-band-ratio", type=float, default=0.8)
+    parser.add_argument("--members", type=int, default=1_000)
+    parser.add_argument("--min-member-bands", type=int, default=1)
+    parser.add_argument("--max-member-bands", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--index", choices=["none", "hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="생성 전에 대상 테이블을 모두 비움")
+    parser.add_argument("--force", action="store_true", help="DB 이름에 'bench'가 없어도 실행")
+    parser.add_argument("--fixture-out", default="benchmarks/data/fixture.json")
+    args = parser.parse_args()
+
+    database = make_url(args.database_url).database or ""
+    if "bench" not in database and not args.force:
+        parser.error(f"DB '{database}'는 벤치마크 전용 DB로 보이지 않습니다. 확실하면 --force를 사용하세요.")
+
+    started = time.perf_counter()
+    fixture = seed(args)
+
+    out = Path(args.fixture_out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(fixture, ensure_ascii=False))
+    print(f"완료: 밴드 {args.bands}개, 회원 {args.members}명 ({time.perf_counter() - started:.1f}s) → {out}")
+
+
+if __name__ == "__main__":
+    main()
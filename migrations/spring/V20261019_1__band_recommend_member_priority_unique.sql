@@ -0,0 +1,14 @@
+-- band_recommend 회원별 priority 유일 인덱스
+-- AI 서버의 추천 저장(INSERT ... ON CONFLICT (member_id, priority))이 사용하는 인덱스입니다.
+-- band_recommend는 Spring 서버 소유이므로 Spring(Flyway) 마이그레이션으로 적용합니다.
+-- 버전 번호는 Spring 저장소의 마이그레이션 순서에 맞게 바꿔서 사용하세요.
+
+-- 같은 (member_id, priority)가 여러 행이면 가장 최근 행만 남김
+DELETE FROM band_recommend br
+USING band_recommend newer
+WHERE br.member_id = newer.member_id
+  AND br.priority = newer.priority
+  AND br.band_recommend_id < newer.band_recommend_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_band_recommend_member_priority
+    ON band_recommend (member_id, priority);